@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Answer-latency telemetry for the AWS Quiz Game.
+Records how long players take to answer each question into typed array
+columns. Full batches are handed to a background thread that compresses them
+and appends them to a block log, so the render thread only pays for a few
+array appends per click. The CLI reports latency percentiles and per-question
+accuracy from the log.
+"""
+import argparse
+import json
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app_cache import cache_path
+
+TELEMETRY_FILE = "answer_telemetry.log"
+LOG_MAGIC = b"AQTL\x01\x00\x00\x00"
+
+# Each block: record count, compressed length and CRC-32 of the compressed columns
+BLOCK_HEADER = struct.Struct("<III")
+BATCH_SIZE = 4096
+
+# Columns: name, array typecode, little-endian NumPy dtype with the same layout
+COLUMNS = (
+    ("time", "d", "<f8"),  # Wall-clock time of the answer
+    ("question", "I", "<u4"),  # Position of the question in its bank, which get() accepts
+    ("latency_ms", "f", "<f4"),  # From showing the question to the click
+    ("correct", "B", "u1"),
+    ("choice", "B", "u1"),  # Position of the clicked choice
+    ("x", "h", "<i2"),  # Click position on the screen
+    ("y", "h", "<i2"),
+)
+
+
+class AnswerTelemetry:
+    """Column buffers for answers, flushed in batches by a background writer thread."""
+
+    def __init__(self, path: Optional[str] = None, batch_size: int = BATCH_SIZE,
+                 clock=time.perf_counter_ns):
+        self.path = path or cache_path(TELEMETRY_FILE)
+        self.batch_size = batch_size
+        self.clock = clock
+        self.records = 0
+        self._shown_at = clock()
+        self._columns = self._new_columns()
+        self._queue: "queue.Queue[Optional[List[array]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _new_columns() -> List[array]:
+        return [array(typecode) for _, typecode, _ in COLUMNS]
+
+    def question_shown(self) -> None:
+        """Start timing the question that was just set up."""
+        self._shown_at = self.clock()
+
+    def record(self, question_position: int, correct: bool, choice: int, pos: Tuple[int, int]) -> None:
+        """Record an answer to the question at a bank position, timed from the last question_shown() call."""
+        latency_ms = (self.clock() - self._shown_at) / 1e6
+        time_column, question, latency, correct_column, choice_column, x, y = self._columns
+        time_column.append(time.time())
+        question.append(question_position)
+        latency.append(latency_ms)
+        correct_column.append(correct)
+        choice_column.append(choice)
+        x.append(pos[0])
+        y.append(pos[1])
+        self.records += 1
+        if len(question) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Hand the buffered answers to the writer thread."""
+        if not len(self._columns[0]):
+            return
+        columns, self._columns = self._columns, self._new_columns()
+        self._queue.put(columns)
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="telemetry-writer", daemon=True)
+            self._writer.start()
+
+    def _write_loop(self) -> None:
+        """Compress and append batches; zlib releases the GIL, so the game keeps running meanwhile."""
+        while True:
+            columns = self._queue.get()
+            if columns is None:
+                break
+            if sys.byteorder == "big":
+                for column in columns:
+                    column.byteswap()
+            data = zlib.compress(b"".join(column.tobytes() for column in columns), 6)
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "ab") as f:
+                    if f.tell() == 0:
+                        f.write(LOG_MAGIC)
+                    f.write(BLOCK_HEADER.pack(len(columns[0]), len(data), zlib.crc32(data)) + data)
+            except OSError as e:
+                print(f"Could not save answer telemetry: {e}")
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Flush buffered answers and stop the writer thread."""
+        self.flush()
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join(timeout)
+            self._writer = None
+
+
+def load_telemetry(path: str) -> Dict[str, np.ndarray]:
+    """Read every complete block of a log into one NumPy array per column."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(LOG_MAGIC):
+        raise ValueError("not an answer telemetry log")
+
+    parts: Dict[str, List[np.ndarray]] = {name: [] for name, _, _ in COLUMNS}
+    position = len(LOG_MAGIC)
+    while position + BLOCK_HEADER.size <= len(data):
+        count, length, checksum = BLOCK_HEADER.unpack_from(data, position)
+        compressed = data[position + BLOCK_HEADER.size:position + BLOCK_HEADER.size + length]
+        if len(compressed) != length or zlib.crc32(compressed) != checksum:
+            # A torn last block from a crash; everything before it is intact
+            break
+        block = zlib.decompress(compressed)
+        offset = 0
+        for name, _, dtype in COLUMNS:
+            column = np.frombuffer(block, dtype=dtype, count=count, offset=offset)
+            parts[name].append(column)
+            offset += column.nbytes
+        position += BLOCK_HEADER.size + length
+    return {name: np.concatenate(parts[name]) if parts[name] else np.empty(0, dtype) for name, _, dtype in COLUMNS}
+
+
+PERCENTILES = (50, 90, 99)
+
+
+def summarize(columns: Dict[str, np.ndarray], top: int = 20) -> dict:
+    """Compute overall latency percentiles and per-question accuracy and latency."""
+    latency = columns["latency_ms"]
+    correct = columns["correct"]
+    question = columns["question"]
+    report = {
+        "answers": int(len(latency)),
+        "accuracy": round(float(correct.mean()), 4) if len(latency) else 0.0,
+        "latency_ms": {f"p{q}": round(float(np.percentile(latency, q)), 1) if len(latency) else 0.0
+                       for q in PERCENTILES},
+        "questions": [],
+    }
+    if not len(latency):
+        return report
+
+    # Sort once by question, then latency; each question's percentiles are then plain index lookups
+    order = np.lexsort((latency, question))
+    sorted_questions = question[order]
+    sorted_latency = latency[order]
+    ids, starts, counts = np.unique(sorted_questions, return_index=True, return_counts=True)
+    correct_counts = np.bincount(np.searchsorted(ids, question), weights=correct, minlength=len(ids))
+    per_question = {f"p{q}": sorted_latency[starts + ((counts - 1) * q) // 100] for q in PERCENTILES}
+
+    # Questions players hesitate on most come first
+    for i in np.argsort(-per_question["p50"], kind="stable")[:top]:
+        report["questions"].append({
+            "position": int(ids[i]),
+            "answers": int(counts[i]),
+            "accuracy": round(float(correct_counts[i] / counts[i]), 4),
+            **{name: round(float(values[i]), 1) for name, values in per_question.items()},
+        })
+    return report
+
+
+def print_report(report: dict, names: Dict[int, str]) -> None:
+    latency = report["latency_ms"]
+    print(f"{report['answers']} answers, {report['accuracy'] * 100:.1f}% correct, latency "
+          + ", ".join(f"{name} {value:.0f} ms" for name, value in latency.items()))
+    if not report["questions"]:
+        return
+    print(f"\n{'pos':>6} {'answers':>9} {'correct':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}  question")
+    for row in report["questions"]:
+        print(f"{row['position']:>6} {row['answers']:>9} {row['accuracy'] * 100:>7.1f}% {row['p50']:>8.0f} "
+              f"{row['p90']:>8.0f} {row['p99']:>8.0f}  {names.get(row['position'], '')}")
+
+
+def main() -> None:
+    """Summarize an answer telemetry log."""
+    parser = argparse.ArgumentParser(description="Answer latency and accuracy from AWS Quiz Game telemetry")
+    parser.add_argument("log", nargs="?", help="telemetry log (default: in the cache directory)")
+    parser.add_argument("--bank", metavar="PATH", help="question bank the log was recorded with, for names")
+    parser.add_argument("--top", type=int, default=20, help="questions to list, slowest first")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    path = args.log or cache_path(TELEMETRY_FILE)
+    start = time.perf_counter()
+    try:
+        columns = load_telemetry(path)
+    except (OSError, ValueError) as e:
+        parser.error(f"could not read telemetry log {path}: {e}")
+    report = summarize(columns, args.top)
+    report["elapsed_s"] = round(time.perf_counter() - start, 3)
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+        return
+    from question_bank import ListQuestionBank, load_question_bank
+    from quiz_questions import QUIZ_QUESTIONS
+    bank = load_question_bank(args.bank) if args.bank else ListQuestionBank(QUIZ_QUESTIONS)
+    names = {row["position"]: bank.get(row["position"])["name"] for row in report["questions"]
+             if row["position"] < len(bank)}
+    bank.close()
+    print_report(report, names)
+    print(f"\nRead {path} in {report['elapsed_s']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
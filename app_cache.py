@@ -0,0 +1,62 @@
+"""
+On-disk cache location and helpers shared by the AWS Quiz Game.
+Cache writes are best effort: on read-only kiosk images they silently do nothing.
+"""
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Optional
+
+CACHE_DIR_ENV = "AWS_QUIZ_CACHE_DIR"
+
+
+def get_cache_dir() -> str:
+    """Return the per-user cache directory for the game (not created)."""
+    override = os.environ.get(CACHE_DIR_ENV)
+    if override:
+        return override
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "aws_quiz_game")
+
+
+def cache_path(name: str) -> str:
+    """Return the path of a file inside the cache directory."""
+    return os.path.join(get_cache_dir(), name)
+
+
+def read_json(name: str) -> Optional[Any]:
+    """Load a JSON cache file, returning None if it is missing or unreadable."""
+    try:
+        with open(cache_path(name), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_atomic(name: str, data: bytes) -> bool:
+    """Atomically replace a cache file with data and return True on success."""
+    directory = get_cache_dir()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, os.path.join(directory, name))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return True
+    except OSError:
+        return False
+
+
+def write_json(name: str, value: Any) -> bool:
+    """Atomically write a JSON cache file and return True on success."""
+    return write_atomic(name, json.dumps(value, ensure_ascii=False).encode("utf-8"))
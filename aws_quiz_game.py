@@ -8,7 +8,28 @@ import sys
 import random
 import os
 import math
-from typing import List, Tuple, Dict, Optional
+import time
+import argparse
+import sqlite3
+from collections import OrderedDict
+from typing import Callable, Iterable, Iterator, List, Set, Tuple, Dict, Optional
+
+from font_cache import resolve_font, get_font, FONT_LOCK
+from frame_profiler import FrameProfiler
+from frame_scheduler import FrameScheduler, FixedTimestep, AUTO_FPS_STEPS
+from sound_synth import make_sound, CORRECT_CHIME, INCORRECT_TONE
+from text_layout import TEXT_LAYOUT
+from question_bank import QuestionBank, can_watch, load_question_bank
+from quiz_engine import QuizEngine, FEEDBACK, QUESTIONS_PER_GAME, MIN_CHOICES, MAX_CHOICES
+from spaced_repetition import SpacedRepetitionScheduler
+from results_effects import ResultsCelebration
+from leaderboard import Leaderboard
+from text_atlas import TextAtlas, AtlasText, ATLAS_FILE, font_signature
+from render_backend import RendererBackend
+from input_replay import InputRecorder, ReplayClock
+from answer_telemetry import AnswerTelemetry
+from question_prefetch import QuestionPrefetcher, PreparedAssets
+from particles import ParticleSystem, PARTICLE_PRESETS, resolve_particle_count
 
 # Initialize pygame
 pygame.init()
@@ -26,146 +47,257 @@ GRAY = (220, 220, 220)
 LIGHT_GREEN = (230, 255, 230)
 LIGHT_RED = (255, 230, 230)
 GOLD = (255, 215, 0)
+INDIGO = (75, 0, 130)
 FONT_SIZE = 32
 BUTTON_WIDTH = 300
 BUTTON_HEIGHT = 60
 BUTTON_MARGIN = 20
 PROGRESS_BAR_HEIGHT = 20
+LEADERBOARD_ROWS = 10
+TEXT_CACHE_SIZE = 512  # Maximum number of rendered text surfaces kept alive
+BUTTON_FACE_CACHE_SIZE = 64  # Pre-rendered button faces kept alive
+BUTTON_RADIUS = 10
+PRESSED_SHADE = 0.8  # Pressed buttons are the hover color darkened by this factor
+
+# Set AWS_QUIZ_FULL_REDRAW=1 to redraw and flip the whole screen every frame
+FULL_REDRAW = os.environ.get("AWS_QUIZ_FULL_REDRAW", "") == "1"
+# Above this many particles, tracking one dirty rect per particle costs more than a flip
+DIRTY_RECT_PARTICLE_LIMIT = 1000
+DIRTY_CELL_SIZE = 32  # Animated areas are rebuilt in cells of this size so each pixel is rebuilt once
+CELEBRATION_COLORS = [GOLD, GREEN, BLUE, (255, 105, 180)]  # Gold, Green, Blue, Hot Pink
+# Pre-rendered text atlas, built with `python text_atlas.py`
+DEFAULT_ATLAS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ATLAS_FILE)
 
-# Quiz questions - each entry contains:
-# - Japanese full name (surname + given name)
-# - Correct AWS service
-# - Incorrect AWS service (similar but wrong)
-# - Optional explanation of the metaphorical connection
-QUIZ_QUESTIONS = [
-    {
-        "name": "高橋 龍",
-        "correct": "Amazon EC2",
-        "incorrect": "Amazon Lightsail",
-        "explanation": "高橋 (Takahashi) means 'high bridge', representing the connection to the cloud. 龍 (Ryu) means 'dragon', symbolizing EC2's powerful computing capabilities."
-    },
-    {
-        "name": "水野 清",
-        "correct": "Amazon RDS",
-        "incorrect": "Amazon DynamoDB",
-        "explanation": "水野 (Mizuno) contains 水 (water), while 清 (Sei) means 'clear/pure', representing how RDS handles data flow like a well-managed stream of information."
-    },
-    {
-        "name": "雲井 保",
-        "correct": "Amazon S3",
-        "incorrect": "Amazon EBS",
-        "explanation": "雲井 (Kumoi) contains 雲 (cloud), and 保 (Tamotsu) means 'to protect/preserve', representing S3's role in securely storing data in the cloud."
-    },
-    {
-        "name": "早河 道",
-        "correct": "Amazon CloudFront",
-        "incorrect": "Amazon Route 53",
-        "explanation": "早河 (Hayakawa) contains 早 (fast) and 河 (river), while 道 (Michi) means 'path/road', representing CloudFront's fast content delivery network."
-    },
-    {
-        "name": "監物 晴",
-        "correct": "Amazon CloudWatch",
-        "incorrect": "AWS Config",
-        "explanation": "監物 (Kenmotsu) contains 監 (supervise), and 晴 (Haru) means 'clear/bright', representing CloudWatch's monitoring capabilities that provide clear insights."
-    },
-    {
-        "name": "壁川 守",
-        "correct": "AWS WAF",
-        "incorrect": "AWS Shield",
-        "explanation": "壁川 (Kabekawa) contains 壁 (wall), and 守 (Mamoru) means 'to protect', representing WAF's role as a web application firewall that guards against threats."
-    },
-    {
-        "name": "氷室 永",
-        "correct": "Amazon Glacier",
-        "incorrect": "AWS Backup",
-        "explanation": "氷室 (Himuro) means 'ice room', and 永 (Hisashi) means 'eternal/long-lasting', representing Glacier's long-term cold storage capabilities."
-    },
-    {
-        "name": "関 計",
-        "correct": "AWS Lambda",
-        "incorrect": "AWS Fargate",
-        "explanation": "関 (Seki) means 'related/connection', and 計 (Kei) means 'calculate/measure', representing Lambda's function-based serverless computing."
-    },
-    {
-        "name": "智野 探",
-        "correct": "Amazon Athena",
-        "incorrect": "Amazon Redshift",
-        "explanation": "智野 (Tomono) contains 智 (wisdom), and 探 (Sagasu) means 'to search/explore', representing Athena's intelligent query service named after the Greek goddess of wisdom."
-    },
-    {
-        "name": "桜井 器",
-        "correct": "Amazon ECS",
-        "incorrect": "Amazon EKS",
-        "explanation": "桜井 (Sakurai) is a common Japanese surname, while 器 (Utsuwa) means 'container', representing Amazon ECS (Elastic Container Service)."
-    },
-    {
-        "name": "森 賢",
-        "correct": "Amazon SageMaker",
-        "incorrect": "Amazon Comprehend",
-        "explanation": "森 (Mori) means 'forest', and 賢 (Ken) means 'wisdom/intelligence', representing SageMaker's role in bringing wisdom (sage) and creating value from data forests."
-    },
-    {
-        "name": "大野 無",
-        "correct": "Amazon Aurora",
-        "incorrect": "Amazon Neptune",
-        "explanation": "大野 (Ohno) means 'big field', and 無 (Mu) means 'nothingness/infinity', representing Aurora's vast scalability and performance capabilities."
-    },
-    {
-        "name": "渡辺 信",
-        "correct": "Amazon SNS",
-        "incorrect": "Amazon SQS",
-        "explanation": "渡辺 (Watanabe) contains 渡 (to cross/transmit), and 信 (Shin) means 'message/trust', representing SNS's role in message transmission and notifications."
-    },
-    {
-        "name": "鍵山 秘",
-        "correct": "AWS KMS",
-        "incorrect": "AWS Secrets Manager",
-        "explanation": "鍵山 (Kagiyama) contains 鍵 (key), and 秘 (Hi) means 'secret', representing KMS's role in key management and encryption."
-    },
-    {
-        "name": "橋本 連",
-        "correct": "AWS Step Functions",
-        "incorrect": "AWS AppFlow",
-        "explanation": "橋本 (Hashimoto) contains 橋 (bridge), and 連 (Ren) means 'connect/link', representing Step Functions' role in coordinating multiple AWS services."
-    },
-    {
-        "name": "小川 流",
-        "correct": "Amazon Kinesis",
-        "incorrect": "Amazon MSK",
-        "explanation": "小川 (Ogawa) means 'small river', and 流 (Ryu) means 'flow/stream', representing Kinesis's role in real-time data streaming."
-    },
-    {
-        "name": "山田 索",
-        "correct": "Amazon Elasticsearch",
-        "incorrect": "Amazon CloudSearch",
-        "explanation": "山田 (Yamada) is a common Japanese surname, and 索 (Saku) means 'search', representing Elasticsearch's powerful search capabilities."
-    },
-    {
-        "name": "石川 築",
-        "correct": "AWS CloudFormation",
-        "incorrect": "AWS CDK",
-        "explanation": "石川 (Ishikawa) contains 石 (stone), and 築 (Chiku) means 'build/construct', representing CloudFormation's role in building infrastructure."
-    }
+# Results-screen tiers: minimum percentage, color, message, English message
+RESULT_TIERS = [
+    (80, GOLD, "素晴らしい! あなたはAWSマスターです!", "Excellent! You're an AWS master!"),
+    (60, INDIGO, "よくできました! AWSサービスをよく知っていますね!", "Good job! You know your AWS services well!"),
+    (0, BLUE, "頑張って! もっと勉強すればAWSマスターになれます!", "Keep learning! You'll master AWS services soon!"),
 ]
 
+
+def result_tier(percentage: float) -> Tuple[Tuple[int, int, int], str, str]:
+    """Return the color, message and English message for a final score percentage."""
+    for minimum, color, message, message_en in RESULT_TIERS:
+        if percentage >= minimum:
+            return color, message, message_en
+    return RESULT_TIERS[-1][1:]
+
+
+class TextRenderCache:
+    """LRU cache of rendered text surfaces shared by every render call in the game."""
+
+    def __init__(self, max_entries: int = TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._surfaces: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        # Optional pre-rendered atlas consulted before rasterizing
+        self.atlas: Optional[TextAtlas] = None
+
+    def render(self, font: pygame.font.Font, text: str, antialias: bool,
+               color: Tuple[int, int, int]) -> pygame.Surface:
+        """Return the rendered surface for text, rasterizing it only on a miss."""
+        key = (font, text, antialias, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = self.atlas.get(font, text, antialias, color) if self.atlas else None
+        if surface is None:
+            with FONT_LOCK:
+                surface = font.render(text, antialias, color)
+        self._store(key, surface)
+        return surface
+    
+    def _store(self, key: tuple, surface: pygame.Surface) -> None:
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+    
+    def prerender(self, font: pygame.font.Font, text: str, antialias: bool, color: Tuple[int, int, int],
+                  out: Dict[tuple, pygame.Surface]) -> pygame.Surface:
+        """Return the surface for text without touching the cache, rendering misses into out.
+        
+        Safe to call from a worker thread; adopt(out) later adds the new surfaces to the cache.
+        """
+        key = (font, text, antialias, tuple(color))
+        surface = self._surfaces.get(key) or out.get(key)
+        if surface is None:
+            surface = self.atlas.get(font, text, antialias, color) if self.atlas else None
+            if surface is None:
+                with FONT_LOCK:
+                    surface = font.render(text, antialias, color)
+            out[key] = surface
+        return surface
+    
+    def adopt(self, surfaces: Dict[tuple, pygame.Surface]) -> None:
+        """Add surfaces rendered by prerender() to the cache."""
+        for key, surface in surfaces.items():
+            if key not in self._surfaces:
+                self._store(key, surface)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current number of cached surfaces."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._surfaces),
+                "atlas_hits": self.atlas.hits if self.atlas else 0}
+
+    def reset_stats(self) -> None:
+        """Reset the hit/miss counters without dropping cached surfaces."""
+        self.hits = 0
+        self.misses = 0
+        if self.atlas:
+            self.atlas.hits = 0
+
+    def clear(self) -> None:
+        """Drop every cached surface."""
+        self._surfaces.clear()
+    
+    def invalidate(self, texts: Set[str]) -> int:
+        """Drop the cached surfaces of texts, in any font and color, and return how many were dropped."""
+        keys = [key for key in self._surfaces if key[1] in texts]
+        for key in keys:
+            del self._surfaces[key]
+        return len(keys)
+
+
+# Shared render cache used by QuizGame and Button
+TEXT_CACHE = TextRenderCache()
+
+
+def dirty_cells(rects: Iterable[pygame.Rect], bounds: pygame.Rect) -> List[pygame.Rect]:
+    """Return non-overlapping rows of cells that cover every rect, clipped to bounds."""
+    cells = set()
+    for rect in rects:
+        rect = rect.clip(bounds)
+        if not rect.width or not rect.height:
+            continue
+        for row in range(rect.top // DIRTY_CELL_SIZE, (rect.bottom - 1) // DIRTY_CELL_SIZE + 1):
+            for column in range(rect.left // DIRTY_CELL_SIZE, (rect.right - 1) // DIRTY_CELL_SIZE + 1):
+                cells.add((row, column))
+    # Merge neighbouring cells of a row into one rect to keep the blit count down
+    runs = []
+    for row, column in sorted(cells):
+        run = runs[-1] if runs else None
+        if run and run.top == row * DIRTY_CELL_SIZE and run.right == column * DIRTY_CELL_SIZE:
+            run.width += DIRTY_CELL_SIZE
+        else:
+            runs.append(pygame.Rect(column * DIRTY_CELL_SIZE, row * DIRTY_CELL_SIZE, DIRTY_CELL_SIZE, DIRTY_CELL_SIZE))
+    return [run.clip(bounds) for run in runs]
+
+
+def render_text(font: pygame.font.Font, text: str, antialias: bool,
+                color: Tuple[int, int, int]) -> pygame.Surface:
+    """Render text through the shared LRU cache."""
+    return TEXT_CACHE.render(font, text, antialias, color)
+
+
+def button_font() -> pygame.font.Font:
+    """Return the font shared by every button."""
+    return get_font(FONT_SIZE)
+
+
+def choice_layout(count: int) -> List[Tuple[int, int]]:
+    """Return the top-left corner of each answer button: one column for up to three, two columns beyond."""
+    if count <= 3:
+        x = (SCREEN_WIDTH - BUTTON_WIDTH) // 2
+        return [(x, SCREEN_HEIGHT // 2 + i * (BUTTON_HEIGHT + BUTTON_MARGIN)) for i in range(count)]
+    left = (SCREEN_WIDTH - 2 * BUTTON_WIDTH - BUTTON_MARGIN) // 2
+    positions = []
+    for i in range(count):
+        row, column = divmod(i, 2)
+        x = left + column * (BUTTON_WIDTH + BUTTON_MARGIN)
+        if column == 0 and i == count - 1:
+            # An odd last button is centered under the others
+            x = (SCREEN_WIDTH - BUTTON_WIDTH) // 2
+        positions.append((x, SCREEN_HEIGHT // 2 + row * (BUTTON_HEIGHT + BUTTON_MARGIN)))
+    return positions
+
+
+# Pre-rendered button faces by (size, text, colors, state), shared by every button
+_button_faces: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+
+
+def render_button_face(size: Tuple[int, int], color: Tuple[int, int, int],
+                       text_surface: pygame.Surface) -> pygame.Surface:
+    """Draw a rounded button of size with a centered label."""
+    # Corners outside the rounded rect stay transparent
+    face = pygame.Surface(size, pygame.SRCALPHA)
+    rect = face.get_rect()
+    pygame.draw.rect(face, color, rect, border_radius=BUTTON_RADIUS)
+    pygame.draw.rect(face, BLACK, rect, 2, border_radius=BUTTON_RADIUS)  # Button border
+    face.blit(text_surface, text_surface.get_rect(center=rect.center))
+    return face
+
+
+def store_button_face(key: tuple, face: pygame.Surface) -> None:
+    _button_faces[key] = face
+    if len(_button_faces) > BUTTON_FACE_CACHE_SIZE:
+        _button_faces.popitem(last=False)
+
+
 class Button:
-    """Button class for creating interactive buttons."""
+    """Interactive button drawn from pre-rendered normal, hover and pressed faces."""
     
-    def __init__(self, x: int, y: int, width: int, height: int, text: str):
+    __slots__ = ("rect", "text", "color", "hover_color", "text_color", "hovered", "pressed", "font", "_faces")
+    
+    def __init__(self, x: int = 0, y: int = 0, width: int = BUTTON_WIDTH, height: int = BUTTON_HEIGHT,
+                 text: str = ""):
         self.rect = pygame.Rect(x, y, width, height)
-        self.text = text
-        self.color = GRAY
-        self.text_color = BLACK
-        self.font = pygame.font.SysFont(None, FONT_SIZE)
-        
+        self.font = button_font()
+        self.text = None
+        self._faces: List[Optional[pygame.Surface]] = [None, None, None]
+        self.configure(x, y, text)
+    
+    def configure(self, x: int, y: int, text: str, color: Tuple[int, int, int] = GRAY,
+                  hover_color: Tuple[int, int, int] = LIGHT_BLUE, text_color: Tuple[int, int, int] = BLACK) -> None:
+        """Reuse this button for a new label and position."""
+        if self.text is None or (text, color, hover_color, text_color) != \
+                (self.text, self.color, self.hover_color, self.text_color):
+            self.text = text
+            self.color = color
+            self.hover_color = hover_color
+            self.text_color = text_color
+            self._faces[0] = self._faces[1] = self._faces[2] = None
+        self.rect.topleft = (x, y)
+        self.hovered = False
+        self.pressed = False
+    
+    @property
+    def state(self) -> int:
+        """Return 0 when normal, 1 when hovered and 2 when pressed."""
+        if self.hovered:
+            return 2 if self.pressed else 1
+        return 0
+    
     def draw(self, screen: pygame.Surface) -> None:
         """Draw the button on the screen."""
-        pygame.draw.rect(screen, self.color, self.rect, border_radius=10)
-        pygame.draw.rect(screen, BLACK, self.rect, 2, border_radius=10)  # Button border
+        state = self.state
+        face = self._faces[state]
+        if face is None:
+            face = self._faces[state] = self._render_face(state)
+        screen.blit(face, self.rect)
+    
+    def _render_face(self, state: int) -> pygame.Surface:
+        """Return the face for a state, rendering it only the first time any button needs it."""
+        if state == 0:
+            color = self.color
+        elif state == 1:
+            color = self.hover_color
+        else:
+            color = tuple(int(c * PRESSED_SHADE) for c in self.hover_color)
+        key = (self.rect.size, self.text, color, self.text_color, self.font)
+        face = _button_faces.get(key)
+        if face is not None:
+            _button_faces.move_to_end(key)
+            return face
         
-        text_surface = self.font.render(self.text, True, self.text_color)
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        screen.blit(text_surface, text_rect)
+        face = render_button_face(self.rect.size, color, render_text(self.font, self.text, True, self.text_color))
+        store_button_face(key, face)
+        return face
         
     def is_clicked(self, pos: Tuple[int, int]) -> bool:
         """Check if the button is clicked."""
@@ -175,128 +307,229 @@ class Button:
 class QuizGame:
     """Main quiz game class."""
     
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("AWS 人名クイズ")
+    def __init__(self, full_redraw: bool = FULL_REDRAW,
+                 particle_count: int = PARTICLE_PRESETS["default"],
+                 profiler: Optional[FrameProfiler] = None,
+                 question_bank: Optional[QuestionBank] = None,
+                 review_scheduler: Optional[SpacedRepetitionScheduler] = None,
+                 leaderboard: Optional[Leaderboard] = None, player_name: str = "Player",
+                 atlas_path: Optional[str] = DEFAULT_ATLAS_PATH,
+                 renderer: Optional[RendererBackend] = None,
+                 clock: Optional[Callable[[], int]] = None,
+                 telemetry: Optional[AnswerTelemetry] = None,
+                 prefetch: bool = True, choices: int = 2, watch_bank: bool = False):
+        # With the SDL2 renderer backend the screen is only an offscreen scratch surface
+        self.renderer = renderer
+        if renderer:
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("AWS 人名クイズ")
+        
+        # Retained-mode rendering: static elements are composed once per state
+        # change and only the regions touched by animations are pushed each frame
+        self.full_redraw = full_redraw
+        self.static_layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.base_layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.overlay_layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        if not renderer:
+            self.static_layer = self.static_layer.convert()
+            self.base_layer = self.base_layer.convert()
+            self.overlay_layer = self.overlay_layer.convert_alpha()
+        self.layer_key = None
+        self.layer_hover_state: List[int] = []
+        self.dirty_rects: List[pygame.Rect] = []
+        self.last_frame_blit_area = 0
+        
+        # Per-phase frame timing, shown as an overlay with F3
+        self.profiler = profiler or FrameProfiler()
         
         # Set up fonts with better size for title
         self.setup_fonts()
         
         # Adjust font size for title to ensure it fits
-        self.title_font = pygame.font.SysFont(self.font_name, FONT_SIZE + 5)
+        self.title_font = self.make_font(FONT_SIZE + 5)
         
-        # Get all available questions
-        self.all_questions = QUIZ_QUESTIONS.copy()
+        # Pre-rendered strings replace live rasterization when an atlas for these fonts exists
+        if atlas_path:
+            self.load_text_atlas(atlas_path)
         
-        # Select 5 random questions
-        self.select_random_questions()
+        # Millisecond clock for animations; replays substitute a simulated one
+        self.clock = clock or pygame.time.get_ticks
         
-        self.current_question_index = 0
-        self.score = 0
+        # Round state, progression and scoring live in the pygame-free engine
+        if clock:
+            self.engine = QuizEngine(question_bank, review_scheduler, clock=lambda: clock() / 1000, choices=choices)
+        else:
+            self.engine = QuizEngine(question_bank, review_scheduler, choices=choices)
         
-        self.buttons = []
-        self.next_button = None
+        # Optional persistent leaderboard; final scores are saved off the render thread
+        self.leaderboard = leaderboard
+        self.player_name = player_name
+        
+        # Optional answer-latency log, written off the render thread as well
+        self.telemetry = telemetry
+        
+        # Edits to a watched bank file are picked up between questions
+        self.watch_bank = watch_bank
+        
+        # The next question's text and buttons are rendered in the background during feedback
+        self.prefetcher = QuestionPrefetcher() if prefetch else None
+        
+        # Buttons are pooled and reconfigured for each question instead of recreated
+        self.buttons: List[Button] = []
+        self.answer_buttons: List[Button] = []
+        self.next_question_button = Button()
+        self.next_button: Optional[Button] = None
         self.feedback_text = ""
         self.feedback_color = BLACK
         self.explanation_text = ""
-        self.show_feedback = False
         self.background_color = WHITE
         
         # Celebration effects
-        self.celebration_particles = []
+        self.particle_count = particle_count
+        self.particles = ParticleSystem(SCREEN_WIDTH, SCREEN_HEIGHT, CELEBRATION_COLORS)
         self.celebration_active = False
-        self.celebration_start_time = 0
+        self.celebration_ticks = 0  # Simulation ticks since the celebration started
         self.celebration_duration = 3000  # 3 seconds in milliseconds
         
+        # Results-screen celebration, baked from a seed when the results screen is first drawn
+        self.results_effects: Optional[ResultsCelebration] = None
+        self.results_ticks = 0
+        
+        # Animations advance in fixed ticks however often frames are drawn; frames interpolate between ticks
+        self.timestep = FixedTimestep()
+        self.was_animating = False
+        
         # Try to load sound effects
         self.setup_sounds()
         
         self.setup_question()
     
-    def select_random_questions(self):
-        """Select 5 random questions from all available questions."""
-        # Make a copy of all questions
-        questions_pool = self.all_questions.copy()
-        random.shuffle(questions_pool)
-        
-        # Select the first 5 questions
-        self.questions = questions_pool[:5]
-        self.total_questions = len(self.questions)
+    # Round state is owned by the engine; these keep the renderer's reads short
+    @property
+    def questions(self) -> List[dict]:
+        return self.engine.questions
+    
+    @property
+    def total_questions(self) -> int:
+        return self.engine.total_questions
+    
+    @property
+    def current_question_index(self) -> int:
+        return self.engine.current_question_index
+    
+    @property
+    def score(self) -> int:
+        return self.engine.score
+    
+    @property
+    def show_feedback(self) -> bool:
+        return self.engine.phase == FEEDBACK
     
     def setup_fonts(self):
         """Set up fonts with Japanese support."""
+        start = time.perf_counter()
+        
         # Try to find a Japanese font
         japanese_fonts = [
             'Yu Gothic', 'MS Gothic', 'Meiryo', 'Noto Sans CJK JP', 
             'Hiragino Sans GB', 'Arial Unicode MS', 'NanumGothic'
         ]
         
-        # Check if any Japanese fonts are available
-        available_fonts = pygame.font.get_fonts()
-        font_found = False
-        self.font_name = None
-        
-        for font_name in japanese_fonts:
-            # Check for partial matches in available fonts
-            for available_font in available_fonts:
-                if font_name.lower() in available_font.lower():
-                    self.font_name = available_font
-                    self.font_large = pygame.font.SysFont(available_font, FONT_SIZE + 10)
-                    self.font_medium = pygame.font.SysFont(available_font, FONT_SIZE)
-                    self.font_small = pygame.font.SysFont(available_font, FONT_SIZE - 10)
-                    font_found = True
-                    print(f"Using font: {available_font}")
-                    break
-            
-            if font_found:
-                break
+        # The resolved font file is cached on disk until the installed fonts change
+        self.font_name, self.font_path, cache_hit = resolve_font(japanese_fonts)
         
-        # If no Japanese font found, try to use the default font
-        if not font_found:
-            try:
-                # Try to use a system font that might support Japanese
-                self.font_name = None
-                self.font_large = pygame.font.SysFont(None, FONT_SIZE + 10)
-                self.font_medium = pygame.font.SysFont(None, FONT_SIZE)
-                self.font_small = pygame.font.SysFont(None, FONT_SIZE - 10)
+        try:
+            self.font_large = self.make_font(FONT_SIZE + 10)
+            self.font_medium = self.make_font(FONT_SIZE)
+            self.font_small = self.make_font(FONT_SIZE - 10)
+            if self.font_name:
+                print(f"Using font: {self.font_name}")
+            else:
                 print("Using default font. Japanese characters may not display correctly.")
-            except Exception as e:
-                print(f"Error setting up fonts: {e}")
-                # Last resort: use the default font
-                self.font_large = pygame.font.Font(None, FONT_SIZE + 10)
-                self.font_medium = pygame.font.Font(None, FONT_SIZE)
-                self.font_small = pygame.font.Font(None, FONT_SIZE - 10)
+        except Exception as e:
+            print(f"Error setting up fonts: {e}")
+            # Last resort: use the default font
+            self.font_name = None
+            self.font_path = None
+            self.font_large = pygame.font.Font(None, FONT_SIZE + 10)
+            self.font_medium = pygame.font.Font(None, FONT_SIZE)
+            self.font_small = pygame.font.Font(None, FONT_SIZE - 10)
+        
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"Fonts set up in {elapsed_ms:.1f} ms (font cache {'hit' if cache_hit else 'miss'})")
+    
+    def make_font(self, size: int) -> pygame.font.Font:
+        """Return the shared font of the given size from the resolved Japanese font."""
+        return get_font(size, self.font_path, self.font_name)
+    
+    def font_roles(self) -> Dict[str, pygame.font.Font]:
+        """Return the fonts that static text is drawn with, by text atlas role."""
+        return {
+            "title": self.title_font,
+            "large": self.font_large,
+            "medium": self.font_medium,
+            "small": self.font_small,
+            "button": button_font(),
+        }
+    
+    def font_atlas_signature(self) -> bytes:
+        """Return the signature a text atlas must have been baked with to match these fonts."""
+        font = self.font_path or self.font_name
+        return font_signature({
+            "title": (font, FONT_SIZE + 5),
+            "large": (font, FONT_SIZE + 10),
+            "medium": (font, FONT_SIZE),
+            "small": (font, FONT_SIZE - 10),
+            "button": (None, FONT_SIZE),
+        })
+    
+    def load_text_atlas(self, path: str) -> None:
+        """Memory-map a baked text atlas into the shared text cache if it matches the fonts."""
+        try:
+            atlas = TextAtlas(path, self.font_roles(), self.font_atlas_signature())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Not using text atlas {path}: {e}")
+            return
+        TEXT_CACHE.atlas = atlas
+        print(f"Loaded {len(atlas)} pre-rendered strings from {path}")
+    
+    def atlas_texts(self, questions) -> Iterator[AtlasText]:
+        """Yield every fixed string draw_static and the buttons can show, for baking into an atlas."""
+        yield "title", "AWS 人名クイズ", True, BLUE
+        yield "medium", "この名前は何のAWSサービス？", True, BLACK
+        yield "medium", "正解!", True, GREEN
+        yield "small", "リスタート: R キー / 終了: Q キー", True, BLACK
+        yield "button", "Next Question", True, WHITE
+        
+        total = min(QUESTIONS_PER_GAME, len(questions))
+        for number in range(1, total + 1):
+            yield "small", f"問題 {number}/{total}", True, BLACK
+        for score in range(total + 1):
+            color, message, message_en = result_tier(score / total * 100 if total else 0)
+            yield "small", f"スコア: {score}/{total}", True, BLACK
+            yield "large", f"最終スコア: {score}/{total}", True, color
+            yield "medium", message, True, color
+            yield "small", message_en, True, color
+        
+        for question in questions:
+            yield "large", question["name"], True, BLUE
+            yield "button", question["correct"], True, BLACK
+            yield "button", question["incorrect"], True, BLACK
+            yield "medium", f"不正解! 正解は {question['correct']} です。", True, RED
+            for line in self._wrap_text(question["explanation"], self.font_small, SCREEN_WIDTH - 100):
+                yield "small", line, True, BLACK
     
     def setup_sounds(self):
         """Set up sound effects."""
         self.sound_available = False
         try:
-            # Create simple sound files if they don't exist
-            if not os.path.exists("correct.wav") and not os.path.exists("incorrect.wav"):
-                try:
-                    import numpy as np
-                    from scipy.io import wavfile
-                    
-                    # Create a simple "correct" sound (higher frequency)
-                    sample_rate = 44100
-                    duration = 0.5
-                    t = np.linspace(0, duration, int(sample_rate * duration))
-                    correct_data = np.sin(2 * np.pi * 880 * t) * 0.5
-                    wavfile.write("correct.wav", sample_rate, correct_data.astype(np.float32))
-                    
-                    # Create a simple "incorrect" sound (lower frequency)
-                    incorrect_data = np.sin(2 * np.pi * 220 * t) * 0.5
-                    wavfile.write("incorrect.wav", sample_rate, incorrect_data.astype(np.float32))
-                    
-                    print("Created sound effect files.")
-                except ImportError:
-                    print("NumPy and SciPy required to generate sound files.")
-                except Exception as e:
-                    print(f"Error creating sound files: {e}")
-            
-            # Try to load the sound files
-            self.correct_sound = pygame.mixer.Sound("correct.wav")
-            self.incorrect_sound = pygame.mixer.Sound("incorrect.wav")
+            # Synthesize the effects in memory; repeated calls reuse the cached sounds
+            self.correct_sound = make_sound(CORRECT_CHIME)
+            self.incorrect_sound = make_sound(INCORRECT_TONE)
             self.sound_available = True
             print("Sound effects loaded successfully.")
         except Exception as e:
@@ -304,403 +537,851 @@ class QuizGame:
             self.sound_available = False
         
     def setup_question(self) -> None:
-        """Set up the current question and answer buttons."""
-        if self.current_question_index >= self.total_questions:
-            return
-            
-        question = self.questions[self.current_question_index]
-        
-        # Create buttons for answers
-        self.buttons = []
+        """Set up the answer buttons for the engine's current question."""
+        self.buttons.clear()
         self.next_button = None
         self.background_color = WHITE
         
-        # Randomly decide button positions for correct and incorrect answers
-        if random.choice([True, False]):
-            correct_button = Button(
-                (SCREEN_WIDTH - BUTTON_WIDTH) // 2,
-                SCREEN_HEIGHT // 2,
-                BUTTON_WIDTH, BUTTON_HEIGHT,
-                question["correct"]
-            )
-            incorrect_button = Button(
-                (SCREEN_WIDTH - BUTTON_WIDTH) // 2,
-                SCREEN_HEIGHT // 2 + BUTTON_HEIGHT + BUTTON_MARGIN,
-                BUTTON_WIDTH, BUTTON_HEIGHT,
-                question["incorrect"]
-            )
-        else:
-            incorrect_button = Button(
-                (SCREEN_WIDTH - BUTTON_WIDTH) // 2,
-                SCREEN_HEIGHT // 2,
-                BUTTON_WIDTH, BUTTON_HEIGHT,
-                question["incorrect"]
-            )
-            correct_button = Button(
-                (SCREEN_WIDTH - BUTTON_WIDTH) // 2,
-                SCREEN_HEIGHT // 2 + BUTTON_HEIGHT + BUTTON_MARGIN,
-                BUTTON_WIDTH, BUTTON_HEIGHT,
-                question["correct"]
-            )
-            
-        self.buttons.append(correct_button)
-        self.buttons.append(incorrect_button)
+        # One button per choice, in the engine's shuffled order
+        choices = self.engine.choices
+        for choice, (x, y) in zip(choices, choice_layout(len(choices))):
+            if choice.id >= len(self.answer_buttons):
+                self.answer_buttons.append(Button())
+            button = self.answer_buttons[choice.id]
+            button.configure(x, y, choice.text)
+            self.buttons.append(button)
+        if self.telemetry and self.buttons:
+            self.telemetry.question_shown()
         
     def handle_click(self, pos: Tuple[int, int]) -> None:
         """Handle mouse click events."""
         if self.show_feedback:
             # If showing feedback, check if next button is clicked
             if self.next_button and self.next_button.is_clicked(pos):
-                self.show_feedback = False
                 self.celebration_active = False
-                self.celebration_particles = []
-                self.current_question_index += 1
-                if self.current_question_index < self.total_questions:
-                    self.setup_question()
+                self.particles.clear()
+                self.reload_bank()
+                self.engine.advance()
+                self.adopt_prefetched()
+                self.setup_question()
+                if self.is_results_screen():
+                    if self.leaderboard:
+                        self.leaderboard.submit(self.player_name, self.score, self.total_questions)
+                    if self.telemetry:
+                        self.telemetry.flush()
             return
-            
-        current_question = self.questions[self.current_question_index]
         
-        for button in self.buttons:
+        for choice_id, button in enumerate(self.buttons):
             if button.is_clicked(pos):
-                if button.text == current_question["correct"]:
-                    self.score += 1
-                    self.feedback_text = "正解!"
-                    self.feedback_color = GREEN
-                    self.background_color = LIGHT_GREEN
-                    
-                    # Start celebration effects
-                    self.celebration_active = True
-                    self.celebration_start_time = pygame.time.get_ticks()
-                    self.create_celebration_particles()
-                    
-                    if self.sound_available:
-                        self.correct_sound.play()
-                else:
-                    self.feedback_text = f"不正解! 正解は {current_question['correct']} です。"
-                    self.feedback_color = RED
-                    self.background_color = LIGHT_RED
-                    self.celebration_active = False
-                    if self.sound_available:
-                        self.incorrect_sound.play()
-                
-                self.explanation_text = current_question["explanation"]
-                self.show_feedback = True
-                
-                # Create next button with ASCII text
-                self.next_button = Button(
-                    (SCREEN_WIDTH - BUTTON_WIDTH) // 2,
-                    SCREEN_HEIGHT - 80,
-                    BUTTON_WIDTH, BUTTON_HEIGHT,
-                    "Next Question"
-                )
-                self.next_button.color = BLUE
-                self.next_button.text_color = WHITE
-                
+                question = self.engine.current_question
+                self.answer(choice_id)
+                # Questions deleted from a watched bank mid-round have no position to log
+                if self.telemetry and question["_position"] is not None:
+                    self.telemetry.record(question["_position"], self.engine.last_choice.correct, choice_id, pos)
                 break
-                
-    def update(self) -> None:
-        """Update game state."""
-        # Update celebration effects
-        if self.celebration_active:
-            self.update_celebration()
+    
+    def answer(self, choice_id: int) -> None:
+        """Answer the current question with a choice ID and show the feedback."""
+        current_question = self.engine.current_question
+        if self.engine.answer(choice_id):
+            self.feedback_text = "正解!"
+            self.feedback_color = GREEN
+            self.background_color = LIGHT_GREEN
             
-            # Check if celebration duration has passed
-            current_time = pygame.time.get_ticks()
-            if current_time - self.celebration_start_time > self.celebration_duration:
-                self.celebration_active = False
-                self.celebration_particles = []
+            # Start celebration effects
+            self.celebration_active = True
+            self.celebration_ticks = 0
+            self.create_celebration_particles()
+            
+            if self.sound_available:
+                self.correct_sound.play()
+        else:
+            self.feedback_text = f"不正解! 正解は {current_question['correct']} です。"
+            self.feedback_color = RED
+            self.background_color = LIGHT_RED
+            self.celebration_active = False
+            if self.sound_available:
+                self.incorrect_sound.play()
+        
+        self.explanation_text = current_question["explanation"]
+        
+        # Show the next button with ASCII text
+        self.next_button = self.next_question_button
+        self.next_button.configure(
+            (SCREEN_WIDTH - BUTTON_WIDTH) // 2,
+            SCREEN_HEIGHT - 80,
+            "Next Question",
+            color=BLUE,
+            hover_color=(100, 149, 237),  # Cornflower blue
+            text_color=WHITE
+        )
+        self.prefetch_next_question()
+    
+    def _prefetch_key(self, index: int) -> tuple:
+        question = self.questions[index]
+        return (index, question["name"], question["correct"], question["incorrect"])
+    
+    def prefetch_next_question(self) -> None:
+        """Start rendering the next question's assets while the feedback is on screen."""
+        index = self.current_question_index + 1
+        if not self.prefetcher or index >= self.total_questions:
+            return
+        question = self.questions[index]
+        score, total = self.score, self.total_questions
+        # Distractors are picked here: the index is not shared with the prefetch thread
+        choices = self.engine.choice_texts(question)
+        self.prefetcher.submit(self._prefetch_key(index),
+                               lambda: self._prepare_question_assets(question, index, score, total, choices))
+    
+    def _prepare_question_assets(self, question: dict, index: int, score: int, total: int,
+                                 choices: List[str]) -> PreparedAssets:
+        """Render everything draw_static() needs for a question and its feedback; runs on the prefetch thread."""
+        texts: Dict[tuple, pygame.Surface] = {}
+        faces: Dict[tuple, pygame.Surface] = {}
+        lines: Dict[tuple, Tuple[str, ...]] = {}
+        
+        def text(font: pygame.font.Font, string: str, color: Tuple[int, int, int]) -> pygame.Surface:
+            return TEXT_CACHE.prerender(font, string, True, color, texts)
+        
+        # The question screen
+        text(self.font_large, question["name"], BLUE)
+        text(self.font_small, f"問題 {index + 1}/{total}", BLACK)
+        # The score before and after answering it
+        for shown_score in (score, score + 1):
+            text(self.font_small, f"スコア: {shown_score}/{total}", BLACK)
+        # Every choice in the normal and hover colors, whichever position it is shuffled into
+        font = button_font()
+        size = (BUTTON_WIDTH, BUTTON_HEIGHT)
+        for choice in choices:
+            for color in (GRAY, LIGHT_BLUE):
+                key = (size, choice, color, BLACK, font)
+                if key not in _button_faces:
+                    faces[key] = render_button_face(size, color, text(font, choice, BLACK))
+        
+        # Its feedback screen
+        text(self.font_medium, f"不正解! 正解は {question['correct']} です。", RED)
+        width = SCREEN_WIDTH - 100
+        wrapped = TEXT_LAYOUT.break_lines(question["explanation"], self.font_small, width)
+        lines[(question["explanation"], self.font_small, width)] = wrapped
+        for line in wrapped:
+            text(self.font_small, line, BLACK)
+        return PreparedAssets(texts, faces, lines)
+    
+    def adopt_prefetched(self) -> None:
+        """Move the prefetched assets of the current question into the shared caches."""
+        if not self.prefetcher or self.is_results_screen():
+            return
+        assets = self.prefetcher.take(self._prefetch_key(self.current_question_index))
+        if assets is None:
+            # Not ready yet: the screen renders whatever is missing itself
+            return
+        TEXT_CACHE.adopt(assets.texts)
+        for key, face in assets.faces.items():
+            if key not in _button_faces:
+                store_button_face(key, face)
+        for (text, font, width), lines in assets.lines.items():
+            TEXT_LAYOUT.insert(text, font, width, lines)
+                
+    def read_pointer(self) -> Tuple[Tuple[int, int], bool]:
+        """Return the mouse position in game coordinates and whether the left button is held."""
+        pos = pygame.mouse.get_pos()
+        if self.renderer:
+            pos = self.renderer.window_to_logical(pos)
+        return pos, pygame.mouse.get_pressed()[0]
+    
+    def update(self, pointer: Optional[Tuple[Tuple[int, int], bool]] = None) -> None:
+        """Update game state, using pointer instead of the live mouse when given."""
+        pos, pressed = pointer or self.read_pointer()
+        self.update_hover(pos, pressed)
+        
+        animating = self.is_animating()
+        if animating and self.was_animating:
+            for _ in range(self.timestep.advance(self.clock())):
+                self.simulate_tick()
+        else:
+            # Time spent idle, or before an animation started, is not simulated
+            self.timestep.reset(self.clock())
+        self.was_animating = animating
+    
+    def simulate_tick(self) -> None:
+        """Advance every animation by one fixed simulation tick."""
+        self.update_celebration()
+        if self.results_celebration_active():
+            self.results_ticks += 1
             
     def create_celebration_particles(self):
         """Create particles for celebration effect."""
-        self.celebration_particles = []
-        for _ in range(100):  # Create 100 particles
-            particle = {
-                'x': random.randint(0, SCREEN_WIDTH),
-                'y': random.randint(0, SCREEN_HEIGHT),
-                'size': random.randint(5, 15),
-                'color': random.choice([GOLD, GREEN, BLUE, (255, 105, 180)]),  # Gold, Green, Blue, Hot Pink
-                'speed_x': random.uniform(-3, 3),
-                'speed_y': random.uniform(-3, 3)
-            }
-            self.celebration_particles.append(particle)
+        self.particles.spawn(self.particle_count)
     
     def update_celebration(self):
-        """Update celebration particles."""
+        """Move the celebration particles one tick and end the celebration when its time is up."""
         if not self.celebration_active:
             return
             
-        # Update particle positions
-        for particle in self.celebration_particles:
-            particle['x'] += particle['speed_x']
-            particle['y'] += particle['speed_y']
-            
-            # Bounce off edges
-            if particle['x'] <= 0 or particle['x'] >= SCREEN_WIDTH:
-                particle['speed_x'] *= -1
-            if particle['y'] <= 0 or particle['y'] >= SCREEN_HEIGHT:
-                particle['speed_y'] *= -1
+        self.particles.update()
+        self.celebration_ticks += 1
+        if self.celebration_ticks * self.timestep.step_ms > self.celebration_duration:
+            self.celebration_active = False
+            self.particles.clear()
                 
-    def draw_celebration_particles(self):
-        """Draw celebration particle effects."""
+    def draw_celebration_particles(self, return_rects: bool = False) -> List[pygame.Rect]:
+        """Draw celebration particle effects and optionally return the screen areas touched."""
         if not self.celebration_active:
-            return
+            return []
             
-        # Draw particles
-        for particle in self.celebration_particles:
-            pygame.draw.circle(
-                self.screen,
-                particle['color'],
-                (int(particle['x']), int(particle['y'])),
-                particle['size']
-            )
+        return self.particles.draw(self.screen, return_rects, self.timestep.alpha)
             
-    def draw_celebration_text(self):
-        """Draw celebration text effect."""
+    def draw_celebration_text(self) -> Optional[pygame.Rect]:
+        """Draw celebration text effect and return the screen area touched."""
+        celebration = self.celebration_text()
+        if celebration is None:
+            return None
+        celebration_text, celebration_rect = celebration
+        self.screen.blit(celebration_text, celebration_rect)
+        return celebration_rect
+    
+    def celebration_text(self) -> Optional[Tuple[pygame.Surface, pygame.Rect]]:
+        """Return the pulsing celebration text and where to draw it, or None when hidden."""
         if not self.celebration_active:
-            return
+            return None
             
         # Draw celebratory text
-        elapsed_time = pygame.time.get_ticks() - self.celebration_start_time
+        elapsed_time = self.timestep.elapsed_ms(self.celebration_ticks)
         if elapsed_time < 2000:  # Show text for 2 seconds
             # Make text pulse/grow
             scale = 1.0 + 0.2 * abs(math.sin(elapsed_time / 200))
             size = int(FONT_SIZE * 1.5 * scale)
             
-            # Create a larger font for the celebration text
-            celebration_font = pygame.font.SysFont(self.font_name, size)
+            # The font registry keeps one font per pulse size, so the text cache can hit
+            celebration_font = self.make_font(size)
             
             # Main text with gold color (no shadow)
-            celebration_text = celebration_font.render("素晴らしい!", True, GOLD)
-            celebration_rect = celebration_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 4))
-            self.screen.blit(celebration_text, celebration_rect)
+            celebration_text = render_text(celebration_font, "素晴らしい!", True, GOLD)
             celebration_rect = celebration_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 4))
-            self.screen.blit(celebration_text, celebration_rect)
-                
-    def draw(self) -> None:
-        """Draw the game screen."""
-        # Set background color - special colors for results screen
-        if self.current_question_index >= self.total_questions:
+            return celebration_text, celebration_rect
+        return None
+    
+    def is_results_screen(self) -> bool:
+        """Return True once every question in the round has been answered."""
+        return self.engine.is_finished()
+    
+    def get_background_color(self) -> Tuple[int, int, int]:
+        """Return the background color for the current screen."""
+        if self.is_results_screen():
             # Set background color based on score for the results screen
-            percentage = (self.score / self.total_questions) * 100
+            percentage = self.engine.percentage()
             if percentage >= 80:
-                self.screen.fill((255, 250, 205))  # Light golden yellow
+                return (255, 250, 205)  # Light golden yellow
             elif percentage >= 60:
-                self.screen.fill((230, 230, 250))  # Lavender
+                return (230, 230, 250)  # Lavender
             else:
-                self.screen.fill((240, 248, 255))  # Alice blue
+                return (240, 248, 255)  # Alice blue
+        # Normal background for questions
+        return self.background_color
+    
+    def results_celebration_active(self) -> bool:
+        """Return True if the results screen shows the high-score celebration."""
+        return self.is_results_screen() and self.engine.percentage() >= 80
+    
+    def update_hover(self, pos: Tuple[int, int], pressed: bool = False) -> None:
+        """Update the hover and pressed state of the visible buttons."""
+        for button in self.visible_buttons():
+            button.hovered = button.rect.collidepoint(pos)
+            button.pressed = pressed
+    
+    def is_animating(self) -> bool:
+        """Return True while any animation needs frames at a fixed rate."""
+        return self.celebration_active or self.results_celebration_active()
+    
+    def visible_buttons(self) -> List["Button"]:
+        """Return the buttons drawn on the current screen."""
+        if self.is_results_screen():
+            return []
+        if self.show_feedback:
+            return [self.next_button] if self.next_button else []
+        return self.buttons
+    
+    def draw(self) -> None:
+        """Draw the game screen."""
+        if self.renderer:
+            self._draw_renderer()
+        elif self.full_redraw:
+            self._draw_full()
+        else:
+            self._draw_retained()
+    
+    def _draw_full(self) -> None:
+        """Redraw every element and flip the whole display."""
+        profiler = self.profiler
+        profiler.push("background")
+        self.screen.fill(self.get_background_color())
+        profiler.pop()
+        
+        # Draw celebration effects (behind everything else)
+        profiler.push("particles")
+        self.draw_celebration_particles()
+        profiler.pop()
+        if self.results_celebration_active():
+            profiler.push("results_celebration")
+            self.get_results_effects().draw_base(self.screen)
+            self.draw_results_celebration()
+            profiler.pop()
+        
+        self.draw_static(self.screen)
+        
+        # Draw celebration text effect for correct answers (on top of everything)
+        profiler.push("text")
+        self.draw_celebration_text()
+        profiler.pop()
+        
+        if profiler.overlay_visible:
+            profiler.push("overlay")
+            profiler.draw_overlay(self.screen)
+            profiler.pop()
+        
+        profiler.push("present")
+        pygame.display.flip()
+        profiler.pop()
+        self.last_frame_blit_area = SCREEN_WIDTH * SCREEN_HEIGHT
+        # Force a recompose if the retained path is switched back on
+        self.layer_key = None
+    
+    def _layer_key(self) -> tuple:
+        """Return a key that changes whenever the static layers must be recomposed."""
+        return (
+            self.current_question_index, self.total_questions, self.score,
+            self.show_feedback, self.background_color, self.feedback_text,
+            self.explanation_text, self.engine.current_question and self.engine.current_question["name"],
+            tuple(button.text for button in self.visible_buttons()),
+        )
+    
+    def _compose_layers(self) -> None:
+        """Compose the static layers for the current state."""
+        # Transparent pixels carry the background color so antialiased edges blend cleanly
+        self.overlay_layer.fill((*self.get_background_color(), 0))
+        self.draw_static(self.overlay_layer)
+        # The base layer holds everything under the animations, so animated areas
+        # can be rebuilt from it and have the text blended over them exactly once
+        self.base_layer.fill(self.get_background_color())
+        if self.results_celebration_active():
+            # The gold dots never move, so they are part of the static layers
+            self.get_results_effects().draw_base(self.base_layer)
+        self.static_layer.blit(self.base_layer, (0, 0))
+        self.static_layer.blit(self.overlay_layer, (0, 0))
+        self.layer_hover_state = [button.state for button in self.visible_buttons()]
+    
+    def _refresh_hovered_buttons(self) -> List[pygame.Rect]:
+        """Redraw buttons whose hover state changed into the static layers."""
+        rects = []
+        buttons = self.visible_buttons()
+        for i, button in enumerate(buttons):
+            if button.state == self.layer_hover_state[i]:
+                continue
+            self.layer_hover_state[i] = button.state
+            self.static_layer.fill(self.get_background_color(), button.rect)
+            button.draw(self.static_layer)
+            self.overlay_layer.fill((*self.get_background_color(), 0), button.rect)
+            button.draw(self.overlay_layer)
+            rects.append(button.rect.copy())
+        return rects
+    
+    def _draw_retained(self) -> None:
+        """Draw cached static layers and push only the regions that changed."""
+        profiler = self.profiler
+        screen_rect = self.screen.get_rect()
+        key = self._layer_key()
+        profiler.push("background")
+        if key != self.layer_key:
+            self.layer_key = key
+            self._compose_layers()
+            self.screen.blit(self.static_layer, (0, 0))
+            restored = [screen_rect]
         else:
-            # Normal background for questions
-            self.screen.fill(self.background_color)
+            # Restore everything the dynamic elements covered last frame
+            profiler.push("buttons")
+            hover_rects = self._refresh_hovered_buttons()
+            profiler.pop()
+            restored = self.dirty_rects + hover_rects
+            self.screen.blits([(self.static_layer, rect, rect) for rect in restored], doreturn=False)
+        profiler.pop()
         
-        # Draw celebration effects for correct answers (behind everything else)
-        if self.celebration_active:
+        dynamic = []
+        sprites = []
+        if self.results_celebration_active():
+            phase = "results_celebration"
+            sprites = self.get_results_effects().star_sprites(self.timestep.elapsed_ms(self.results_ticks))
+        elif self.celebration_active and len(self.particles) > DIRTY_RECT_PARTICLE_LIMIT:
+            # Too many particles to track individually: redraw the whole frame
+            profiler.push("particles")
+            self.screen.blit(self.base_layer, (0, 0))
             self.draw_celebration_particles()
+            self.screen.blit(self.overlay_layer, (0, 0))
+            profiler.pop()
+            dynamic.append(screen_rect)
+        elif self.celebration_active:
+            phase = "particles"
+            sprites = list(self.particles.sprites(self.timestep.alpha))
+        if sprites:
+            profiler.push(phase)
+            # Rebuild the animated cells from the base layer, then put the static text back on top
+            cells = dirty_cells([pygame.Rect(corner, sprite.get_size()) for sprite, corner in sprites], screen_rect)
+            self.screen.blits([(self.base_layer, rect, rect) for rect in cells], doreturn=False)
+            self.screen.blits(sprites, doreturn=False)
+            self.screen.blits([(self.overlay_layer, rect, rect) for rect in cells], doreturn=False)
+            profiler.pop()
+            dynamic.extend(cells)
+        
+        profiler.push("text")
+        text_rect = self.draw_celebration_text()
+        profiler.pop()
+        if text_rect:
+            dynamic.append(text_rect.clip(screen_rect))
+        
+        if profiler.overlay_visible:
+            profiler.push("overlay")
+            dynamic.append(profiler.draw_overlay(self.screen))
+            profiler.pop()
+        
+        profiler.push("present")
+        self.dirty_rects = dynamic
+        updated = restored + dynamic
+        if screen_rect in updated:
+            pygame.display.flip()
+            self.last_frame_blit_area = SCREEN_WIDTH * SCREEN_HEIGHT
+        else:
+            pygame.display.update(updated)
+            self.last_frame_blit_area = sum(rect.width * rect.height for rect in updated)
+        profiler.pop()
+    
+    def _draw_renderer(self) -> None:
+        """Composite the frame from textures with the SDL2 renderer backend."""
+        profiler = self.profiler
+        renderer = self.renderer
+        results_celebration = self.results_celebration_active()
+        profiler.push("background")
+        key = self._layer_key()
+        if key != self.layer_key:
+            self.layer_key = key
+            self._compose_layers()
+            renderer.set_layer("static", self.static_layer)
+            renderer.set_layer("overlay", self.overlay_layer)
+            if results_celebration:
+                # Background and gold dots without the text, for the stars to go between
+                renderer.set_layer("base", self.base_layer)
+        else:
+            profiler.push("buttons")
+            for rect in self._refresh_hovered_buttons():
+                renderer.set_layer("static", self.static_layer, rect)
+                renderer.set_layer("overlay", self.overlay_layer, rect)
+            profiler.pop()
+        renderer.clear(self.get_background_color())
+        profiler.pop()
+        
+        # Animations are drawn under the text layer, so text is blended once, as in a full redraw
+        if results_celebration:
+            profiler.push("results_celebration")
+            renderer.draw_layer("base")
+            elapsed_time = self.timestep.elapsed_ms(self.results_ticks)
+            renderer.blits(self.get_results_effects().star_sprites(elapsed_time))
+            renderer.draw_layer("overlay")
+            profiler.pop()
+        elif self.celebration_active and len(self.particles):
+            profiler.push("particles")
+            if len(self.particles) > DIRTY_RECT_PARTICLE_LIMIT:
+                renderer.composite(self.particles.sprites(self.timestep.alpha))
+            else:
+                renderer.blits(self.particles.sprites(self.timestep.alpha))
+            renderer.draw_layer("overlay")
+            profiler.pop()
+        else:
+            profiler.push("background")
+            renderer.draw_layer("static")
+            profiler.pop()
+        
+        profiler.push("text")
+        celebration = self.celebration_text()
+        if celebration:
+            renderer.blit(celebration[0], celebration[1].topleft)
+        profiler.pop()
+        
+        if profiler.overlay_visible:
+            profiler.push("overlay")
+            renderer.blit_region(self.screen, profiler.draw_overlay(self.screen))
+            profiler.pop()
+        
+        profiler.push("present")
+        renderer.present()
+        profiler.pop()
+        # The whole frame is composited on the GPU
+        self.last_frame_blit_area = SCREEN_WIDTH * SCREEN_HEIGHT
+    
+    def draw_static(self, surface: pygame.Surface) -> None:
+        """Draw every element that only changes with the game state."""
+        profiler = self.profiler
+        profiler.push("text")
         
         # Draw game title
-        title_text = self.title_font.render("AWS 人名クイズ", True, BLUE)
+        title_text = render_text(self.title_font, "AWS 人名クイズ", True, BLUE)
         title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, 50))
-        self.screen.blit(title_text, title_rect)
+        surface.blit(title_text, title_rect)
         
         # Draw score
-        score_text = self.font_small.render(f"スコア: {self.score}/{self.total_questions}", True, BLACK)
-        self.screen.blit(score_text, (20, 20))
-        
-        # Draw progress bar
-        if self.current_question_index < self.total_questions:
-            self.draw_progress_bar()
+        score_text = render_text(self.font_small, f"スコア: {self.score}/{self.total_questions}", True, BLACK)
+        surface.blit(score_text, (20, 20))
         
-        if self.current_question_index < self.total_questions:
+        if not self.is_results_screen():
+            # Draw progress bar
+            profiler.push("progress_bar")
+            self.draw_progress_bar(surface)
+            profiler.pop()
+            
             # Draw current question
             question = self.questions[self.current_question_index]
-            question_text = self.font_medium.render(f"この名前は何のAWSサービス？", True, BLACK)
+            question_text = render_text(self.font_medium, f"この名前は何のAWSサービス？", True, BLACK)
             question_rect = question_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 4 + 30))
-            self.screen.blit(question_text, question_rect)
+            surface.blit(question_text, question_rect)
             
             # Draw the Japanese name
-            name_text = self.font_large.render(question["name"], True, BLUE)
+            name_text = render_text(self.font_large, question["name"], True, BLUE)
             name_rect = name_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 3 + 20))
-            self.screen.blit(name_text, name_rect)
+            surface.blit(name_text, name_rect)
             
             # Draw buttons if not showing feedback
             if not self.show_feedback:
+                profiler.push("buttons")
                 for button in self.buttons:
-                    button.draw(self.screen)
+                    button.draw(surface)
+                profiler.pop()
             else:
                 # Draw feedback without clearing the question area
                 
                 # Draw feedback
-                feedback_text = self.font_medium.render(self.feedback_text, True, self.feedback_color)
+                feedback_text = render_text(self.font_medium, self.feedback_text, True, self.feedback_color)
                 feedback_rect = feedback_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
-                self.screen.blit(feedback_text, feedback_rect)
+                surface.blit(feedback_text, feedback_rect)
                 
                 # Draw explanation
                 lines = self._wrap_text(self.explanation_text, self.font_small, SCREEN_WIDTH - 100)
                 for i, line in enumerate(lines):
-                    line_text = self.font_small.render(line, True, BLACK)
+                    line_text = render_text(self.font_small, line, True, BLACK)
                     line_rect = line_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 40 + i * 30))
-                    self.screen.blit(line_text, line_rect)
+                    surface.blit(line_text, line_rect)
                 
                 # Draw next button
                 if self.next_button:
-                    self.next_button.draw(self.screen)
-                    
-                # Draw celebration text effect for correct answers (on top of everything)
-                if self.celebration_active:
-                    self.draw_celebration_text()
+                    profiler.push("buttons")
+                    self.next_button.draw(surface)
+                    profiler.pop()
         else:
-            # Draw final score with special effects
-            percentage = (self.score / self.total_questions) * 100
-            
-            # Draw golden particles for high scores
-            if percentage >= 80:
-                self.draw_results_celebration()
-            
             # Draw final score with appropriate color
-            if percentage >= 80:
-                score_color = GOLD
-            elif percentage >= 60:
-                score_color = (75, 0, 130)  # Indigo
-            else:
-                score_color = BLUE
-                
-            final_text = self.font_large.render(f"最終スコア: {self.score}/{self.total_questions}", True, score_color)
+            score_color, message, message_en = result_tier(self.engine.percentage())
+            message_color = score_color
+            
+            final_text = render_text(self.font_large, f"最終スコア: {self.score}/{self.total_questions}", True, score_color)
             final_rect = final_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
-            self.screen.blit(final_text, final_rect)
+            surface.blit(final_text, final_rect)
             
             # Draw message based on score
-            percentage = (self.score / self.total_questions) * 100
-            if percentage >= 80:
-                message = "素晴らしい! あなたはAWSマスターです!"
-                message_en = "Excellent! You're an AWS master!"
-                message_color = GOLD
-            elif percentage >= 60:
-                message = "よくできました! AWSサービスをよく知っていますね!"
-                message_en = "Good job! You know your AWS services well!"
-                message_color = (75, 0, 130)  # Indigo
-            else:
-                message = "頑張って! もっと勉強すればAWSマスターになれます!"
-                message_en = "Keep learning! You'll master AWS services soon!"
-                message_color = BLUE
-                
-            message_text = self.font_medium.render(message, True, message_color)
+            message_text = render_text(self.font_medium, message, True, message_color)
             message_rect = message_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20))
-            self.screen.blit(message_text, message_rect)
+            surface.blit(message_text, message_rect)
             
-            message_en_text = self.font_small.render(message_en, True, message_color)
+            message_en_text = render_text(self.font_small, message_en, True, message_color)
             message_en_rect = message_en_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 60))
-            self.screen.blit(message_en_text, message_en_rect)
+            surface.blit(message_en_text, message_en_rect)
             
             # Draw restart instruction
-            restart_text = self.font_small.render("リスタート: R キー / 終了: Q キー", True, BLACK)
+            restart_text = render_text(self.font_small, "リスタート: R キー / 終了: Q キー", True, BLACK)
             restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 120))
-            self.screen.blit(restart_text, restart_rect)
+            surface.blit(restart_text, restart_rect)
             
-        pygame.display.flip()
+            if self.leaderboard:
+                self.draw_leaderboard(surface)
+        
+        profiler.pop()
+    
+    def draw_leaderboard(self, surface: pygame.Surface) -> None:
+        """Draw the top scores in two columns below the results."""
+        # Reads only the in-memory index, so drawing never waits for the disk
+        entries = self.leaderboard.top(LEADERBOARD_ROWS)
+        rank = self.leaderboard.rank_of(self.player_name)
+        title = "ランキング"
+        if rank is not None:
+            title += f" (あなた: {rank}位 / {len(self.leaderboard)})"
+        title_text = render_text(self.font_small, title, True, BLUE)
+        surface.blit(title_text, title_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 160)))
+        
+        rows_per_column = (LEADERBOARD_ROWS + 1) // 2
+        for i, entry in enumerate(entries):
+            column, row = divmod(i, rows_per_column)
+            color = GOLD if entry.name == self.player_name else BLACK
+            line_text = render_text(self.font_small, f"{i + 1}. {entry.name}  {entry.score}/{entry.total}", True, color)
+            surface.blit(line_text, (100 + column * SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 180 + row * 22))
     
-    def draw_progress_bar(self):
+    def draw_progress_bar(self, surface: pygame.Surface):
         """Draw a progress bar showing current question number."""
         # Draw progress bar
         progress_bg_rect = pygame.Rect(50, 80, SCREEN_WIDTH - 100, PROGRESS_BAR_HEIGHT)
-        pygame.draw.rect(self.screen, GRAY, progress_bg_rect, border_radius=5)
+        pygame.draw.rect(surface, GRAY, progress_bg_rect, border_radius=5)
         
         # Calculate progress
         progress_width = ((self.current_question_index) / self.total_questions) * (SCREEN_WIDTH - 100)
         progress_rect = pygame.Rect(50, 80, progress_width, PROGRESS_BAR_HEIGHT)
-        pygame.draw.rect(self.screen, LIGHT_BLUE, progress_rect, border_radius=5)
+        pygame.draw.rect(surface, LIGHT_BLUE, progress_rect, border_radius=5)
         
         # Draw segment markers
         segment_width = (SCREEN_WIDTH - 100) / self.total_questions
         for i in range(self.total_questions + 1):
             x_pos = 50 + i * segment_width
-            pygame.draw.line(self.screen, BLACK, (x_pos, 80), (x_pos, 80 + PROGRESS_BAR_HEIGHT), 2)
+            pygame.draw.line(surface, BLACK, (x_pos, 80), (x_pos, 80 + PROGRESS_BAR_HEIGHT), 2)
         
         # Draw question number
-        question_num_text = self.font_small.render(f"問題 {self.current_question_index + 1}/{self.total_questions}", True, BLACK)
+        question_num_text = render_text(self.font_small, f"問題 {self.current_question_index + 1}/{self.total_questions}", True, BLACK)
         question_num_rect = question_num_text.get_rect(center=(SCREEN_WIDTH // 2, 110))
-        self.screen.blit(question_num_text, question_num_rect)
+        surface.blit(question_num_text, question_num_rect)
         
     def _wrap_text(self, text: str, font: pygame.font.Font, max_width: int) -> List[str]:
         """Wrap text to fit within a certain width."""
-        words = text.split(' ')
-        lines = []
-        current_line = []
-        
-        for word in words:
-            test_line = ' '.join(current_line + [word])
-            if font.size(test_line)[0] <= max_width:
-                current_line.append(word)
-            else:
-                lines.append(' '.join(current_line))
-                current_line = [word]
-                
-        if current_line:
-            lines.append(' '.join(current_line))
-            
-        return lines
+        # Line breaks are memoized per (text, font, width), so repeated frames cost nothing
+        return list(TEXT_LAYOUT.wrap(text, font, max_width))
         
+    def reload_bank(self) -> None:
+        """Swap in edits to the bank file and drop the cached text that only the old versions used."""
+        if not self.watch_bank:
+            return
+        start = time.perf_counter()
+        try:
+            edited = self.engine.reload_bank()
+        except ValueError as e:
+            print(f"Could not reload question bank: {e}")
+            return
+        if edited is None:
+            return
+        stale: Set[str] = set()
+        for old, new in edited:
+            if old["name"] != new["name"]:
+                stale.add(old["name"])
+            if old["correct"] != new["correct"]:
+                stale.add(f"不正解! 正解は {old['correct']} です。")
+            if old["explanation"] != new["explanation"]:
+                stale.update(TEXT_LAYOUT.invalidate(old["explanation"]))
+        # Service names stay valid labels for other questions, so their surfaces and button faces are kept
+        dropped = TEXT_CACHE.invalidate(stale)
+        print(f"Reloaded question bank in {(time.perf_counter() - start) * 1000:.1f} ms: "
+              f"{len(edited)} questions of this round edited, {dropped} cached texts dropped")
+    
     def restart(self) -> None:
         """Restart the game."""
-        self.current_question_index = 0
-        self.score = 0
-        self.select_random_questions()
-        self.show_feedback = False
-        self.background_color = WHITE
+        self.reload_bank()
+        self.engine.restart()
         self.celebration_active = False
-        self.celebration_particles = []
+        self.particles.clear()
+        self.results_effects = None
         self.setup_question()
         
-    def draw_results_celebration(self):
-        """Draw celebration effects for high scores on the results screen."""
-        # Draw golden particles
-        for i in range(50):
-            x = random.randint(0, SCREEN_WIDTH)
-            y = random.randint(0, SCREEN_HEIGHT)
-            size = random.randint(3, 8)
-            pygame.draw.circle(self.screen, GOLD, (x, y), size)
-            
-        # Draw stars
-        for i in range(20):
-            x = random.randint(50, SCREEN_WIDTH - 50)
-            y = random.randint(50, SCREEN_HEIGHT - 50)
-            size = random.randint(10, 20)
-            self.draw_star(x, y, size, GOLD)
-    
-    def draw_star(self, x, y, size, color):
-        """Draw a star shape."""
-        points = []
-        for i in range(10):
-            angle = math.pi * 2 * i / 10
-            radius = size if i % 2 == 0 else size / 2
-            point_x = x + radius * math.sin(angle)
-            point_y = y + radius * math.cos(angle)
-            points.append((point_x, point_y))
-        pygame.draw.polygon(self.screen, color, points)
+    def get_results_effects(self) -> ResultsCelebration:
+        """Return the results celebration for this round, baking a new layout if needed."""
+        if self.results_effects is None:
+            # Seeded from the game's RNG so a seeded run always shows the same layout
+            self.results_effects = ResultsCelebration(SCREEN_WIDTH, SCREEN_HEIGHT, GOLD, seed=random.getrandbits(32))
+            self.results_ticks = 0
+        return self.results_effects
+    
+    def draw_results_celebration(self) -> List[pygame.Rect]:
+        """Draw the twinkling stars for high scores on the results screen and return their rects."""
+        elapsed_time = self.timestep.elapsed_ms(self.results_ticks)
+        return self.get_results_effects().draw_stars(self.screen, elapsed_time)
+
+
+def dispatch_events(game: QuizGame, events: List[pygame.event.Event]) -> bool:
+    """Handle one frame's input events; return False when the game should exit."""
+    running = True
+    for event in events:
+        if event.type == pygame.QUIT:
+            running = False
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            game.handle_click(event.pos)
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_F3:
+                game.profiler.toggle_overlay()
+            elif game.is_results_screen():
+                if event.key == pygame.K_r:
+                    game.restart()
+                elif event.key == pygame.K_q:
+                    running = False
+    return running
 
 
 def main():
     """Main function to run the game."""
-    game = QuizGame()
-    clock = pygame.time.Clock()
+    parser = argparse.ArgumentParser(description="AWS Quiz Game - Japanese Names Edition")
+    parser.add_argument("--full-redraw", action="store_true", default=FULL_REDRAW,
+                        help="redraw and flip the whole screen every frame")
+    parser.add_argument("--particles", default="default",
+                        help="celebration particle count or preset (%s)" % ", ".join(PARTICLE_PRESETS))
+    parser.add_argument("--bank", metavar="PATH",
+                        help="load questions from a JSONL or SQLite question bank instead of the built-in list")
+    parser.add_argument("--watch-bank", action="store_true",
+                        help="pick up edits to the --bank JSONL file between questions")
+    parser.add_argument("--spaced-repetition", nargs="?", const="", metavar="STATE_FILE",
+                        help="pick due and previously missed questions first, keeping mastery state in "
+                             "STATE_FILE (default: in the cache directory)")
+    parser.add_argument("--player", default=os.environ.get("USER") or os.environ.get("USERNAME") or "Player",
+                        help="name recorded on the leaderboard")
+    parser.add_argument("--leaderboard", metavar="PATH",
+                        help="leaderboard log file (default: in the cache directory)")
+    parser.add_argument("--no-leaderboard", action="store_true", help="do not record or show scores")
+    parser.add_argument("--atlas", default=DEFAULT_ATLAS_PATH, metavar="PATH",
+                        help="pre-rendered text atlas built by text_atlas.py (default: %(default)s)")
+    parser.add_argument("--no-atlas", action="store_true", help="render all text live")
+    parser.add_argument("--renderer", action="store_true",
+                        help="draw with the SDL2 GPU renderer, scaling the game to the window size")
+    parser.add_argument("--software-renderer", action="store_true",
+                        help="use the renderer backend with SDL's software renderer (implies --renderer)")
+    parser.add_argument("--window-size", metavar="WxH", help="renderer window size (default: 800x600)")
+    parser.add_argument("--fullscreen", action="store_true", help="renderer backend on the whole desktop")
+    parser.add_argument("--choices", type=int, default=MIN_CHOICES, metavar="N",
+                        help=f"answer choices per question, {MIN_CHOICES}-{MAX_CHOICES}; more than two adds "
+                             "similar services from the bank as wrong answers (default: %(default)s)")
+    parser.add_argument("--no-prefetch", action="store_true",
+                        help="render the next question when it is shown instead of during the feedback")
+    parser.add_argument("--fps", default="60", metavar="RATE",
+                        help="render rate while animating: frames per second, 'uncapped', or 'auto' to step "
+                             "between %s FPS by measured frame cost; animation speed does not depend on it "
+                             "(default: %%(default)s)" % "/".join(map(str, AUTO_FPS_STEPS)))
+    parser.add_argument("--fixed-rate", action="store_true",
+                        help="render at the --fps rate even when nothing is animating")
+    parser.add_argument("--profile-csv", metavar="PATH",
+                        help="record per-phase frame timings and write them to PATH on exit")
+    parser.add_argument("--telemetry", nargs="?", const="", metavar="PATH",
+                        help="log how long each answer took to PATH (default: in the cache directory); "
+                             "summarize it with answer_telemetry.py")
+    parser.add_argument("--seed", type=int, help="seed the random number generator for a repeatable session")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record the seed and every frame's input to PATH for input_replay.py")
+    args = parser.parse_args()
+    try:
+        particle_count = resolve_particle_count(args.particles)
+    except ValueError:
+        parser.error(f"invalid particle count or preset: {args.particles}")
+    fps = 0
+    if args.fps not in ("uncapped", "auto"):
+        try:
+            fps = int(args.fps)
+        except ValueError:
+            fps = -1
+        if fps <= 0:
+            parser.error(f"invalid --fps: {args.fps} (expected a number, 'uncapped' or 'auto')")
+    window_size = None
+    if args.window_size:
+        try:
+            window_size = tuple(int(value) for value in args.window_size.lower().split("x"))
+        except ValueError:
+            window_size = ()
+        if len(window_size) != 2 or min(window_size) <= 0:
+            parser.error(f"invalid window size: {args.window_size} (expected WxH, e.g. 3840x2160)")
+    
+    question_bank = None
+    if args.bank:
+        try:
+            question_bank = load_question_bank(args.bank, watch=args.watch_bank)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            parser.error(f"could not open question bank {args.bank}: {e}")
+        if not len(question_bank):
+            parser.error(f"question bank {args.bank} is empty")
+    
+    if not MIN_CHOICES <= args.choices <= MAX_CHOICES:
+        parser.error(f"--choices must be between {MIN_CHOICES} and {MAX_CHOICES}")
+    
+    if args.watch_bank and not args.bank:
+        parser.error("--watch-bank needs --bank")
+    if args.watch_bank and not can_watch(args.bank):
+        parser.error("--watch-bank only works with JSONL banks")
+    if args.record and args.watch_bank:
+        parser.error("--record cannot be combined with --watch-bank: edits to the bank change the questions")
+    if args.record and args.spaced_repetition is not None:
+        parser.error("--record cannot be combined with --spaced-repetition: saved review state changes the questions")
+    
+    recorder = None
+    clock = None
+    seed = args.seed
+    if seed is None and args.record:
+        seed = random.getrandbits(63)
+    if seed is not None:
+        # Seed before the game is built: the first round's questions are picked in the constructor
+        random.seed(seed)
+    
+    review_scheduler = None
+    if args.spaced_repetition is not None:
+        review_scheduler = SpacedRepetitionScheduler(args.spaced_repetition or None)
+    
+    leaderboard = None if args.no_leaderboard else Leaderboard(args.leaderboard)
+    telemetry = None if args.telemetry is None else AnswerTelemetry(args.telemetry or None)
+    
+    renderer = None
+    if args.renderer or args.software_renderer or args.fullscreen or window_size:
+        renderer = RendererBackend("AWS 人名クイズ", (SCREEN_WIDTH, SCREEN_HEIGHT), window_size,
+                                   fullscreen=args.fullscreen, software=args.software_renderer)
+    
+    if args.record:
+        try:
+            recorder = InputRecorder(args.record, seed, particle_count, args.bank or "", choices=args.choices)
+        except OSError as e:
+            parser.error(f"could not create recording {args.record}: {e}")
+        clock = ReplayClock()
+    
+    profiler = FrameProfiler(enabled=bool(args.profile_csv))
+    game = QuizGame(full_redraw=args.full_redraw, particle_count=particle_count, profiler=profiler,
+                    question_bank=question_bank, review_scheduler=review_scheduler,
+                    leaderboard=leaderboard, player_name=args.player,
+                    atlas_path=None if args.no_atlas else args.atlas, renderer=renderer,
+                    clock=clock, telemetry=telemetry, prefetch=not args.no_prefetch, choices=args.choices,
+                    watch_bank=args.watch_bank)
+    scheduler = FrameScheduler(fps=fps, adaptive=not args.fixed_rate, auto_rate=args.fps == "auto")
     
     running = True
     while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                game.handle_click(event.pos)
-            elif event.type == pygame.KEYDOWN:
-                if game.current_question_index >= game.total_questions:
-                    if event.key == pygame.K_r:
-                        game.restart()
-                    elif event.key == pygame.K_q:
-                        running = False
-                        
-        game.update()
+        profiler.begin_frame()
+        # Block on the event queue while idle, tick at 60 FPS while animating
+        profiler.push("idle")
+        events = scheduler.wait(game.is_animating())
+        profiler.pop()
+        
+        profiler.push("events")
+        pointer = game.read_pointer()
+        if recorder:
+            # Freeze the clock for the frame, exactly as the replay will see it
+            clock.now = recorder.elapsed_ms()
+            recorder.record_frame(clock.now, pointer, events)
+        running = dispatch_events(game, events)
+        profiler.pop()
+        
+        profiler.push("update")
+        game.update(pointer)
+        profiler.pop()
+        profiler.status = scheduler.status_text()
         game.draw()
-        clock.tick(60)
+        profiler.end_frame()
         
+    stats = scheduler.stats()
+    print("Frame scheduler: " + ", ".join(
+        f"{mode} {values['frames']} frames / {values['wall_s']:.1f}s at {values['cpu_percent']:.1f}% CPU"
+        for mode, values in stats.items()))
+    if args.profile_csv and profiler.frame_count:
+        rows = profiler.dump_csv(args.profile_csv)
+        print(f"Wrote {rows} frame timings to {args.profile_csv}")
+    if game.prefetcher:
+        game.prefetcher.close()
+    if recorder:
+        recorder.close()
+        print(f"Recorded {recorder.frames} frames to {args.record} (seed {seed})")
+    if review_scheduler:
+        review_scheduler.close()
+    if leaderboard:
+        leaderboard.close()
+    if telemetry:
+        telemetry.close()
+        print(f"Logged {telemetry.records} answers to {telemetry.path}")
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Distractor index for multiple-choice rounds of the AWS Quiz Game.
+Every service name in a question bank becomes a vector of hashed character
+n-gram TF-IDF weights plus category tags. The most similar names of each one
+are found once with blocked cosine similarity and cached on disk, so picking
+plausible wrong answers for a question is a dictionary lookup and a table row.
+"""
+import argparse
+import hashlib
+import json
+import re
+import struct
+import sys
+import time
+import zlib
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from app_cache import cache_path, write_atomic
+
+INDEX_MAGIC = b"AQDX"
+INDEX_VERSION = 1
+# Header: magic, version, source digest, name count, neighbors per name, UTF-8 names length
+INDEX_HEADER = struct.Struct("<4sI20sIII")
+
+NEIGHBORS = 8  # Stored per name; enough for 6 choices after skipping duplicates
+NGRAM_FEATURES = 256  # Hashed character n-gram dimensions
+TAG_FEATURES = 32  # Hashed category tag dimensions
+TAG_WEIGHT = 0.6  # Share of the similarity that comes from sharing a category
+NGRAM_SIZES = (2, 3, 4)
+BLOCK_BYTES = 64 * 1024 * 1024  # Similarity scores computed at once
+
+# Vendor prefixes carry no information about which service is meant
+NAME_PREFIX = re.compile(r"^(amazon|aws)\s+", re.IGNORECASE)
+
+# Category tags for well-known services, matched as substrings of the lowercase name.
+# Questions can add their own with a "category" string or a "tags" list.
+SERVICE_CATEGORIES = {
+    "compute": ("ec2", "lambda", "lightsail", "batch", "beanstalk", "outposts", "app runner", "fargate"),
+    "containers": ("ecs", "eks", "ecr", "fargate", "container", "kubernetes"),
+    "storage": ("s3", "ebs", "efs", "glacier", "fsx", "storage gateway", "backup", "snow"),
+    "database": ("rds", "dynamodb", "aurora", "redshift", "elasticache", "neptune", "documentdb", "keyspaces",
+                 "timestream", "qldb", "memorydb", "database"),
+    "networking": ("vpc", "cloudfront", "route 53", "direct connect", "load balanc", "elb", "api gateway",
+                   "global accelerator", "transit gateway", "privatelink"),
+    "security": ("iam", "kms", "cognito", "guardduty", "shield", "waf", "secrets manager", "inspector", "macie",
+                 "certificate", "security hub", "detective"),
+    "analytics": ("athena", "emr", "kinesis", "glue", "quicksight", "opensearch", "elasticsearch", "msk",
+                  "data pipeline", "lake formation"),
+    "machine learning": ("sagemaker", "rekognition", "comprehend", "polly", "lex", "textract", "translate",
+                         "transcribe", "bedrock", "personalize", "forecast"),
+    "management": ("cloudwatch", "cloudformation", "cloudtrail", "config", "systems manager", "organizations",
+                   "trusted advisor", "control tower"),
+    "integration": ("sqs", "sns", "eventbridge", "step functions", "mq", "appsync", "queue", "notification"),
+    "developer tools": ("codecommit", "codebuild", "codedeploy", "codepipeline", "cloud9", "x-ray", "codestar"),
+}
+
+
+def normalize(name: str) -> str:
+    return NAME_PREFIX.sub("", name.strip()).lower()
+
+
+def category_tags(name: str) -> List[str]:
+    """Return the built-in categories whose keywords appear in a service name."""
+    text = normalize(name)
+    return [category for category, keywords in SERVICE_CATEGORIES.items()
+            if any(keyword in text for keyword in keywords)]
+
+
+def _bucket(feature: str, dimensions: int) -> int:
+    # crc32 is stable across runs, unlike hash() on str
+    return zlib.crc32(feature.encode("utf-8")) % dimensions
+
+
+def collect_names(questions: Iterable[dict]) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Return every distinct correct and incorrect answer and the tags given to each by questions."""
+    tags: Dict[str, List[str]] = {}
+    for question in questions:
+        extra = list(question.get("tags") or [])
+        if question.get("category"):
+            extra.append(question["category"])
+        for key in ("correct", "incorrect"):
+            name = question.get(key)
+            if not name:
+                continue
+            name_tags = tags.setdefault(name, [])
+            # Tags describe the question's correct answer
+            if key == "correct":
+                name_tags.extend(tag for tag in extra if tag not in name_tags)
+    return list(tags), tags
+
+
+def name_vectors(names: Sequence[str], tags: Dict[str, List[str]]) -> np.ndarray:
+    """Return L2-normalized rows of hashed n-gram TF-IDF weights followed by weighted tag features."""
+    rows, columns = [], []
+    for row, name in enumerate(names):
+        padded = f" {normalize(name)} "
+        for size in NGRAM_SIZES:
+            for start in range(len(padded) - size + 1):
+                rows.append(row)
+                columns.append(_bucket(padded[start:start + size], NGRAM_FEATURES))
+    rows_array = np.asarray(rows, dtype=np.int64)
+    columns_array = np.asarray(columns, dtype=np.int64)
+    counts = np.zeros((len(names), NGRAM_FEATURES), dtype=np.float32)
+    np.add.at(counts, (rows_array, columns_array), 1.0)
+
+    # Common n-grams ("ice", "ser") say little; rare ones identify a family of services
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(names)) / (1 + document_frequency)).astype(np.float32) + 1
+    ngrams = counts * idf
+    ngrams /= np.maximum(np.linalg.norm(ngrams, axis=1, keepdims=True), 1e-12)
+
+    tag_features = np.zeros((len(names), TAG_FEATURES), dtype=np.float32)
+    for row, name in enumerate(names):
+        for tag in set(category_tags(name)) | set(tags.get(name, ())):
+            tag_features[row, _bucket(tag.lower(), TAG_FEATURES)] = 1.0
+    tag_norms = np.linalg.norm(tag_features, axis=1, keepdims=True)
+    tag_features /= np.maximum(tag_norms, 1e-12)
+
+    # Cosine similarity then mixes n-gram and tag similarity by TAG_WEIGHT
+    weights = np.float32(np.sqrt(1 - TAG_WEIGHT)), np.float32(np.sqrt(TAG_WEIGHT))
+    return np.hstack([ngrams * weights[0], tag_features * weights[1]])
+
+
+def nearest_neighbors(vectors: np.ndarray, count: int = NEIGHBORS) -> np.ndarray:
+    """Return the count most similar other rows of each row, most similar first (-1 pads small banks)."""
+    total = len(vectors)
+    count_found = min(count, total - 1)
+    table = np.full((total, count), -1, dtype=np.int32)
+    if count_found <= 0:
+        return table
+    block = max(1, BLOCK_BYTES // (4 * total))
+    for start in range(0, total, block):
+        stop = min(start + block, total)
+        scores = vectors[start:stop] @ vectors.T
+        # A name is never its own distractor
+        scores[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+        top = np.argpartition(scores, -count_found, axis=1)[:, -count_found:]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        table[start:stop, :count_found] = np.take_along_axis(top, order, axis=1)
+    return table
+
+
+def bank_digest(bank) -> bytes:
+    """Return a digest identifying a bank's contents and the index parameters."""
+    digest = hashlib.sha1(f"{INDEX_VERSION}\0{NEIGHBORS}\0{NGRAM_FEATURES}\0{TAG_FEATURES}\0{TAG_WEIGHT}".encode())
+    content = bank.content_digest()
+    if content is not None:
+        # File banks are identified by their bytes, so touching, copying or checking one out keeps its index
+        digest.update(content)
+    else:
+        for index in range(len(bank)):
+            question = bank.get(index)
+            digest.update(json.dumps([question.get("correct"), question.get("incorrect"), question.get("category"),
+                                      question.get("tags")], ensure_ascii=False).encode())
+    digest.update(json.dumps(SERVICE_CATEGORIES, sort_keys=True).encode())
+    return digest.digest()
+
+
+class DistractorIndex:
+    """Nearest-neighbor table over the service names of a bank."""
+
+    def __init__(self, names: List[str], table: np.ndarray):
+        self.names = names
+        self.table = table
+        self._rows = {name: row for row, name in enumerate(names)}
+
+    @classmethod
+    def build(cls, questions: Iterable[dict]) -> "DistractorIndex":
+        names, tags = collect_names(questions)
+        return cls(names, nearest_neighbors(name_vectors(names, tags)))
+
+    def distractors(self, question: dict, count: int) -> List[str]:
+        """Return up to count wrong answers for a question: its own incorrect answer, then the closest names."""
+        correct = question["correct"]
+        picked = [question["incorrect"]] if question.get("incorrect") and question["incorrect"] != correct else []
+        row = self._rows.get(correct)
+        if row is None:
+            # A service added to the bank after the index was built: its incorrect answer is a close relative
+            row = self._rows.get(question.get("incorrect"))
+        if row is not None:
+            for neighbor in self.table[row]:
+                if len(picked) >= count or neighbor < 0:
+                    break
+                name = self.names[neighbor]
+                if name != correct and name not in picked:
+                    picked.append(name)
+        return picked[:count]
+
+    def to_bytes(self, digest: bytes) -> bytes:
+        encoded = "\n".join(self.names).encode("utf-8")
+        padding = b"\0" * (-len(encoded) % 4)
+        header = INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, digest, len(self.names), self.table.shape[1],
+                                   len(encoded))
+        return header + encoded + padding + self.table.astype("<i4").tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, digest: bytes) -> "DistractorIndex":
+        magic, version, stored_digest, count, neighbors, names_length = INDEX_HEADER.unpack_from(data)
+        if (magic, version) != (INDEX_MAGIC, INDEX_VERSION) or stored_digest != digest:
+            raise ValueError("stale distractor index")
+        offset = INDEX_HEADER.size
+        names = data[offset:offset + names_length].decode("utf-8").split("\n") if count else []
+        offset += names_length + (-names_length % 4)
+        table = np.frombuffer(data, dtype="<i4", count=count * neighbors, offset=offset).reshape(count, neighbors)
+        if len(names) != count:
+            raise ValueError("corrupt distractor index")
+        return cls(names, table)
+
+    @classmethod
+    def for_bank(cls, bank) -> "DistractorIndex":
+        """Load the cached index of a bank, building and caching it if it is missing or stale."""
+        digest = bank_digest(bank)
+        name = f"distractors-{digest.hex()[:16]}.idx"
+        try:
+            with open(cache_path(name), "rb") as f:
+                return cls.from_bytes(f.read(), digest)
+        except (OSError, ValueError, struct.error):
+            pass
+        start = time.perf_counter()
+        index = cls.build(bank.get(i) for i in range(len(bank)))
+        write_atomic(name, index.to_bytes(digest))
+        print(f"Built distractor index for {len(index.names)} services in {time.perf_counter() - start:.1f} s")
+        return index
+
+
+def main() -> None:
+    """Build the distractor index of a bank and show the distractors picked for some questions."""
+    parser = argparse.ArgumentParser(description="Build and inspect the AWS Quiz Game distractor index")
+    parser.add_argument("--bank", metavar="PATH", help="JSONL or SQLite question bank (default: built-in questions)")
+    parser.add_argument("--choices", type=int, default=4, help="choices per question to show")
+    parser.add_argument("--show", type=int, default=10, help="questions to print")
+    args = parser.parse_args()
+
+    from question_bank import ListQuestionBank, load_question_bank
+    from quiz_questions import QUIZ_QUESTIONS
+    bank = load_question_bank(args.bank) if args.bank else ListQuestionBank(QUIZ_QUESTIONS)
+    start = time.perf_counter()
+    index = DistractorIndex.for_bank(bank)
+    print(f"{len(index.names)} services ready in {(time.perf_counter() - start) * 1000:.0f} ms", file=sys.stderr)
+    for i in range(min(args.show, len(bank))):
+        question = bank.get(i)
+        print(f"{question['correct']}: " + ", ".join(index.distractors(question, args.choices - 1)))
+    bank.close()
+
+
+if __name__ == "__main__":
+    main()
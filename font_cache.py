@@ -0,0 +1,101 @@
+"""
+Persistent font resolution cache and shared font registry for the AWS Quiz Game.
+The font file chosen for Japanese text is stored on disk and reused until the
+set of installed fonts changes, so startup skips the system font scan. Font
+objects are created once per (font, size) and shared by the whole process.
+"""
+import hashlib
+import os
+import sys
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pygame
+
+from app_cache import read_json, write_json
+
+FONT_CACHE_FILE = "font_cache.json"
+
+# Loaded fonts by (file path, system font name, size)
+_fonts: Dict[Tuple[Optional[str], Optional[str], int], pygame.font.Font] = {}
+
+# SDL_ttf and FreeType are not thread-safe: hold this to load, measure or render
+# text whenever another thread may be doing the same
+FONT_LOCK = threading.Lock()
+
+
+def font_dirs() -> List[str]:
+    """Return the directories fonts are installed into on this platform."""
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        windir = os.environ.get("WINDIR", r"C:\Windows")
+        local = os.environ.get("LOCALAPPDATA", os.path.join(home, "AppData", "Local"))
+        return [os.path.join(windir, "Fonts"), os.path.join(local, "Microsoft", "Windows", "Fonts")]
+    if sys.platform == "darwin":
+        return ["/System/Library/Fonts", "/Library/Fonts", os.path.join(home, "Library", "Fonts")]
+    return [
+        "/usr/share/fonts",
+        "/usr/local/share/fonts",
+        os.path.join(home, ".fonts"),
+        os.path.join(home, ".local", "share", "fonts"),
+    ]
+
+
+def font_set_signature(preferred: Sequence[str]) -> str:
+    """Return a hash that changes when fonts are added to or removed from the font directories."""
+    digest = hashlib.sha1()
+    digest.update(pygame.version.ver.encode())
+    digest.update("\0".join(preferred).encode())
+    # Adding or removing a file updates its directory's mtime, so only directories are stat'ed
+    pending = [d for d in font_dirs() if os.path.isdir(d)]
+    while pending:
+        directory = pending.pop()
+        try:
+            digest.update(f"{directory}\0{os.stat(directory).st_mtime_ns}\0".encode())
+            with os.scandir(directory) as entries:
+                pending.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+        except OSError:
+            continue
+    return digest.hexdigest()
+
+
+def scan_fonts(preferred: Sequence[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Find the first installed font matching a preferred name and return its name and file path."""
+    available_fonts = pygame.font.get_fonts()
+    for font_name in preferred:
+        # Check for partial matches in available fonts
+        for available_font in available_fonts:
+            if font_name.lower() in available_font.lower():
+                return available_font, pygame.font.match_font(available_font)
+    return None, None
+
+
+def resolve_font(preferred: Sequence[str]) -> Tuple[Optional[str], Optional[str], bool]:
+    """Return (font name, font file path, cache hit) for the best available preferred font."""
+    signature = font_set_signature(preferred)
+    cached = read_json(FONT_CACHE_FILE)
+    if isinstance(cached, dict) and cached.get("signature") == signature:
+        font_path = cached.get("font_path")
+        if font_path is None or os.path.exists(font_path):
+            return cached.get("font_name"), font_path, True
+
+    font_name, font_path = scan_fonts(preferred)
+    write_json(FONT_CACHE_FILE, {"signature": signature, "font_name": font_name, "font_path": font_path})
+    return font_name, font_path, False
+
+
+def get_font(size: int, path: Optional[str] = None, name: Optional[str] = None) -> pygame.font.Font:
+    """Return the shared font for a file, a system font name or the default font at size."""
+    key = (path, None if path else name, size)
+    font = _fonts.get(key)
+    if font is None:
+        with FONT_LOCK:
+            if path:
+                # Load the file directly, skipping SysFont's own lookup
+                font = pygame.font.Font(path, size)
+            elif name:
+                font = pygame.font.SysFont(name, size)
+            else:
+                font = pygame.font.Font(None, size)
+        _fonts[key] = font
+    return font
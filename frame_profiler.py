@@ -0,0 +1,208 @@
+"""
+Frame profiler for the AWS Quiz Game.
+Times each phase of the main loop with a high-resolution clock, keeps the last
+frames in a fixed-size ring buffer and draws them as an overlay graph (F3).
+"""
+import csv
+import time
+from typing import List, Optional
+
+import numpy as np
+import pygame
+
+from font_cache import FONT_LOCK
+
+# Phases timed in every frame, in the order they are stacked in the graph
+PHASES = (
+    "events",
+    "update",
+    "background",
+    "particles",
+    "text",
+    "buttons",
+    "progress_bar",
+    "results_celebration",
+    "overlay",
+    "present",
+    "idle",
+)
+
+PHASE_COLORS = {
+    "events": (148, 103, 189),
+    "update": (140, 86, 75),
+    "background": (127, 127, 127),
+    "particles": (255, 127, 14),
+    "text": (31, 119, 180),
+    "buttons": (44, 160, 44),
+    "progress_bar": (23, 190, 207),
+    "results_celebration": (214, 39, 40),
+    "overlay": (227, 119, 194),
+    "present": (188, 189, 34),
+    "idle": (60, 60, 60),
+}
+
+OVERLAY_WIDTH = 320
+OVERLAY_HEIGHT = 120
+GRAPH_HEIGHT = 80
+GRAPH_SCALE_MS = 33.3  # Frame time shown at the top of the graph
+TARGET_FRAME_MS = 1000 / 60
+SUMMARY_INTERVAL_NS = 500_000_000  # Time between refreshes of the overlay text
+
+
+class FrameProfiler:
+    """Per-phase frame timer with a ring buffer, overlay graph and CSV export."""
+
+    def __init__(self, capacity: int = 1800, enabled: bool = False):
+        self.capacity = capacity
+        self.enabled = enabled
+        self.overlay_visible = False
+        self.status = ""  # Extra line shown in the overlay, e.g. the frame scheduler mode
+        self.phase_index = {name: i for i, name in enumerate(PHASES)}
+
+        # One row per frame: start timestamp followed by each phase in nanoseconds
+        self.samples = np.zeros((capacity, len(PHASES) + 1), dtype=np.int64)
+        self.frame_count = 0
+
+        self._row = np.zeros(len(PHASES) + 1, dtype=np.int64)
+        self._stack: List[int] = []
+        self._last_switch = 0
+        self._in_frame = False
+
+        self._graph: Optional[pygame.Surface] = None
+        self._summary: Optional[pygame.Surface] = None
+        self._summary_time = 0
+        self._font: Optional[pygame.font.Font] = None
+
+    def toggle_overlay(self) -> None:
+        """Show or hide the overlay graph; showing it also enables timing."""
+        self.overlay_visible = not self.overlay_visible
+        if self.overlay_visible:
+            self.enabled = True
+
+    def begin_frame(self) -> None:
+        """Start timing a new frame."""
+        if not self.enabled:
+            return
+        self._row[:] = 0
+        self._stack.clear()
+        self._last_switch = time.perf_counter_ns()
+        self._row[0] = self._last_switch
+        self._in_frame = True
+
+    def push(self, phase: str) -> None:
+        """Start timing phase; time spent in the enclosing phase is paused."""
+        if not self._in_frame:
+            return
+        now = time.perf_counter_ns()
+        if self._stack:
+            self._row[self._stack[-1] + 1] += now - self._last_switch
+        self._stack.append(self.phase_index[phase])
+        self._last_switch = now
+
+    def pop(self) -> None:
+        """Stop timing the current phase and resume the enclosing one."""
+        if not self._in_frame or not self._stack:
+            return
+        now = time.perf_counter_ns()
+        self._row[self._stack.pop() + 1] += now - self._last_switch
+        self._last_switch = now
+
+    def end_frame(self) -> None:
+        """Store the finished frame in the ring buffer."""
+        if not self._in_frame:
+            return
+        while self._stack:
+            self.pop()
+        self.samples[self.frame_count % self.capacity] = self._row
+        self.frame_count += 1
+        self._in_frame = False
+        if self._graph is not None:
+            self._add_graph_column()
+
+    def recent(self, count: Optional[int] = None) -> np.ndarray:
+        """Return up to count most recent frames in chronological order."""
+        stored = min(self.frame_count, self.capacity)
+        if count is None or count > stored:
+            count = stored
+        end = self.frame_count % self.capacity
+        indices = (np.arange(end - count, end)) % self.capacity
+        return self.samples[indices]
+
+    def dump_csv(self, path: str) -> int:
+        """Write the buffered frames to a CSV file in milliseconds and return the row count."""
+        rows = self.recent()
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "start_ms"] + [f"{name}_ms" for name in PHASES] + ["total_ms"])
+            first_frame = self.frame_count - len(rows)
+            origin = rows[0, 0] if len(rows) else 0
+            for i, row in enumerate(rows):
+                phases_ms = row[1:] / 1e6
+                writer.writerow([first_frame + i, f"{(row[0] - origin) / 1e6:.3f}"]
+                                + [f"{value:.4f}" for value in phases_ms]
+                                + [f"{phases_ms.sum():.4f}"])
+        return len(rows)
+
+    def draw_overlay(self, surface: pygame.Surface) -> pygame.Rect:
+        """Draw the overlay graph in the top-right corner and return its rect."""
+        rect = pygame.Rect(surface.get_width() - OVERLAY_WIDTH - 10, 10, OVERLAY_WIDTH, OVERLAY_HEIGHT)
+        if self._graph is None:
+            self._graph = pygame.Surface((OVERLAY_WIDTH, GRAPH_HEIGHT))
+            self._graph.fill((20, 20, 20))
+            with FONT_LOCK:
+                self._font = pygame.font.Font(None, 18)
+        now = time.perf_counter_ns()
+        if self._summary is None or now - self._summary_time >= SUMMARY_INTERVAL_NS:
+            self._summary = self._render_summary()
+            self._summary_time = now
+
+        surface.fill((20, 20, 20), rect)
+        surface.blit(self._graph, rect.topleft)
+        target_y = rect.top + GRAPH_HEIGHT - int(TARGET_FRAME_MS / GRAPH_SCALE_MS * GRAPH_HEIGHT)
+        pygame.draw.line(surface, (255, 255, 255), (rect.left, target_y), (rect.right - 1, target_y))
+        surface.blit(self._summary, (rect.left + 4, rect.top + GRAPH_HEIGHT + 2))
+        return rect
+
+    def _add_graph_column(self) -> None:
+        """Scroll the graph left by one pixel and draw the newest frame as a stacked column."""
+        self._graph.scroll(-1, 0)
+        x = OVERLAY_WIDTH - 1
+        self._graph.fill((20, 20, 20), (x, 0, 1, GRAPH_HEIGHT))
+        y = GRAPH_HEIGHT
+        for i, name in enumerate(PHASES):
+            height = self._row[i + 1] / 1e6 / GRAPH_SCALE_MS * GRAPH_HEIGHT
+            if height <= 0:
+                continue
+            top = max(0, y - height)
+            self._graph.fill(PHASE_COLORS[name], (x, int(top), 1, max(1, int(y) - int(top))))
+            y = top
+            if y <= 0:
+                break
+
+    def _render_summary(self) -> pygame.Surface:
+        """Render the average frame and busiest phase times over the last second."""
+        summary = pygame.Surface((OVERLAY_WIDTH - 8, OVERLAY_HEIGHT - GRAPH_HEIGHT - 4))
+        summary.fill((20, 20, 20))
+        rows = self.recent(60)
+        if not len(rows):
+            return summary
+        averages = rows[:, 1:].mean(axis=0) / 1e6
+        busy_ms = averages.sum() - averages[self.phase_index["idle"]]
+        line = f"frame {averages.sum():.2f} ms  busy {busy_ms:.2f} ms"
+        # The three most expensive phases, excluding idle time
+        busiest = [i for i in np.argsort(averages)[::-1] if PHASES[i] != "idle"][:3]
+        # The question prefetch thread may be rendering text at the same time
+        with FONT_LOCK:
+            header = self._font.render(line, True, (255, 255, 255))
+            labels = [self._font.render(f"{PHASES[i]} {averages[i]:.2f}", True, PHASE_COLORS[PHASES[i]])
+                      for i in busiest]
+            status = self._font.render(self.status, True, (200, 200, 200)) if self.status else None
+
+        summary.blit(header, (0, 0))
+        x = 0
+        for label in labels:
+            summary.blit(label, (x, 16))
+            x += label.get_width() + 10
+        if status:
+            summary.blit(status, (0, 32))
+        return summary
@@ -0,0 +1,154 @@
+"""
+Adaptive frame scheduler for the AWS Quiz Game.
+Blocks on the event queue while the screen is static and only runs at the
+render rate while something is animating. The render rate can be fixed,
+uncapped or lowered automatically when frames take too long. Animations are
+simulated in fixed timesteps independent of the render rate, and frames
+interpolate between the last two simulated states.
+"""
+import time
+from typing import Dict, List, Optional
+
+import pygame
+
+IDLE = "idle"
+ANIMATING = "animating"
+
+SIMULATION_HZ = 60  # Animation ticks per second, whatever the render rate
+MAX_TICKS_PER_FRAME = 8  # After a longer stall the animation slows down instead of jumping
+
+AUTO_FPS_STEPS = (60, 30, 20)  # Render rates tried by the automatic rate, fastest first
+AUTO_SMOOTHING = 0.05  # Weight of the newest frame in the average frame cost
+AUTO_LOWER_AT = 0.9  # Lower the rate when frames use this share of their budget
+AUTO_RAISE_AT = 0.5  # Raise it when frames would use less than this share of the faster budget
+AUTO_HOLD_FRAMES = 60  # Frames to stay at a rate before changing it again
+
+
+class FixedTimestep:
+    """Turns elapsed milliseconds into whole simulation ticks plus the fraction of the next one."""
+
+    def __init__(self, hz: int = SIMULATION_HZ, max_ticks: int = MAX_TICKS_PER_FRAME):
+        self.step_ms = 1000 / hz
+        self.max_ticks = max_ticks
+        self.alpha = 0.0  # How far the frame is between the last tick and the next one
+        self._last: Optional[float] = None
+        self._accumulator = 0.0
+
+    def reset(self, now_ms: float) -> None:
+        """Start counting from now_ms, e.g. when an animation starts after an idle wait."""
+        self._last = now_ms
+        self._accumulator = 0.0
+        self.alpha = 0.0
+
+    def advance(self, now_ms: float) -> int:
+        """Return the number of ticks to simulate for the time since the last call."""
+        if self._last is None:
+            self._last = now_ms
+        self._accumulator += max(0.0, now_ms - self._last)
+        self._last = now_ms
+        ticks = int(self._accumulator // self.step_ms)
+        self._accumulator -= ticks * self.step_ms
+        if ticks > self.max_ticks:
+            ticks = self.max_ticks
+            self._accumulator = 0.0
+        self.alpha = self._accumulator / self.step_ms
+        return ticks
+
+    def elapsed_ms(self, ticks: int) -> float:
+        """Return the animation time shown by this frame for an animation that is ticks old."""
+        return (ticks + self.alpha) * self.step_ms
+
+
+class FrameScheduler:
+    """Chooses between event-driven idle waits and fixed-rate animation frames."""
+
+    def __init__(self, fps: int = 60, idle_timeout_ms: int = 1000, adaptive: bool = True, auto_rate: bool = False):
+        # 0 renders animation frames as fast as possible
+        self.fps = AUTO_FPS_STEPS[0] if auto_rate else fps
+        self.idle_timeout_ms = idle_timeout_ms
+        self.adaptive = adaptive
+        self.auto_rate = auto_rate
+        self.frame_cost_ms = 0.0  # Smoothed time from the end of one wait to the next
+        self._held_frames = 0
+        self._frame_start = time.perf_counter()
+        self.mode = ANIMATING
+        self.clock = pygame.time.Clock()
+
+        # Wall-clock and CPU seconds spent per mode, measured frame to frame
+        self.frames = {IDLE: 0, ANIMATING: 0}
+        self.wall_time = {IDLE: 0.0, ANIMATING: 0.0}
+        self.cpu_time = {IDLE: 0.0, ANIMATING: 0.0}
+        self._last_wall = time.perf_counter()
+        self._last_cpu = time.process_time()
+
+    def wait(self, animating: bool) -> List[pygame.event.Event]:
+        """Wait for the next frame and return the pending events."""
+        self._account()
+        if animating or not self.adaptive:
+            if self.mode == ANIMATING:
+                self._measure()
+            self.mode = ANIMATING
+            self.clock.tick(self.fps)
+            self._frame_start = time.perf_counter()
+            return pygame.event.get()
+
+        self.mode = IDLE
+        event = pygame.event.wait(self.idle_timeout_ms)
+        # Keep the clock's frame delta meaningful when animation resumes
+        self.clock.tick()
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
+    def _measure(self) -> None:
+        """Track the cost of the frame that just ended and pick the automatic render rate."""
+        cost_ms = (time.perf_counter() - self._frame_start) * 1000
+        self.frame_cost_ms += AUTO_SMOOTHING * (cost_ms - self.frame_cost_ms)
+        if not self.auto_rate:
+            return
+        self._held_frames += 1
+        if self._held_frames < AUTO_HOLD_FRAMES:
+            return
+        step = AUTO_FPS_STEPS.index(self.fps)
+        if self.frame_cost_ms > AUTO_LOWER_AT * 1000 / self.fps and step + 1 < len(AUTO_FPS_STEPS):
+            self.fps = AUTO_FPS_STEPS[step + 1]
+            self._held_frames = 0
+        elif step and self.frame_cost_ms < AUTO_RAISE_AT * 1000 / AUTO_FPS_STEPS[step - 1]:
+            self.fps = AUTO_FPS_STEPS[step - 1]
+            self._held_frames = 0
+
+    def _account(self) -> None:
+        """Attribute the time since the previous wait to the mode that was active."""
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        self.frames[self.mode] += 1
+        self.wall_time[self.mode] += wall - self._last_wall
+        self.cpu_time[self.mode] += cpu - self._last_cpu
+        self._last_wall = wall
+        self._last_cpu = cpu
+
+    def cpu_percent(self, mode: str) -> float:
+        """Return the share of one core used while in mode."""
+        if not self.wall_time[mode]:
+            return 0.0
+        return 100.0 * self.cpu_time[mode] / self.wall_time[mode]
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return frames, wall time, CPU time and CPU share for each mode."""
+        return {
+            mode: {
+                "frames": self.frames[mode],
+                "wall_s": round(self.wall_time[mode], 3),
+                "cpu_s": round(self.cpu_time[mode], 3),
+                "cpu_percent": round(self.cpu_percent(mode), 1),
+            }
+            for mode in (IDLE, ANIMATING)
+        }
+
+    def status_text(self) -> str:
+        """Return a one-line summary of the current mode and idle CPU usage."""
+        rate = f"{self.fps} fps" if self.fps else "uncapped"
+        if self.auto_rate:
+            rate = "auto " + rate
+        return (f"mode {self.mode}  {rate}  frame {self.frame_cost_ms:.1f} ms  "
+                f"idle cpu {self.cpu_percent(IDLE):.1f}%")
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Input recording and replay for the AWS Quiz Game.
+A recording holds the RNG seed, game settings and, for every frame of the main loop, the
+frame's time, the pointer state and the input events handled in it, packed
+into a compact binary file. Replaying it with a simulated clock reproduces
+the session frame by frame, so frame timings are comparable between runs and
+frame hashes show whether a rendering change altered the output.
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import struct
+import sys
+import time
+from typing import List, NamedTuple, Tuple
+
+import numpy as np
+
+# The replay prints JSON to stdout, so keep pygame's banner out of it
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame
+
+REPLAY_MAGIC = b"AQRP"
+REPLAY_VERSION = 2
+
+# Header: magic, version, RNG seed, particle count, answer choices, question bank path length, followed by the path
+REPLAY_HEADER = struct.Struct("<4sIQIBH")
+# Version 1 recordings predate multiple choice and always had two choices
+REPLAY_HEADER_V1 = struct.Struct("<4sIQIH")
+# Frame: milliseconds since the start, pointer x, pointer y, pointer pressed, event count
+FRAME = struct.Struct("<IhhBB")
+# Event: kind, x, y, mouse button or key code
+EVENT = struct.Struct("<Bhhi")
+
+# Only the events the main loop acts on are recorded
+EVENT_KINDS = (pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN)
+MAX_FRAME_EVENTS = 255
+FLUSH_BYTES = 64 * 1024
+
+Pointer = Tuple[Tuple[int, int], bool]
+
+
+class ReplayClock:
+    """Millisecond clock that stands in for pygame.time.get_ticks() and only moves once per frame."""
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self) -> int:
+        return self.now
+
+
+class ReplayFrame(NamedTuple):
+    time_ms: int
+    pointer: Pointer
+    events: List[pygame.event.Event]
+
+
+def _pack_event(event: pygame.event.Event) -> bytes:
+    kind = EVENT_KINDS.index(event.type)
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        return EVENT.pack(kind, event.pos[0], event.pos[1], event.button)
+    if event.type == pygame.KEYDOWN:
+        return EVENT.pack(kind, 0, 0, event.key)
+    return EVENT.pack(kind, 0, 0, 0)
+
+
+def _unpack_event(kind: int, x: int, y: int, code: int) -> pygame.event.Event:
+    event_type = EVENT_KINDS[kind]
+    if event_type == pygame.MOUSEBUTTONDOWN:
+        return pygame.event.Event(event_type, pos=(x, y), button=code)
+    if event_type == pygame.KEYDOWN:
+        return pygame.event.Event(event_type, key=code, mod=0, unicode="", scancode=0)
+    return pygame.event.Event(event_type)
+
+
+class InputRecorder:
+    """Appends the frames of a live session to a recording file."""
+
+    def __init__(self, path: str, seed: int, particle_count: int, bank_path: str = "",
+                 clock=pygame.time.get_ticks, choices: int = 2):
+        self.path = path
+        self.clock = clock
+        self.frames = 0
+        self._start = clock()
+        self._buffer = bytearray()
+        encoded_bank = bank_path.encode("utf-8")
+        self._file = open(path, "wb")
+        self._file.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, seed, particle_count, choices,
+                                            len(encoded_bank)))
+        self._file.write(encoded_bank)
+
+    def elapsed_ms(self) -> int:
+        """Return the time since recording started, the value the replay clock will show."""
+        return self.clock() - self._start
+
+    def record_frame(self, time_ms: int, pointer: Pointer, events: List[pygame.event.Event]) -> None:
+        """Record one frame: its time, the pointer state and the events the game will handle."""
+        kept = [event for event in events if event.type in EVENT_KINDS][:MAX_FRAME_EVENTS]
+        (x, y), pressed = pointer
+        self._buffer += FRAME.pack(time_ms, x, y, pressed, len(kept))
+        for event in kept:
+            self._buffer += _pack_event(event)
+        self.frames += 1
+        if len(self._buffer) >= FLUSH_BYTES:
+            self.flush()
+
+    def flush(self) -> None:
+        self._file.write(self._buffer)
+        self._buffer.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+
+class Recording:
+    """A loaded recording: the seed, game settings and every frame."""
+
+    def __init__(self, seed: int, particle_count: int, bank_path: str, frames: List[ReplayFrame], choices: int = 2):
+        self.seed = seed
+        self.particle_count = particle_count
+        self.choices = choices
+        self.bank_path = bank_path
+        self.frames = frames
+
+    @classmethod
+    def load(cls, path: str) -> "Recording":
+        """Read a recording; a truncated last frame, left by a crash, is dropped."""
+        with open(path, "rb") as f:
+            data = f.read()
+        try:
+            magic, version = struct.unpack_from("<4sI", data)
+            if magic != REPLAY_MAGIC or version not in (1, REPLAY_VERSION):
+                raise ValueError("unknown replay format")
+            if version == 1:
+                _, _, seed, particle_count, bank_length = REPLAY_HEADER_V1.unpack_from(data)
+                choices, position = 2, REPLAY_HEADER_V1.size
+            else:
+                _, _, seed, particle_count, choices, bank_length = REPLAY_HEADER.unpack_from(data)
+                position = REPLAY_HEADER.size
+        except struct.error:
+            raise ValueError("not a replay file")
+        bank_path = data[position:position + bank_length].decode("utf-8")
+        position += bank_length
+
+        frames = []
+        while position + FRAME.size <= len(data):
+            time_ms, x, y, pressed, count = FRAME.unpack_from(data, position)
+            end = position + FRAME.size + count * EVENT.size
+            if end > len(data):
+                break
+            events = [_unpack_event(*fields) for fields in EVENT.iter_unpack(data[position + FRAME.size:end])]
+            frames.append(ReplayFrame(time_ms, ((x, y), bool(pressed)), events))
+            position = end
+        return cls(seed, particle_count, bank_path, frames, choices)
+
+
+def frame_hash(surface: pygame.Surface) -> str:
+    """Return a short digest of a frame's pixels, independent of the surface's pixel format."""
+    return hashlib.blake2b(pygame.image.tobytes(surface, "RGB"), digest_size=8).hexdigest()
+
+
+class ReplayResult(NamedTuple):
+    frames: int
+    elapsed_s: float
+    frame_ms: List[float]
+    hashes: List[str]
+
+
+def replay(recording: Recording, game, clock: ReplayClock, realtime: bool = False,
+           hash_frames: bool = False) -> ReplayResult:
+    """Feed a recording's frames to a game built with clock, as fast as possible or at the recorded pace."""
+    from aws_quiz_game import dispatch_events
+
+    frame_ms: List[float] = []
+    hashes: List[str] = []
+    start = time.perf_counter()
+    for frame in recording.frames:
+        if realtime:
+            delay = start + frame.time_ms / 1000 - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        # Keep the window responsive; live input is ignored
+        pygame.event.pump()
+        clock.now = frame.time_ms
+        events = frame.events
+        if hash_frames:
+            # The profiler overlay shows wall-clock timings, which would make frames differ between runs
+            events = [event for event in events if not (event.type == pygame.KEYDOWN and event.key == pygame.K_F3)]
+
+        frame_start = time.perf_counter()
+        running = dispatch_events(game, events)
+        game.update(frame.pointer)
+        game.draw()
+        frame_ms.append((time.perf_counter() - frame_start) * 1000)
+        if hash_frames:
+            hashes.append(frame_hash(game.renderer.read_pixels() if game.renderer else game.screen))
+        if not running:
+            break
+    return ReplayResult(len(frame_ms), time.perf_counter() - start, frame_ms, hashes)
+
+
+def main() -> None:
+    """Replay a recording and print frame timings, and optionally frame hashes, as JSON."""
+    parser = argparse.ArgumentParser(description="Replay an AWS Quiz Game input recording")
+    parser.add_argument("recording", help="file written by aws_quiz_game.py --record")
+    parser.add_argument("--realtime", action="store_true",
+                        help="replay at the recorded pace in a window (default: as fast as possible, headless)")
+    parser.add_argument("--hashes", metavar="PATH", help="write one hash per frame to PATH")
+    parser.add_argument("--check", metavar="PATH",
+                        help="compare frame hashes with a file written by --hashes; exit with 1 on a mismatch")
+    parser.add_argument("--full-redraw", action="store_true", help="replay with the full-redraw renderer")
+    parser.add_argument("--software-renderer", action="store_true", help="replay with the SDL2 renderer backend")
+    parser.add_argument("--particles", help="override the recorded particle count or preset")
+    parser.add_argument("--bank", metavar="PATH", help="override the recorded question bank path")
+    parser.add_argument("--no-atlas", action="store_true", help="render all text live")
+    args = parser.parse_args()
+
+    try:
+        recording = Recording.load(args.recording)
+    except (OSError, ValueError) as e:
+        parser.error(f"could not read recording {args.recording}: {e}")
+
+    if not args.realtime:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import aws_quiz_game
+    from particles import resolve_particle_count
+    from question_bank import load_question_bank
+    from render_backend import RendererBackend
+
+    particle_count = recording.particle_count
+    if args.particles:
+        try:
+            particle_count = resolve_particle_count(args.particles)
+        except ValueError:
+            parser.error(f"invalid particle count or preset: {args.particles}")
+    bank_path = args.bank or recording.bank_path
+    question_bank = None
+    if bank_path:
+        try:
+            question_bank = load_question_bank(bank_path)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            parser.error(f"could not open question bank {bank_path}: {e}")
+
+    # Keep the game's startup messages out of the JSON written to stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        renderer = None
+        if args.software_renderer:
+            renderer = RendererBackend("AWS Quiz Replay", (aws_quiz_game.SCREEN_WIDTH, aws_quiz_game.SCREEN_HEIGHT),
+                                       software=True)
+        clock = ReplayClock()
+        # Seed before the game is built: the first round's questions are picked in the constructor
+        random.seed(recording.seed)
+        game = aws_quiz_game.QuizGame(full_redraw=args.full_redraw, particle_count=particle_count,
+                                      question_bank=question_bank, atlas_path=None if args.no_atlas
+                                      else aws_quiz_game.DEFAULT_ATLAS_PATH, renderer=renderer, clock=clock,
+                                      choices=recording.choices)
+    result = replay(recording, game, clock, args.realtime, hash_frames=bool(args.hashes or args.check))
+
+    frame_ms = np.asarray(result.frame_ms)
+    report = {
+        "frames": result.frames,
+        "recorded_frames": len(recording.frames),
+        "seed": recording.seed,
+        "choices": recording.choices,
+        "elapsed_s": round(result.elapsed_s, 3),
+        "frame_ms": {
+            name: round(float(np.percentile(frame_ms, q)), 4) if result.frames else 0.0
+            for name, q in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+        },
+    }
+    if result.hashes:
+        report["digest"] = hashlib.blake2b("".join(result.hashes).encode(), digest_size=8).hexdigest()
+    if args.hashes:
+        with open(args.hashes, "w") as f:
+            f.write("\n".join(result.hashes) + "\n")
+    mismatch = None
+    if args.check:
+        with open(args.check) as f:
+            expected = f.read().split()
+        mismatch = next((i for i, (a, b) in enumerate(zip(result.hashes, expected)) if a != b), None)
+        if mismatch is None and len(expected) != len(result.hashes):
+            mismatch = min(len(expected), len(result.hashes))
+        report["first_mismatch"] = mismatch
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    if question_bank:
+        question_bank.close()
+    pygame.quit()
+    sys.exit(1 if mismatch is not None else 0)
+
+
+if __name__ == "__main__":
+    main()
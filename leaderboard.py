@@ -0,0 +1,182 @@
+"""
+Persistent leaderboard for the AWS Quiz Game.
+Final scores are appended to a checksummed log by a background writer thread,
+and a bisect-ordered index rebuilt from the log at startup answers top-k and
+rank queries without touching the disk.
+"""
+import bisect
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from app_cache import cache_path
+
+LEADERBOARD_FILE = "leaderboard.log"
+LOG_MAGIC = b"AQLB\x01\x00\x00\x00"
+
+# Each record: payload length and CRC-32, then the payload
+RECORD_HEADER = struct.Struct("<HI")
+# Payload: time, score, total, followed by the UTF-8 player name
+SCORE = struct.Struct("<dHH")
+MAX_NAME_BYTES = 64
+
+
+class ScoreEntry(NamedTuple):
+    name: str
+    score: int
+    total: int
+    time: float
+
+
+# Sort key: best ratio first, then more questions, then the earlier score
+ScoreKey = Tuple[float, int, float, int]
+
+
+class Leaderboard:
+    """Append-only score log with an in-memory sorted index."""
+
+    def __init__(self, path: Optional[str] = None, clock=time.time):
+        self.path = path or cache_path(LEADERBOARD_FILE)
+        self.clock = clock
+        self._keys: List[ScoreKey] = []  # Sorted; the last item indexes _entries
+        self._entries: List[ScoreEntry] = []
+        self._best: Dict[str, ScoreKey] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writable = True  # False when the log belongs to something else and must not be appended to
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> None:
+        """Rebuild the index from the log, dropping a torn or corrupt tail."""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return
+        if not data.startswith(LOG_MAGIC):
+            # Appending to it would bury new scores where they are never read, so start a fresh log
+            moved_to = self.path + ".unknown"
+            try:
+                os.replace(self.path, moved_to)
+            except OSError as e:
+                print(f"Leaderboard log {self.path} has an unknown format and cannot be moved aside ({e}); "
+                      "scores will not be saved")
+                self._writable = False
+                return
+            print(f"Moved leaderboard log with an unknown format to {moved_to}; starting a new one")
+            return
+
+        position = len(LOG_MAGIC)
+        entries = []
+        while position + RECORD_HEADER.size <= len(data):
+            length, checksum = RECORD_HEADER.unpack_from(data, position)
+            payload = data[position + RECORD_HEADER.size:position + RECORD_HEADER.size + length]
+            if len(payload) != length or length < SCORE.size or zlib.crc32(payload) != checksum:
+                break
+            timestamp, score, total = SCORE.unpack_from(payload)
+            entries.append(ScoreEntry(payload[SCORE.size:].decode("utf-8", "replace"), score, total, timestamp))
+            position += RECORD_HEADER.size + length
+
+        if position != len(data):
+            # A crash mid-append leaves a partial record; cut it so new records follow valid data
+            try:
+                with open(self.path, "r+b") as f:
+                    f.truncate(position)
+            except OSError:
+                pass
+
+        # Sorting once is cheaper than inserting records one by one
+        for entry in entries:
+            self._index(entry, sort=False)
+        self._keys.sort()
+
+    @staticmethod
+    def _key(entry: ScoreEntry, sequence: int) -> ScoreKey:
+        ratio = entry.score / entry.total if entry.total else 0.0
+        return (-ratio, -entry.total, entry.time, sequence)
+
+    def _index(self, entry: ScoreEntry, sort: bool = True) -> ScoreKey:
+        key = self._key(entry, len(self._entries))
+        self._entries.append(entry)
+        if sort:
+            bisect.insort(self._keys, key)
+        else:
+            self._keys.append(key)
+        best = self._best.get(entry.name)
+        if best is None or key < best:
+            self._best[entry.name] = key
+        return key
+
+    def submit(self, name: str, score: int, total: int) -> ScoreEntry:
+        """Add a score to the index now and queue it for the background writer."""
+        name = name.encode("utf-8")[:MAX_NAME_BYTES].decode("utf-8", "ignore")
+        entry = ScoreEntry(name, score, total, self.clock())
+        with self._lock:
+            self._index(entry)
+        if not self._writable:
+            return entry
+        payload = SCORE.pack(entry.time, score, total) + name.encode("utf-8")
+        self._queue.put(RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="leaderboard-writer", daemon=True)
+            self._writer.start()
+        return entry
+
+    def _write_loop(self) -> None:
+        """Append queued records, syncing each batch so a crash loses at most the last one."""
+        fd = None
+        while True:
+            record = self._queue.get()
+            if record is None:
+                break
+            records = [record]
+            # Write everything that is already queued with one system call
+            while True:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is None:
+                    self._queue.put(None)
+                    break
+                records.append(record)
+            try:
+                if fd is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+                    if os.fstat(fd).st_size == 0:
+                        os.write(fd, LOG_MAGIC)
+                os.write(fd, b"".join(records))
+                os.fsync(fd)
+            except OSError as e:
+                print(f"Could not save leaderboard score: {e}")
+        if fd is not None:
+            os.close(fd)
+
+    def top(self, count: int = 10) -> List[ScoreEntry]:
+        """Return the best count scores."""
+        with self._lock:
+            return [self._entries[key[-1]] for key in self._keys[:count]]
+
+    def rank_of(self, name: str) -> Optional[int]:
+        """Return the 1-based rank of a player's best score, or None if they have none."""
+        with self._lock:
+            key = self._best.get(name)
+            if key is None:
+                return None
+            return bisect.bisect_left(self._keys, key) + 1
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Flush queued scores and stop the writer thread."""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join(timeout)
+            self._writer = None
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Question banks for the AWS Quiz Game.
+Besides the built-in list, questions can come from an on-disk JSONL or SQLite
+bank. JSONL banks are memory-mapped and read through an offset index, so a game
+only parses the handful of questions it actually draws. A watched JSONL bank
+serves a private copy of its file and keeps checksums of it in chunks; when the
+file is edited, reload() re-parses only the records in the chunks that changed
+and patches the index around them.
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import random
+import sqlite3
+import struct
+import sys
+import time
+import zlib
+from array import array
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+from urllib.request import pathname2url
+
+import numpy as np
+
+from app_cache import cache_path, write_atomic
+
+Question = Dict[str, Any]
+
+# Offset index header: magic, version, source size, source mtime (ns), record count
+INDEX_MAGIC = b"AQIX"
+INDEX_VERSION = 2  # 2: records are validated before an index is saved
+INDEX_HEADER = struct.Struct("<4sIQQQ")
+OFFSET = struct.Struct("<Q")
+
+FINGERPRINT_CHUNK = 16 * 1024  # Bytes per checksum used to find the edited region of a watched bank
+
+REQUIRED_KEYS = ("name", "correct", "incorrect", "explanation")
+
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+class BankChange(NamedTuple):
+    """Records start to start + removed of a bank were replaced by added; later ones moved accordingly."""
+    start: int
+    removed: int
+    added: List[Question]
+    count: int  # Questions in the bank after the change
+
+
+class QuestionBank:
+    """Base class for a random-access pool of questions."""
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def get(self, index: int) -> Question:
+        """Return the question at index, with an "id" key identifying it and the index itself under "_position".
+
+        The "id" may come from the bank (e.g. an id column), so only "_position" is safe to pass back to get().
+        """
+        raise NotImplementedError
+
+    def sample(self, count: int, rng: Optional[random.Random] = None) -> List[Question]:
+        """Return count distinct random questions without touching the rest of the bank."""
+        rng = rng or random
+        # random.sample over a range picks indices in O(count) without building a list
+        indices = rng.sample(range(len(self)), min(count, len(self)))
+        return [self.get(index) for index in indices]
+
+    def reload(self) -> Optional[BankChange]:
+        """Pick up edits to the bank's file; banks that cannot change return None."""
+        return None
+
+    def content_digest(self) -> Optional[bytes]:
+        """Return a hash of the bank's contents if it is cheaper than reading every question, else None."""
+        return None
+
+    def close(self) -> None:
+        """Release any files held open by the bank."""
+
+
+class ListQuestionBank(QuestionBank):
+    """Question bank backed by an in-memory list, such as the built-in questions."""
+
+    def __init__(self, questions: Sequence[Question]):
+        self.questions = questions
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def get(self, index: int) -> Question:
+        question = dict(self.questions[index])
+        question.setdefault("id", index)
+        question["_position"] = index
+        return question
+
+
+class JsonlQuestionBank(QuestionBank):
+    """Memory-mapped JSONL bank (one question object per line) read through an offset index."""
+
+    def __init__(self, path: str, index_path: Optional[str] = None, watch: bool = False):
+        self.path = path
+        self._file = open(path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._source_key = (stat.st_size, stat.st_mtime_ns)
+        self._failed_key = None  # File state that could not be parsed on the last reload
+        self._fingerprint: Optional[Fingerprint] = None
+        if watch:
+            # Editors often rewrite the file in place, which a mapping would show through the old
+            # offsets (or fault on, past a truncation), so a watched bank reads a private copy
+            self._data = self._file.read()
+            self._file.close()
+        else:
+            # Empty files cannot be memory-mapped
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b""
+
+        self._index_file = None
+        self._index: Any = None
+        self._count = 0
+        self.index_path = index_path or path + ".idx"
+        if not self._open_index(self.index_path):
+            fallback = cache_path(self._cache_index_name())
+            if index_path is None and self._open_index(fallback):
+                self.index_path = fallback
+            else:
+                try:
+                    self._build_index()
+                except ValueError:
+                    self.close()
+                    raise
+        if watch:
+            self._fingerprint = Fingerprint.of(self._data)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, index: int) -> Question:
+        if not 0 <= index < self._count:
+            raise IndexError(f"question index out of range: {index}")
+        start = self._offset(index)
+        end = self._offset(index + 1)
+        return _parse_record(self._data, start, end, index)
+
+    def content_digest(self) -> Optional[bytes]:
+        # Hashing the bytes runs at disk speed, far faster than parsing the records
+        return hashlib.sha1(self._data).digest()
+
+    def reload(self) -> Optional[BankChange]:
+        """Swap in the edited file of a watched bank, re-parsing only the records that changed.
+
+        Returns None when the file is unchanged. Raises ValueError, and keeps serving the
+        previous contents from its private copy, while an edited record is not a valid
+        question (e.g. half written).
+        """
+        if self._fingerprint is None:
+            return None
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        if (stat.st_size, stat.st_mtime_ns) in (self._source_key, self._failed_key):
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                new_data = f.read()
+        except OSError:
+            # Replaced between the two calls; the next reload sees the new file
+            return None
+        try:
+            change, offsets, fingerprint = self._diff(new_data)
+        except ValueError:
+            self._failed_key = (stat.st_size, stat.st_mtime_ns)
+            raise
+
+        # Only the index may still be mapped from disk; the new one is kept in memory
+        if isinstance(self._index, mmap.mmap):
+            self._index.close()
+        if self._index_file:
+            self._index_file.close()
+        self._data = new_data
+        self._source_key = (stat.st_size, stat.st_mtime_ns)
+        self._fingerprint = fingerprint
+        self._index_file = None
+        self._index = array("Q")
+        self._index.frombytes(offsets.astype("=u8").tobytes())
+        self._count = change.count
+        self._save_index()
+        return change
+
+    def _diff(self, new_data) -> tuple:
+        """Return the change from the fingerprinted contents to new_data, the new offsets and fingerprint."""
+        old = self._fingerprint
+        if isinstance(self._index, mmap.mmap):
+            offsets = np.frombuffer(self._index[INDEX_HEADER.size:], dtype="<u8").astype(np.int64)
+        else:
+            offsets = np.frombuffer(self._index.tobytes(), dtype="=u8").astype(np.int64)
+        count = self._count
+        fingerprint, prefix, suffix = old.compare(new_data)
+
+        # Records that end inside the common prefix, newline included, are unchanged
+        start = min(max(int(np.searchsorted(offsets, prefix, "right")) - 1, 0), count)
+        if start == count and count and not old.newline_at_end:
+            # The last record had no newline, so text appended to the file may extend it
+            start -= 1
+        # Records whose preceding newline lies inside the common suffix are unchanged too
+        stop = max(int(np.searchsorted(offsets[:count], old.size - suffix + 1, "left")), start)
+        shift = len(new_data) - old.size
+        end = int(offsets[stop]) + shift
+        # Blank lines before the first record belong to no record, so an edit there rescans from the top
+        added_offsets = _scan_offsets(new_data, int(offsets[start]) if start else 0, end)
+        bounds = added_offsets + [end]
+        added = [_parse_record(new_data, bounds[i], bounds[i + 1], start + i) for i in range(len(added_offsets))]
+        new_offsets = np.concatenate([offsets[:start], np.asarray(added_offsets, dtype=np.int64),
+                                      offsets[stop:] + shift])
+        return BankChange(start, stop - start, added, len(new_offsets) - 1), new_offsets, fingerprint
+
+    def close(self) -> None:
+        if isinstance(self._index, mmap.mmap):
+            self._index.close()
+        if self._index_file:
+            self._index_file.close()
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+
+    def _offset(self, position: int) -> int:
+        """Return the byte offset of record position (count returns the end of the data)."""
+        if isinstance(self._index, mmap.mmap):
+            return OFFSET.unpack_from(self._index, INDEX_HEADER.size + position * OFFSET.size)[0]
+        return self._index[position]
+
+    def _cache_index_name(self) -> str:
+        digest = hashlib.sha1(os.path.abspath(self.path).encode()).hexdigest()[:16]
+        return f"bank-{digest}.idx"
+
+    def _open_index(self, index_path: str) -> bool:
+        """Memory-map an existing index file if it matches the current bank file."""
+        try:
+            index_file = open(index_path, "rb")
+        except OSError:
+            return False
+        try:
+            header = index_file.read(INDEX_HEADER.size)
+            if len(header) != INDEX_HEADER.size:
+                raise ValueError("truncated index")
+            magic, version, size, mtime_ns, count = INDEX_HEADER.unpack(header)
+            expected_size = INDEX_HEADER.size + (count + 1) * OFFSET.size
+            if (magic, version) != (INDEX_MAGIC, INDEX_VERSION) or (size, mtime_ns) != self._source_key:
+                raise ValueError("stale index")
+            if os.fstat(index_file.fileno()).st_size != expected_size:
+                raise ValueError("truncated index")
+            self._index = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            index_file.close()
+            return False
+        self._index_file = index_file
+        self._count = count
+        return True
+
+    def _build_index(self) -> None:
+        """Scan the bank for record boundaries, check every record and save the index for the next start."""
+        offsets = array("Q", _scan_offsets(self._data, 0, len(self._data)))
+        count = len(offsets)
+        offsets.append(len(self._data))
+        # A malformed line is reported now rather than when a game happens to draw it
+        for index in range(count):
+            _parse_record(self._data, offsets[index], offsets[index + 1], index)
+        self._index = offsets
+        self._count = count
+        self._save_index()
+
+    def _save_index(self) -> None:
+        # Index files are always little-endian
+        stored = self._index
+        if sys.byteorder != "little":
+            stored = array("Q", stored)
+            stored.byteswap()
+        contents = INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, *self._source_key, self._count) + stored.tobytes()
+        if not _write_file_atomic(self.index_path, contents):
+            # The bank may live on a read-only image; keep the index in the user cache instead
+            name = self._cache_index_name()
+            if write_atomic(name, contents):
+                self.index_path = cache_path(name)
+
+
+class SqliteQuestionBank(QuestionBank):
+    """SQLite bank with a questions table (name, correct, incorrect, explanation)."""
+
+    def __init__(self, path: str, table: str = "questions"):
+        self.path = path
+        self.table = table
+        uri = "file:" + pathname2url(os.path.abspath(path)) + "?mode=ro"
+        self._connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        first, last, count = self._connection.execute(
+            f"SELECT min(rowid), max(rowid), count(*) FROM {table}").fetchone()
+        self._count = count
+        self._first = first or 0
+        # Dense rowids map straight to indices; otherwise keep a compact rowid index
+        self._rowids: Optional[array] = None
+        if count and last - first + 1 != count:
+            self._rowids = array("q", (row[0] for row in self._connection.execute(
+                f"SELECT rowid FROM {table} ORDER BY rowid")))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, index: int) -> Question:
+        if not 0 <= index < self._count:
+            raise IndexError(f"question index out of range: {index}")
+        rowid = self._rowids[index] if self._rowids is not None else self._first + index
+        cursor = self._connection.execute(f"SELECT * FROM {self.table} WHERE rowid = ?", (rowid,))
+        columns = [column[0] for column in cursor.description]
+        question = dict(zip(columns, cursor.fetchone()))
+        question.setdefault("id", index)
+        question["_position"] = index
+        return question
+
+    def content_digest(self) -> Optional[bytes]:
+        digest = hashlib.sha1(self.table.encode("utf-8") + b"\0")
+        with open(self.path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.digest()
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def _scan_offsets(data, start: int, end: int) -> List[int]:
+    """Return the start offsets of the non-blank lines between start and end."""
+    offsets = []
+    position = start
+    while position < end:
+        line_end = data.find(b"\n", position, end)
+        if line_end < 0:
+            line_end = end
+        if data[position:line_end].strip():
+            offsets.append(position)
+        position = line_end + 1
+    return offsets
+
+
+def _line_number(data, offset: int) -> int:
+    return data[:offset].count(b"\n") + 1
+
+
+def _parse_record(data, start: int, end: int, index: int) -> Question:
+    """Parse the record at position index, raising ValueError with its line number if it is not a question."""
+    try:
+        question = json.loads(data[start:end])
+    except ValueError as e:
+        detail = f"{e.msg} at column {e.colno}" if isinstance(e, json.JSONDecodeError) else str(e)
+        raise ValueError(f"line {_line_number(data, start)}: {detail}")
+    if not isinstance(question, dict) or not all(key in question for key in REQUIRED_KEYS):
+        raise ValueError(f"line {_line_number(data, start)}: expected an object with the keys "
+                         + ", ".join(REQUIRED_KEYS))
+    question.setdefault("id", index)
+    question["_position"] = index
+    return question
+
+
+class Fingerprint(NamedTuple):
+    """CRC-32 checksums of a file's chunks, counted from its start and from its end."""
+    size: int
+    head: array
+    tail: array
+    newline_at_end: bool
+
+    @classmethod
+    def of(cls, data, head: Optional[array] = None, tail: Optional[array] = None) -> "Fingerprint":
+        """Checksum data, reusing the leading entries of head and tail that are known to match."""
+        size = len(data)
+        chunks = size // FINGERPRINT_CHUNK
+        head = array("I", head or ())
+        for i in range(len(head), chunks):
+            head.append(zlib.crc32(data[i * FINGERPRINT_CHUNK:(i + 1) * FINGERPRINT_CHUNK]))
+        tail = array("I", tail or ())
+        for i in range(len(tail), chunks):
+            tail.append(zlib.crc32(data[size - (i + 1) * FINGERPRINT_CHUNK:size - i * FINGERPRINT_CHUNK]))
+        return cls(size, head, tail, data[-1:] == b"\n")
+
+    def compare(self, data) -> tuple:
+        """Return the fingerprint of data and the lengths of the prefix and suffix it shares with this one."""
+        size = len(data)
+        limit = min(self.size, size)
+        matched = 0
+        while (matched < len(self.head) and (matched + 1) * FINGERPRINT_CHUNK <= limit and
+               zlib.crc32(data[matched * FINGERPRINT_CHUNK:(matched + 1) * FINGERPRINT_CHUNK]) == self.head[matched]):
+            matched += 1
+        prefix = matched * FINGERPRINT_CHUNK
+        # The suffix may not overlap the prefix in either file
+        limit -= prefix
+        matched_tail = 0
+        while (matched_tail < len(self.tail) and (matched_tail + 1) * FINGERPRINT_CHUNK <= limit and
+               zlib.crc32(data[size - (matched_tail + 1) * FINGERPRINT_CHUNK:size - matched_tail * FINGERPRINT_CHUNK])
+               == self.tail[matched_tail]):
+            matched_tail += 1
+        fingerprint = Fingerprint.of(data, self.head[:matched], self.tail[:matched_tail])
+        return fingerprint, prefix, matched_tail * FINGERPRINT_CHUNK
+
+
+def _write_file_atomic(path: str, contents: bytes) -> bool:
+    """Atomically write contents to path and return True on success."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(contents)
+        os.replace(tmp_path, path)
+        return True
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        return False
+
+
+def can_watch(path: str) -> bool:
+    """Return True if a bank opened with watch=True can pick up edits to its file (only JSONL banks can)."""
+    return os.path.splitext(path)[1].lower() in JSONL_SUFFIXES
+
+
+def load_question_bank(path: str, watch: bool = False) -> QuestionBank:
+    """Open a JSONL or SQLite question bank based on the file extension; watched JSONL banks can reload()."""
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix in JSONL_SUFFIXES:
+        return JsonlQuestionBank(path, watch=watch)
+    if suffix in SQLITE_SUFFIXES:
+        return SqliteQuestionBank(path)
+    raise ValueError(f"unsupported question bank format: {path} (expected .jsonl or .sqlite)")
+
+
+def main() -> None:
+    """Build indexes for and sample from on-disk question banks."""
+    parser = argparse.ArgumentParser(description="Inspect AWS Quiz Game question banks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    index_parser = subparsers.add_parser("index", help="build or validate the offset index of a bank")
+    index_parser.add_argument("path")
+    sample_parser = subparsers.add_parser("sample", help="print random questions from a bank")
+    sample_parser.add_argument("path")
+    sample_parser.add_argument("-k", "--count", type=int, default=5)
+    sample_parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        bank = load_question_bank(args.path)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        parser.error(f"could not open question bank {args.path}: {e}")
+    opened_ms = (time.perf_counter() - start) * 1000
+    if args.command == "index":
+        index_path = getattr(bank, "index_path", None)
+        print(f"{len(bank)} questions, opened in {opened_ms:.1f} ms" + (f", index {index_path}" if index_path else ""))
+    else:
+        rng = random.Random(args.seed)
+        for question in bank.sample(args.count, rng):
+            question.pop("_position")
+            print(json.dumps(question, ensure_ascii=False))
+    bank.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Background asset prefetch for the AWS Quiz Game.
+While the feedback screen is up, a worker thread renders what the next
+question will need: text surfaces, button faces and wrapped explanation
+lines. The results come back through a queue and are adopted into the shared
+caches in one step when the player moves on, so the next screen only blits.
+"""
+import queue
+import threading
+from typing import Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+import pygame
+
+
+class PreparedAssets(NamedTuple):
+    """Rendered assets keyed exactly like the caches they will be adopted into."""
+    texts: Dict[tuple, pygame.Surface]  # TEXT_CACHE entries
+    faces: Dict[tuple, pygame.Surface]  # Button face entries
+    lines: Dict[tuple, Tuple[str, ...]]  # TEXT_LAYOUT entries by (text, font, width)
+
+
+class QuestionPrefetcher:
+    """Runs prefetch jobs on one daemon thread and hands their results back without blocking."""
+
+    def __init__(self):
+        self._jobs: "queue.SimpleQueue[Optional[Tuple[Hashable, Callable[[], PreparedAssets]]]]" = queue.SimpleQueue()
+        self._results: "queue.SimpleQueue[Tuple[Hashable, PreparedAssets]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self.pending = 0
+        self.jobs = 0
+        self.hits = 0  # Results that arrived in time for their question
+
+    def submit(self, key: Hashable, job: Callable[[], PreparedAssets]) -> None:
+        """Queue job to run in the background; its result is returned by take(key)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="question-prefetch", daemon=True)
+            self._thread.start()
+        self.pending += 1
+        self.jobs += 1
+        self._jobs.put((key, job))
+
+    def _run(self) -> None:
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                break
+            key, job = item
+            try:
+                result = job()
+            except Exception as e:
+                # A failed prefetch only means the next screen renders its text itself
+                print(f"Question prefetch failed: {e}")
+                result = PreparedAssets({}, {}, {})
+            self._results.put((key, result))
+
+    def take(self, key: Hashable) -> Optional[PreparedAssets]:
+        """Return the finished result for key without waiting, dropping results for other keys."""
+        found = None
+        while self.pending:
+            try:
+                result_key, result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            if result_key == key:
+                found = result
+        if found is not None:
+            self.hits += 1
+        return found
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._jobs.put(None)
+            self._thread.join(1.0)
+            self._thread = None
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Headless rendering benchmark for the AWS Quiz Game.
+Steps QuizGame through fixed screens with the SDL dummy drivers and reports
+frame-time percentiles, frames per second and allocations per screen as JSON.
+"""
+import os
+
+# The dummy drivers must be selected before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import contextlib
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import pygame
+
+import aws_quiz_game
+from aws_quiz_game import QuizGame, TEXT_CACHE
+from input_replay import ReplayClock
+from particles import PARTICLE_PRESETS, resolve_particle_count
+from render_backend import RendererBackend
+
+FRAME_MS = 1000 / 60  # Simulated frame interval used to advance animations
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def answer_current_question(game: QuizGame, correct: bool) -> None:
+    """Click the correct or incorrect answer button of the current question."""
+    for choice in game.engine.choices:
+        if choice.correct == correct:
+            game.handle_click(game.buttons[choice.id].rect.center)
+            return
+
+
+def enter_question(game: QuizGame) -> None:
+    game.restart()
+
+
+def enter_correct_feedback(game: QuizGame) -> None:
+    game.restart()
+    answer_current_question(game, correct=True)
+
+
+def enter_incorrect_feedback(game: QuizGame) -> None:
+    game.restart()
+    answer_current_question(game, correct=False)
+
+
+def enter_results_high(game: QuizGame) -> None:
+    game.restart()
+    engine = game.engine
+    while not engine.is_finished():
+        engine.answer(engine.correct_choice.id)
+        engine.advance()
+
+
+# Benchmarked screens in the order they are run
+SCENARIOS: Dict[str, Callable[[QuizGame], None]] = {
+    "question": enter_question,
+    "feedback_correct": enter_correct_feedback,
+    "feedback_incorrect": enter_incorrect_feedback,
+    "results_high": enter_results_high,
+}
+
+
+def step(game: QuizGame) -> None:
+    """Run one update + draw, keeping the correct-answer celebration alive."""
+    if game.show_feedback and game.feedback_color == aws_quiz_game.GREEN:
+        if not game.celebration_active:
+            game.celebration_active = True
+            game.create_celebration_particles()
+        # Restart the pulse before the text would disappear
+        if game.timestep.elapsed_ms(game.celebration_ticks) >= 2000:
+            game.celebration_ticks = 0
+    # Pretend frames arrive at 60 FPS, one simulation tick each
+    game.clock.now += FRAME_MS
+    game.update()
+    game.draw()
+
+
+def run_scenario(game: QuizGame, name: str, frames: int, warmup: int) -> Dict[str, float]:
+    """Benchmark one screen and return its statistics."""
+    SCENARIOS[name](game)
+    for _ in range(warmup):
+        step(game)
+
+    # Timed pass
+    TEXT_CACHE.reset_stats()
+    gc_before = sum(stat["collections"] for stat in gc.get_stats())
+    blit_area = 0
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter_ns()
+        step(game)
+        times.append((time.perf_counter_ns() - start) / 1e6)
+        blit_area += game.last_frame_blit_area
+    gc_collections = sum(stat["collections"] for stat in gc.get_stats()) - gc_before
+    cache_stats = TEXT_CACHE.stats()
+
+    # Separate traced pass so tracemalloc overhead does not skew the timings
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    for _ in range(frames):
+        step(game)
+    _, peak = tracemalloc.get_traced_memory()
+    snapshot_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = snapshot_after.compare_to(snapshot_before, "filename")
+    allocated_blocks = sum(max(0, stat.count_diff) for stat in stats)
+
+    times.sort()
+    total_ms = sum(times)
+    return {
+        "frames": frames,
+        "p50_ms": round(percentile(times, 0.50), 4),
+        "p95_ms": round(percentile(times, 0.95), 4),
+        "p99_ms": round(percentile(times, 0.99), 4),
+        "max_ms": round(times[-1], 4),
+        "fps": round(frames / (total_ms / 1000), 1) if total_ms else 0.0,
+        "allocated_blocks": allocated_blocks,
+        "allocated_blocks_per_frame": round(allocated_blocks / frames, 2),
+        "peak_traced_bytes": peak,
+        "gc_collections": gc_collections,
+        "blit_area_per_frame": round(blit_area / frames),
+        "text_cache_hits": cache_stats["hits"],
+        "text_cache_misses": cache_stats["misses"],
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print the results as JSON."""
+    parser = argparse.ArgumentParser(description="Headless rendering benchmark for the AWS Quiz Game")
+    parser.add_argument("--frames", type=int, default=600, help="timed frames per screen")
+    parser.add_argument("--warmup", type=int, default=60, help="untimed frames before each screen")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for question and particle selection")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                        help="screen to benchmark (repeatable, default: all)")
+    parser.add_argument("--full-redraw", action="store_true", help="benchmark the full-redraw fallback path")
+    parser.add_argument("--renderer", action="store_true",
+                        help="benchmark the SDL2 renderer backend (software renderer on the dummy driver)")
+    parser.add_argument("--particles", default="default",
+                        help="celebration particle count or preset (%s)" % ", ".join(PARTICLE_PRESETS))
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    try:
+        particle_count = resolve_particle_count(args.particles)
+    except ValueError:
+        parser.error(f"invalid particle count or preset: {args.particles}")
+
+    random.seed(args.seed)
+    # Keep the game's startup messages out of the JSON written to stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        renderer = None
+        if args.renderer:
+            renderer = RendererBackend("AWS Quiz Benchmark", (aws_quiz_game.SCREEN_WIDTH, aws_quiz_game.SCREEN_HEIGHT),
+                                       software=True)
+        game = QuizGame(full_redraw=args.full_redraw, particle_count=particle_count, renderer=renderer,
+                        clock=ReplayClock())
+    report = {
+        "config": {
+            "frames": args.frames,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "full_redraw": args.full_redraw,
+            "renderer": args.renderer,
+            "particles": particle_count,
+            "video_driver": pygame.display.get_driver(),
+            "pygame": pygame.version.ver,
+            "python": sys.version.split()[0],
+        },
+        "scenarios": {},
+    }
+    for name in args.scenario or SCENARIOS:
+        report["scenarios"][name] = run_scenario(game, name, args.frames, args.warmup)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Headless quiz engine for the AWS Quiz Game.
+Holds the round state, question progression and scoring without any pygame
+dependency. Answers are checked by choice ID, so the renderer, tests and batch
+tools all drive the same state machine. Rounds with more than two choices
+take their extra wrong answers from a cached distractor index.
+"""
+import random
+import time
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from question_bank import BankChange, Question, QuestionBank, ListQuestionBank
+from quiz_questions import QUIZ_QUESTIONS
+
+QUESTIONS_PER_GAME = 5
+MIN_CHOICES = 2
+MAX_CHOICES = 6
+
+# Round phases
+QUESTION = "question"
+FEEDBACK = "feedback"
+RESULTS = "results"
+
+
+class Choice(NamedTuple):
+    """One answer option; id is its position in the displayed order."""
+    id: int
+    text: str
+    correct: bool
+
+
+class QuizEngine:
+    """State machine for one quiz round: question -> feedback -> ... -> results."""
+
+    def __init__(self, question_bank: Optional[QuestionBank] = None, review_scheduler=None,
+                 questions_per_game: int = QUESTIONS_PER_GAME, rng: Optional[random.Random] = None,
+                 clock: Callable[[], float] = time.monotonic, choices: int = MIN_CHOICES, distractors=None):
+        # The built-in list is the default bank
+        self.question_bank = question_bank or ListQuestionBank(QUIZ_QUESTIONS)
+        # Optional spaced-repetition scheduler that favors due and missed questions
+        self.review_scheduler = review_scheduler
+        self.questions_per_game = questions_per_game
+        self.rng = rng or random
+        self.clock = clock
+        if not MIN_CHOICES <= choices <= MAX_CHOICES:
+            raise ValueError(f"choices must be between {MIN_CHOICES} and {MAX_CHOICES}: {choices}")
+        self.choice_count = choices
+        # DistractorIndex for the bank, loaded (or built) now so no frame of a round waits for it
+        if distractors is None and choices > MIN_CHOICES:
+            from distractor_index import DistractorIndex
+            distractors = DistractorIndex.for_bank(self.question_bank)
+        self.distractors = distractors
+        self.restart()
+
+    def restart(self) -> None:
+        """Start a new round with freshly selected questions."""
+        self.questions = self.select_questions()
+        self.total_questions = len(self.questions)
+        self.current_question_index = 0
+        self.score = 0
+        self.setup_question()
+
+    def select_questions(self) -> List[Question]:
+        """Select the questions for a round."""
+        if self.review_scheduler:
+            return self.review_scheduler.select(self.question_bank, self.questions_per_game)
+        # Sample from the bank's index so only the chosen questions are loaded
+        return self.question_bank.sample(self.questions_per_game, self.rng)
+
+    def setup_question(self) -> None:
+        """Shuffle the choices of the current question, or finish the round."""
+        self.last_choice: Optional[Choice] = None
+        self.question_started_at = self.answered_at = self.clock()
+        if self.current_question_index >= self.total_questions:
+            self.phase = RESULTS
+            self.choices: List[Choice] = []
+            return
+        question = self.questions[self.current_question_index]
+        options = [(text, i == 0) for i, text in enumerate(self.choice_texts(question))]
+        self.rng.shuffle(options)
+        self.choices = [Choice(i, text, correct) for i, (text, correct) in enumerate(options)]
+        self.phase = QUESTION
+
+    def choice_texts(self, question: Question) -> List[str]:
+        """Return the correct answer of a question followed by its wrong answers, before shuffling."""
+        if self.choice_count == MIN_CHOICES:
+            return [question["correct"], question["incorrect"]]
+        return [question["correct"]] + self.distractors.distractors(question, self.choice_count - 1)
+
+    def reload_bank(self) -> Optional[List[Tuple[Question, Question]]]:
+        """Pick up edits to the question bank and return (old, new) for this round's edited questions.
+
+        Returns None if the bank did not change. Questions not shown yet are replaced by their
+        edited versions, found by content since lines inserted or deleted before them change
+        their positions; the current one is left alone, so call this between questions.
+        """
+        change = self.question_bank.reload()
+        if change is None:
+            return None
+        end = change.start + change.removed
+        shift = len(change.added) - change.removed
+        edited = []
+        for position in range(self.current_question_index, len(self.questions)):
+            old = self.questions[position]
+            old_position = old["_position"]
+            if old_position is None or old_position < change.start:
+                continue
+            if old_position >= end:
+                # Untouched by the edit, but lines inserted or deleted before it moved it
+                self.questions[position] = dict(old, _position=old_position + shift)
+                continue
+            new = _find_edited(old, change)
+            if new is None:
+                # Deleted from the bank; the round still asks it as it was drawn, but its old position
+                # now names another record, so its answers are not credited to any
+                self.questions[position] = dict(old, _position=None)
+                continue
+            if _content(new) == _content(old):
+                # Only moved along with lines inserted or deleted next to it
+                self.questions[position] = new
+                continue
+            edited.append((old, new))
+            if position > self.current_question_index:
+                self.questions[position] = new
+        return edited
+
+    @property
+    def current_question(self) -> Optional[Question]:
+        """Return the question being asked, or None on the results screen."""
+        if self.phase == RESULTS:
+            return None
+        return self.questions[self.current_question_index]
+
+    def check(self, choice_id: int) -> Choice:
+        """Return the choice with choice_id for the current question without answering it."""
+        if self.phase != QUESTION:
+            raise ValueError(f"cannot answer in the {self.phase} phase")
+        if not 0 <= choice_id < len(self.choices):
+            raise ValueError(f"unknown choice id: {choice_id}")
+        return self.choices[choice_id]
+
+    def answer(self, choice_id: int) -> bool:
+        """Answer the current question with a choice ID and return True if it was correct."""
+        choice = self.check(choice_id)
+        if self.review_scheduler and self.current_question["_position"] is not None:
+            self.review_scheduler.record(self.current_question, choice.correct)
+        if choice.correct:
+            self.score += 1
+        self.last_choice = choice
+        self.answered_at = self.clock()
+        self.phase = FEEDBACK
+        return choice.correct
+
+    def reveal(self) -> None:
+        """Move to the feedback phase without an answer, e.g. when time runs out."""
+        if self.phase != QUESTION:
+            raise ValueError(f"cannot reveal in the {self.phase} phase")
+        self.answered_at = self.clock()
+        self.phase = FEEDBACK
+
+    def advance(self) -> None:
+        """Leave the feedback phase for the next question or the results."""
+        if self.phase != FEEDBACK:
+            raise ValueError(f"cannot advance in the {self.phase} phase")
+        self.current_question_index += 1
+        self.setup_question()
+
+    @property
+    def response_time(self) -> float:
+        """Seconds the player took to answer the current question."""
+        return self.answered_at - self.question_started_at
+
+    @property
+    def correct_choice(self) -> Optional[Choice]:
+        """Return the correct choice of the current question."""
+        return next((choice for choice in self.choices if choice.correct), None)
+
+    def is_finished(self) -> bool:
+        """Return True once every question in the round has been answered."""
+        return self.phase == RESULTS
+
+    def percentage(self) -> float:
+        """Return the score as a percentage of the round."""
+        return (self.score / self.total_questions) * 100 if self.total_questions else 0.0
+
+
+def _content(question: Question) -> Question:
+    """Return a question without the keys that only say where it sits in the bank."""
+    return {key: value for key, value in question.items() if key not in ("id", "_position")}
+
+
+def _find_edited(old: Question, change: BankChange) -> Optional[Question]:
+    """Return the record that replaced old in a bank change, or None if it was deleted."""
+    for same in (lambda new: (new["name"], new["correct"]) == (old["name"], old["correct"]),
+                 lambda new: new["name"] == old["name"],
+                 lambda new: new["correct"] == old["correct"] and new["incorrect"] == old["incorrect"]):
+        matches = [new for new in change.added if same(new)]
+        if len(matches) == 1:
+            return matches[0]
+    # Changing both the name and the answers makes it a different question
+    return None
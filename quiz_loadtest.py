@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Load-test client for the AWS Quiz Game multiplayer server.
+Opens many concurrent player connections from one process, answers every
+question after a random think time and reports the per-answer latency, from
+sending an answer to receiving its acknowledgement.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+from quiz_server import DEFAULT_PORT, encode
+
+
+class LoadStats:
+    """Counters and answer latencies collected over all simulated players."""
+
+    def __init__(self):
+        self.connected = 0
+        self.failed = 0
+        self.answers = 0
+        self.errors = 0
+        self.results = 0
+        self.latencies_ms: List[float] = []
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def run_player(number: int, host: str, port: int, rounds: int, think_ms: float,
+                     rng: random.Random, stats: LoadStats) -> None:
+    """Play rounds as one player, picking a random choice for every question."""
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        stats.failed += 1
+        return
+    stats.connected += 1
+    writer.write(encode({"t": "join", "name": f"load{number}"}))
+    sent_at = 0.0
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            kind = message["t"]
+            if kind == "question":
+                await asyncio.sleep(rng.uniform(0, think_ms) / 1000)
+                sent_at = time.perf_counter()
+                writer.write(encode({"t": "answer", "q": message["q"],
+                                     "c": rng.randrange(len(message["choices"]))}))
+                stats.answers += 1
+            elif kind == "ack":
+                stats.latencies_ms.append((time.perf_counter() - sent_at) * 1000)
+            elif kind == "error":
+                stats.errors += 1
+            elif kind == "results":
+                stats.results += 1
+                if message["round"] >= rounds:
+                    break
+    except (ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run_load(host: str, port: int, clients: int, rounds: int, think_ms: float,
+                   connect_per_second: float, seed: int) -> LoadStats:
+    stats = LoadStats()
+    tasks = []
+    for number in range(clients):
+        tasks.append(asyncio.create_task(run_player(number, host, port, rounds, think_ms,
+                                                    random.Random(seed * 1_000_003 + number), stats)))
+        if connect_per_second and number % 100 == 99:
+            # Ramp up connections instead of overflowing the server's accept backlog
+            await asyncio.sleep(100 / connect_per_second)
+    await asyncio.gather(*tasks)
+    return stats
+
+
+def raise_open_file_limit(needed: int) -> None:
+    """Raise the soft open-file limit so one process can hold every connection."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+
+
+def start_local_server(port: int, clients: int, rounds: int, question_seconds: float) -> subprocess.Popen:
+    """Start quiz_server.py in a subprocess that begins once every client has joined."""
+    server_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "quiz_server.py")
+    process = subprocess.Popen([sys.executable, server_path, "--port", str(port), "--rounds", str(rounds),
+                                "--min-players", str(clients), "--lobby-seconds", "0.5",
+                                "--reveal-seconds", "0.5", "--question-seconds", str(question_seconds)],
+                               stdout=subprocess.PIPE, text=True)
+    # Wait for the listening banner
+    print(process.stdout.readline().strip(), file=sys.stderr)
+    return process
+
+
+def main() -> None:
+    """Run the load test and print a JSON summary."""
+    parser = argparse.ArgumentParser(description="Load-test the AWS Quiz Game multiplayer server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("-n", "--clients", type=int, default=5000, help="concurrent player connections")
+    parser.add_argument("--rounds", type=int, default=1, help="rounds each player stays for")
+    parser.add_argument("--think-ms", type=float, default=2000, help="maximum random think time per answer")
+    parser.add_argument("--connect-rate", type=float, default=2000, help="new connections per second (0: no limit)")
+    parser.add_argument("--local", action="store_true", help="start a quiz server subprocess for the test")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    raise_open_file_limit(args.clients + 64)
+    server: Optional[subprocess.Popen] = None
+    if args.local:
+        server = start_local_server(args.port, args.clients, args.rounds, args.think_ms / 1000 + 5)
+    start = time.perf_counter()
+    try:
+        stats = asyncio.run(run_load(args.host, args.port, args.clients, args.rounds, args.think_ms,
+                                     args.connect_rate, args.seed))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(stats.latencies_ms)
+    report = {
+        "clients": args.clients,
+        "connected": stats.connected,
+        "failed": stats.failed,
+        "answers": stats.answers,
+        "acknowledged": len(latencies),
+        "errors": stats.errors,
+        "results": stats.results,
+        "elapsed_s": round(elapsed, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 2),
+            "p95": round(percentile(latencies, 0.95), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+        },
+    }
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
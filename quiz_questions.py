@@ -0,0 +1,120 @@
+"""
+Built-in question list for the AWS Quiz Game.
+Kept free of pygame so the headless engine and batch tools can import it.
+"""
+
+# Quiz questions - each entry contains:
+# - Japanese full name (surname + given name)
+# - Correct AWS service
+# - Incorrect AWS service (similar but wrong)
+# - Optional explanation of the metaphorical connection
+QUIZ_QUESTIONS = [
+    {
+        "name": "高橋 龍",
+        "correct": "Amazon EC2",
+        "incorrect": "Amazon Lightsail",
+        "explanation": "高橋 (Takahashi) means 'high bridge', representing the connection to the cloud. 龍 (Ryu) means 'dragon', symbolizing EC2's powerful computing capabilities."
+    },
+    {
+        "name": "水野 清",
+        "correct": "Amazon RDS",
+        "incorrect": "Amazon DynamoDB",
+        "explanation": "水野 (Mizuno) contains 水 (water), while 清 (Sei) means 'clear/pure', representing how RDS handles data flow like a well-managed stream of information."
+    },
+    {
+        "name": "雲井 保",
+        "correct": "Amazon S3",
+        "incorrect": "Amazon EBS",
+        "explanation": "雲井 (Kumoi) contains 雲 (cloud), and 保 (Tamotsu) means 'to protect/preserve', representing S3's role in securely storing data in the cloud."
+    },
+    {
+        "name": "早河 道",
+        "correct": "Amazon CloudFront",
+        "incorrect": "Amazon Route 53",
+        "explanation": "早河 (Hayakawa) contains 早 (fast) and 河 (river), while 道 (Michi) means 'path/road', representing CloudFront's fast content delivery network."
+    },
+    {
+        "name": "監物 晴",
+        "correct": "Amazon CloudWatch",
+        "incorrect": "AWS Config",
+        "explanation": "監物 (Kenmotsu) contains 監 (supervise), and 晴 (Haru) means 'clear/bright', representing CloudWatch's monitoring capabilities that provide clear insights."
+    },
+    {
+        "name": "壁川 守",
+        "correct": "AWS WAF",
+        "incorrect": "AWS Shield",
+        "explanation": "壁川 (Kabekawa) contains 壁 (wall), and 守 (Mamoru) means 'to protect', representing WAF's role as a web application firewall that guards against threats."
+    },
+    {
+        "name": "氷室 永",
+        "correct": "Amazon Glacier",
+        "incorrect": "AWS Backup",
+        "explanation": "氷室 (Himuro) means 'ice room', and 永 (Hisashi) means 'eternal/long-lasting', representing Glacier's long-term cold storage capabilities."
+    },
+    {
+        "name": "関 計",
+        "correct": "AWS Lambda",
+        "incorrect": "AWS Fargate",
+        "explanation": "関 (Seki) means 'related/connection', and 計 (Kei) means 'calculate/measure', representing Lambda's function-based serverless computing."
+    },
+    {
+        "name": "智野 探",
+        "correct": "Amazon Athena",
+        "incorrect": "Amazon Redshift",
+        "explanation": "智野 (Tomono) contains 智 (wisdom), and 探 (Sagasu) means 'to search/explore', representing Athena's intelligent query service named after the Greek goddess of wisdom."
+    },
+    {
+        "name": "桜井 器",
+        "correct": "Amazon ECS",
+        "incorrect": "Amazon EKS",
+        "explanation": "桜井 (Sakurai) is a common Japanese surname, while 器 (Utsuwa) means 'container', representing Amazon ECS (Elastic Container Service)."
+    },
+    {
+        "name": "森 賢",
+        "correct": "Amazon SageMaker",
+        "incorrect": "Amazon Comprehend",
+        "explanation": "森 (Mori) means 'forest', and 賢 (Ken) means 'wisdom/intelligence', representing SageMaker's role in bringing wisdom (sage) and creating value from data forests."
+    },
+    {
+        "name": "大野 無",
+        "correct": "Amazon Aurora",
+        "incorrect": "Amazon Neptune",
+        "explanation": "大野 (Ohno) means 'big field', and 無 (Mu) means 'nothingness/infinity', representing Aurora's vast scalability and performance capabilities."
+    },
+    {
+        "name": "渡辺 信",
+        "correct": "Amazon SNS",
+        "incorrect": "Amazon SQS",
+        "explanation": "渡辺 (Watanabe) contains 渡 (to cross/transmit), and 信 (Shin) means 'message/trust', representing SNS's role in message transmission and notifications."
+    },
+    {
+        "name": "鍵山 秘",
+        "correct": "AWS KMS",
+        "incorrect": "AWS Secrets Manager",
+        "explanation": "鍵山 (Kagiyama) contains 鍵 (key), and 秘 (Hi) means 'secret', representing KMS's role in key management and encryption."
+    },
+    {
+        "name": "橋本 連",
+        "correct": "AWS Step Functions",
+        "incorrect": "AWS AppFlow",
+        "explanation": "橋本 (Hashimoto) contains 橋 (bridge), and 連 (Ren) means 'connect/link', representing Step Functions' role in coordinating multiple AWS services."
+    },
+    {
+        "name": "小川 流",
+        "correct": "Amazon Kinesis",
+        "incorrect": "Amazon MSK",
+        "explanation": "小川 (Ogawa) means 'small river', and 流 (Ryu) means 'flow/stream', representing Kinesis's role in real-time data streaming."
+    },
+    {
+        "name": "山田 索",
+        "correct": "Amazon Elasticsearch",
+        "incorrect": "Amazon CloudSearch",
+        "explanation": "山田 (Yamada) is a common Japanese surname, and 索 (Saku) means 'search', representing Elasticsearch's powerful search capabilities."
+    },
+    {
+        "name": "石川 築",
+        "correct": "AWS CloudFormation",
+        "incorrect": "AWS CDK",
+        "explanation": "石川 (Ishikawa) contains 石 (stone), and 築 (Chiku) means 'build/construct', representing CloudFormation's role in building infrastructure."
+    }
+]
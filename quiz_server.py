@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Multiplayer quiz server for the AWS Quiz Game.
+Every connected player answers the same round at the same time. Rounds are run
+by a shared QuizEngine; players talk to the server over TCP with one compact
+JSON object per line.
+
+Client -> server:
+    {"t":"join","name":"..."}
+    {"t":"answer","q":<question number>,"c":<choice id>}
+Server -> client:
+    {"t":"welcome","id":<player id>}
+    {"t":"question","round":r,"q":i,"total":n,"name":"...","choices":[...],"seconds":s}
+    {"t":"ack","q":i,"correct":bool,"score":s}
+    {"t":"reveal","q":i,"correct":<choice id>,"explanation":"..."}
+    {"t":"results","round":r,"score":s,"total":n,"rank":k,"players":p,"top":[[name,score],...]}
+    {"t":"error","message":"..."}
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional
+
+from question_bank import QuestionBank, can_watch, load_question_bank
+from quiz_engine import QuizEngine, MIN_CHOICES, MAX_CHOICES
+
+DEFAULT_PORT = 8765
+MAX_LINE_BYTES = 4096
+MAX_NAME_LENGTH = 32
+WRITE_BUFFER_LIMIT = 256 * 1024  # Players this far behind are disconnected
+TOP_PLAYERS = 10
+
+
+def encode(message: dict) -> bytes:
+    """Encode a message as one compact JSON line."""
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class PlayerSession:
+    """Per-connection state."""
+
+    __slots__ = ("player_id", "name", "writer", "score", "answered", "outbox", "connected")
+
+    def __init__(self, player_id: int, writer: asyncio.StreamWriter):
+        self.player_id = player_id
+        self.name = f"player{player_id}"
+        self.writer = writer
+        self.score = 0
+        self.answered = -1  # Question number of the last answer in this round
+        self.outbox: List[bytes] = []
+        self.connected = True
+
+
+class QuizServer:
+    """Runs shared rounds and answers players over line-delimited JSON."""
+
+    def __init__(self, question_bank: Optional[QuestionBank] = None, question_seconds: float = 20.0,
+                 reveal_seconds: float = 3.0, lobby_seconds: float = 10.0, rounds: int = 0,
+                 min_players: int = 1, choices: int = 2, watch_bank: bool = False):
+        self.engine = QuizEngine(question_bank, choices=choices)
+        self.watch_bank = watch_bank
+        self.question_seconds = question_seconds
+        self.reveal_seconds = reveal_seconds
+        self.lobby_seconds = lobby_seconds
+        self.rounds = rounds
+        self.min_players = max(1, min_players)
+        self.round = 0
+        self.sessions: Dict[int, PlayerSession] = {}
+        self.answers = 0
+        self.answered_count = 0  # Players who answered the current question
+        self._next_player_id = 1
+        self._dirty: List[PlayerSession] = []
+        self._flush_scheduled = False
+        self._all_answered = asyncio.Event()
+
+    # Outgoing messages
+
+    def send(self, session: PlayerSession, data: bytes) -> None:
+        """Queue data for a player; queued data is written once per event loop iteration."""
+        if not session.connected:
+            return
+        if not session.outbox:
+            self._dirty.append(session)
+        session.outbox.append(data)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+    def broadcast(self, message: dict) -> None:
+        """Send the same message to every player, encoding it only once."""
+        data = encode(message)
+        for session in self.sessions.values():
+            self.send(session, data)
+
+    def _flush(self) -> None:
+        """Write every queued message with one writelines call per player."""
+        self._flush_scheduled = False
+        dirty, self._dirty = self._dirty, []
+        for session in dirty:
+            outbox, session.outbox = session.outbox, []
+            if not session.connected:
+                continue
+            transport = session.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > WRITE_BUFFER_LIMIT:
+                # A client that stopped reading must not make the server buffer without bound
+                self.disconnect(session)
+                continue
+            session.writer.writelines(outbox)
+
+    def disconnect(self, session: PlayerSession) -> None:
+        if session.connected:
+            session.connected = False
+            self.sessions.pop(session.player_id, None)
+            session.writer.close()
+            if session.answered == self.engine.current_question_index:
+                self.answered_count -= 1
+            self._check_all_answered()
+
+    # Incoming messages
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = PlayerSession(self._next_player_id, writer)
+        self._next_player_id += 1
+        self.sessions[session.player_id] = session
+        self.send(session, encode({"t": "welcome", "id": session.player_id}))
+        try:
+            while session.connected:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    self.handle_message(session, message)
+                except (ValueError, TypeError, KeyError, AttributeError):
+                    self.send(session, encode({"t": "error", "message": "bad message"}))
+        except (ConnectionError, asyncio.LimitOverrunError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self.disconnect(session)
+
+    def handle_message(self, session: PlayerSession, message: dict) -> None:
+        kind = message["t"]
+        if kind == "answer":
+            self.handle_answer(session, int(message["q"]), int(message["c"]))
+        elif kind == "join":
+            session.name = str(message["name"])[:MAX_NAME_LENGTH] or session.name
+        else:
+            self.send(session, encode({"t": "error", "message": f"unknown message type: {kind}"}))
+
+    def handle_answer(self, session: PlayerSession, question_number: int, choice_id: int) -> None:
+        """Score one answer; like a button click, only the first answer to a question counts."""
+        engine = self.engine
+        if question_number != engine.current_question_index or session.answered == question_number:
+            self.send(session, encode({"t": "error", "message": "question closed"}))
+            return
+        try:
+            choice = engine.check(choice_id)
+        except ValueError as e:
+            self.send(session, encode({"t": "error", "message": str(e)}))
+            return
+        session.answered = question_number
+        if choice.correct:
+            session.score += 1
+        self.answers += 1
+        self.answered_count += 1
+        self.send(session, encode({"t": "ack", "q": question_number, "correct": choice.correct,
+                                   "score": session.score}))
+        self._check_all_answered()
+
+    def _check_all_answered(self) -> None:
+        if self.sessions and self.answered_count >= len(self.sessions):
+            self._all_answered.set()
+
+    # Round flow
+
+    async def run_rounds(self) -> None:
+        """Run rounds back to back, with a lobby pause before each one."""
+        while not self.rounds or self.round < self.rounds:
+            await asyncio.sleep(self.lobby_seconds)
+            if len(self.sessions) < self.min_players:
+                continue
+            await self.run_round()
+
+    def reload_bank(self) -> None:
+        """Swap in edits to a watched bank file; called between questions."""
+        if not self.watch_bank:
+            return
+        try:
+            edited = self.engine.reload_bank()
+        except ValueError as e:
+            print(f"Could not reload question bank: {e}")
+            return
+        if edited is not None:
+            print(f"Reloaded question bank: {len(edited)} questions of this round edited")
+
+    async def run_round(self) -> None:
+        engine = self.engine
+        self.reload_bank()
+        engine.restart()
+        self.round += 1
+        for session in self.sessions.values():
+            session.score = 0
+            session.answered = -1
+        print(f"Round {self.round}: {len(self.sessions)} players")
+
+        while not engine.is_finished():
+            question = engine.current_question
+            number = engine.current_question_index
+            self.answered_count = 0
+            self._all_answered.clear()
+            self.broadcast({"t": "question", "round": self.round, "q": number, "total": engine.total_questions,
+                            "name": question["name"], "choices": [choice.text for choice in engine.choices],
+                            "seconds": self.question_seconds})
+            try:
+                # Move on early once every player has answered
+                await asyncio.wait_for(self._all_answered.wait(), self.question_seconds)
+            except asyncio.TimeoutError:
+                pass
+            engine.reveal()
+            self.broadcast({"t": "reveal", "q": number, "correct": engine.correct_choice.id,
+                            "explanation": question.get("explanation", "")})
+            await asyncio.sleep(self.reveal_seconds)
+            self.reload_bank()
+            engine.advance()
+
+        self.send_results()
+
+    def send_results(self) -> None:
+        """Send every player their score and rank, counting players per score instead of sorting them all."""
+        total = self.engine.total_questions
+        counts = [0] * (total + 1)
+        for session in self.sessions.values():
+            counts[session.score] += 1
+        # rank_for[score] = 1 + number of players with a higher score
+        rank_for = [0] * (total + 1)
+        better = 0
+        for score in range(total, -1, -1):
+            rank_for[score] = better + 1
+            better += counts[score]
+        top = sorted(self.sessions.values(), key=lambda s: -s.score)[:TOP_PLAYERS]
+        top_list = [[session.name, session.score] for session in top]
+        players = len(self.sessions)
+        for session in self.sessions.values():
+            self.send(session, encode({"t": "results", "round": self.round, "score": session.score, "total": total,
+                                       "rank": rank_for[session.score], "players": players, "top": top_list}))
+
+
+async def serve(host: str, port: int, server: QuizServer) -> None:
+    listener = await asyncio.start_server(server.handle_connection, host, port, limit=MAX_LINE_BYTES,
+                                          backlog=4096)
+    addresses = ", ".join(str(sock.getsockname()) for sock in listener.sockets)
+    print(f"Quiz server listening on {addresses}", flush=True)
+    start = time.monotonic()
+    async with listener:
+        await server.run_rounds()
+        # Give the final results time to reach the players
+        await asyncio.sleep(server.reveal_seconds)
+    print(f"Served {server.round} rounds and {server.answers} answers in {time.monotonic() - start:.1f} s")
+
+
+def main() -> None:
+    """Run the multiplayer quiz server."""
+    parser = argparse.ArgumentParser(description="AWS Quiz Game multiplayer server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--bank", metavar="PATH", help="JSONL or SQLite question bank (default: built-in questions)")
+    parser.add_argument("--question-seconds", type=float, default=20.0, help="time to answer each question")
+    parser.add_argument("--reveal-seconds", type=float, default=3.0, help="pause after revealing each answer")
+    parser.add_argument("--lobby-seconds", type=float, default=10.0, help="pause before each round")
+    parser.add_argument("--rounds", type=int, default=0, help="stop after this many rounds (default: run forever)")
+    parser.add_argument("--min-players", type=int, default=1, help="players needed before a round starts")
+    parser.add_argument("--watch-bank", action="store_true",
+                        help="pick up edits to the --bank JSONL file between questions")
+    parser.add_argument("--choices", type=int, default=MIN_CHOICES,
+                        help=f"answer choices per question, {MIN_CHOICES}-{MAX_CHOICES} (default: %(default)s)")
+    args = parser.parse_args()
+    if not MIN_CHOICES <= args.choices <= MAX_CHOICES:
+        parser.error(f"--choices must be between {MIN_CHOICES} and {MAX_CHOICES}")
+
+    if args.watch_bank and not (args.bank and can_watch(args.bank)):
+        parser.error("--watch-bank needs a JSONL --bank")
+
+    question_bank = None
+    if args.bank:
+        try:
+            question_bank = load_question_bank(args.bank, watch=args.watch_bank)
+        except (OSError, ValueError) as e:
+            parser.error(f"could not open question bank {args.bank}: {e}")
+    try:
+        asyncio.run(serve(args.host, args.port, QuizServer(question_bank, args.question_seconds,
+                                                            args.reveal_seconds, args.lobby_seconds, args.rounds,
+                                                            args.min_players, args.choices, args.watch_bank)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo session simulator for the AWS Quiz Game.
+Plays many rounds against a player model to estimate the score distribution
+and how often each question is picked and missed. Sessions are simulated in
+vectorized NumPy batches spread over a process pool; --engine replays every
+round through QuizEngine instead, which is slower but exercises the real flow.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+from question_bank import QuestionBank, ListQuestionBank, load_question_bank
+from quiz_engine import QuizEngine, QUESTIONS_PER_GAME
+from quiz_questions import QUIZ_QUESTIONS
+
+CHUNK_SESSIONS = 250_000  # Sessions per pool task
+BATCH_SESSIONS = 50_000  # Sessions per NumPy batch inside a task
+DENSE_SAMPLE_LIMIT = 64  # Banks up to this size sample rounds with one argpartition
+RESPONSE_BIN_SECONDS = 0.5
+RESPONSE_BINS = 120  # Response times above 60 s land in the last bin
+
+
+class PlayerModel(NamedTuple):
+    """Simulated player: answer accuracy and log-normal response time in seconds."""
+    accuracy: float
+    response_mean: float
+    response_sigma: float
+
+
+PLAYER_MODELS: Dict[str, PlayerModel] = {
+    "guesser": PlayerModel(0.5, 2.0, 0.5),
+    "novice": PlayerModel(0.6, 8.0, 0.6),
+    "intermediate": PlayerModel(0.75, 5.0, 0.5),
+    "expert": PlayerModel(0.92, 3.0, 0.4),
+}
+
+
+class SimulatedClock:
+    """Clock for QuizEngine that only moves when the simulated player thinks."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SimulationResult:
+    """Histograms accumulated over simulated sessions; results merge by addition."""
+
+    def __init__(self, bank_size: int, questions_per_game: int):
+        self.sessions = 0
+        self.scores = np.zeros(questions_per_game + 1, dtype=np.int64)
+        self.picked = np.zeros(bank_size, dtype=np.int64)
+        self.missed = np.zeros(bank_size, dtype=np.int64)
+        self.response_times = np.zeros(RESPONSE_BINS, dtype=np.int64)
+
+    def merge(self, other: "SimulationResult") -> None:
+        self.sessions += other.sessions
+        self.scores += other.scores
+        self.picked += other.picked
+        self.missed += other.missed
+        self.response_times += other.response_times
+
+
+def question_accuracies(bank: QuestionBank, model: PlayerModel,
+                        overrides: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """Return the model's probability of answering each bank question correctly."""
+    accuracies = np.full(len(bank), model.accuracy, dtype=np.float64)
+    if overrides:
+        # Only a per-question override needs the questions themselves
+        for index in range(len(bank)):
+            question = bank.get(index)
+            for key in (str(question.get("id", index)), question["name"], question["correct"]):
+                if key in overrides:
+                    accuracies[index] = overrides[key]
+                    break
+    return accuracies
+
+
+def chunk_rng(seed: int, chunk: int) -> np.random.Generator:
+    """Return the generator for one chunk; results do not depend on the worker count."""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk,)))
+
+
+def sample_rounds(rng: np.random.Generator, sessions: int, bank_size: int, count: int) -> np.ndarray:
+    """Return a (sessions, count) array of distinct question indices per round."""
+    if bank_size <= DENSE_SAMPLE_LIMIT:
+        # The first count entries of a random permutation, without sorting each row
+        keys = rng.random((sessions, bank_size))
+        return np.argpartition(keys, count - 1, axis=1)[:, :count]
+    rounds = rng.integers(0, bank_size, size=(sessions, count))
+    ordered = np.sort(rounds, axis=1)
+    # Rounds that picked a question twice are redrawn without replacement. That is rare for short rounds
+    # from big banks; retrying whole rows instead would never finish when a round takes most of the bank.
+    for row in np.flatnonzero((ordered[:, 1:] == ordered[:, :-1]).any(axis=1)):
+        rounds[row] = rng.choice(bank_size, count, replace=False)
+    return rounds
+
+
+def response_times(rng: np.random.Generator, model: PlayerModel, shape) -> np.ndarray:
+    """Draw log-normal response times whose mean is the model's response_mean."""
+    mu = math.log(model.response_mean) - model.response_sigma ** 2 / 2
+    return rng.lognormal(mu, model.response_sigma, size=shape)
+
+
+def simulate_vectorized(accuracies: np.ndarray, model: PlayerModel, questions_per_game: int,
+                        sessions: int, rng: np.random.Generator) -> SimulationResult:
+    """Simulate sessions in NumPy batches."""
+    bank_size = len(accuracies)
+    count = min(questions_per_game, bank_size)
+    result = SimulationResult(bank_size, questions_per_game)
+    remaining = sessions
+    while remaining > 0:
+        batch = min(BATCH_SESSIONS, remaining)
+        remaining -= batch
+        rounds = sample_rounds(rng, batch, bank_size, count)
+        correct = rng.random(rounds.shape) < accuracies[rounds]
+        times = response_times(rng, model, rounds.shape)
+        result.sessions += batch
+        result.scores += np.bincount(correct.sum(axis=1), minlength=questions_per_game + 1)
+        result.picked += np.bincount(rounds.ravel(), minlength=bank_size)
+        result.missed += np.bincount(rounds[~correct], minlength=bank_size)
+        bins = np.minimum((times / RESPONSE_BIN_SECONDS).astype(np.int64), RESPONSE_BINS - 1)
+        result.response_times += np.bincount(bins.ravel(), minlength=RESPONSE_BINS)
+    return result
+
+
+def simulate_engine(bank: QuestionBank, accuracies: np.ndarray, model: PlayerModel,
+                    questions_per_game: int, sessions: int, seed: int) -> SimulationResult:
+    """Simulate sessions by playing every round through QuizEngine."""
+    rng = random.Random(seed)
+    clock = SimulatedClock()
+    engine = QuizEngine(bank, questions_per_game=questions_per_game, rng=rng, clock=clock)
+    result = SimulationResult(len(bank), questions_per_game)
+    mu = math.log(model.response_mean) - model.response_sigma ** 2 / 2
+    for _ in range(sessions):
+        engine.restart()
+        while not engine.is_finished():
+            # Histograms are indexed by bank position; the question's own "id" may be anything
+            index = engine.current_question["_position"]
+            # Pick the right answer with the question's accuracy, otherwise a wrong one
+            if rng.random() < accuracies[index]:
+                choice = engine.correct_choice
+            else:
+                choice = rng.choice([choice for choice in engine.choices if not choice.correct])
+            clock.now += rng.lognormvariate(mu, model.response_sigma)
+            result.picked[index] += 1
+            if not engine.answer(choice.id):
+                result.missed[index] += 1
+            result.response_times[min(int(engine.response_time / RESPONSE_BIN_SECONDS), RESPONSE_BINS - 1)] += 1
+            engine.advance()
+        result.scores[engine.score] += 1
+        result.sessions += 1
+    return result
+
+
+# Per-worker state set up once by the pool initializer
+_worker: Dict[str, object] = {}
+
+
+def _init_worker(bank_path: Optional[str], accuracies: np.ndarray, model: PlayerModel,
+                 questions_per_game: int, use_engine: bool, seed: int) -> None:
+    _worker.update(bank=open_bank(bank_path) if use_engine else None, accuracies=accuracies, model=model,
+                   questions_per_game=questions_per_game, use_engine=use_engine, seed=seed)
+
+
+def _run_chunk(task) -> SimulationResult:
+    chunk, sessions = task
+    if _worker["use_engine"]:
+        return simulate_engine(_worker["bank"], _worker["accuracies"], _worker["model"],
+                               _worker["questions_per_game"], sessions, _worker["seed"] * 1_000_003 + chunk)
+    return simulate_vectorized(_worker["accuracies"], _worker["model"], _worker["questions_per_game"],
+                               sessions, chunk_rng(_worker["seed"], chunk))
+
+
+def open_bank(path: Optional[str]) -> QuestionBank:
+    return load_question_bank(path) if path else ListQuestionBank(QUIZ_QUESTIONS)
+
+
+def run_simulation(sessions: int, accuracies: np.ndarray, model: PlayerModel,
+                   questions_per_game: int = QUESTIONS_PER_GAME, bank_path: Optional[str] = None,
+                   workers: Optional[int] = None, seed: int = 0, use_engine: bool = False) -> SimulationResult:
+    """Simulate sessions over a process pool, merging chunk results as they arrive."""
+    chunk_size = CHUNK_SESSIONS // 50 if use_engine else CHUNK_SESSIONS
+    tasks = [(chunk, min(chunk_size, sessions - start))
+             for chunk, start in enumerate(range(0, sessions, chunk_size))]
+    initargs = (bank_path, accuracies, model, questions_per_game, use_engine, seed)
+    result = SimulationResult(len(accuracies), questions_per_game)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        _init_worker(*initargs)
+        for task in tasks:
+            result.merge(_run_chunk(task))
+        return result
+    with multiprocessing.Pool(min(workers, len(tasks)), initializer=_init_worker, initargs=initargs) as pool:
+        # Histograms add up, so merging in completion order gives the same totals
+        for chunk_result in pool.imap_unordered(_run_chunk, tasks):
+            result.merge(chunk_result)
+    return result
+
+
+def percentile_from_histogram(histogram: np.ndarray, fraction: float) -> int:
+    """Return the bin index at a fraction of a histogram's total count."""
+    cumulative = np.cumsum(histogram)
+    return int(np.searchsorted(cumulative, fraction * cumulative[-1]))
+
+
+def build_report(result: SimulationResult, bank: QuestionBank, elapsed: float, top: int) -> Dict:
+    """Summarize a simulation as a JSON-serializable report."""
+    sessions = max(result.sessions, 1)
+    mean_score = float(np.dot(np.arange(len(result.scores)), result.scores)) / sessions
+    miss_rates = np.divide(result.missed, result.picked, out=np.zeros(len(result.picked)), where=result.picked > 0)
+    hardest = np.argsort(-miss_rates, kind="stable")[:top]
+    questions = []
+    for index in hardest:
+        question = bank.get(int(index))
+        questions.append({
+            "id": question["id"],
+            "name": question["name"],
+            "correct": question["correct"],
+            "picked": int(result.picked[index]),
+            "pick_rate": round(float(result.picked[index]) / sessions, 6),
+            "missed": int(result.missed[index]),
+            "miss_rate": round(float(miss_rates[index]), 6),
+        })
+    return {
+        "sessions": result.sessions,
+        "elapsed_s": round(elapsed, 3),
+        "sessions_per_minute": round(result.sessions / elapsed * 60) if elapsed else None,
+        "mean_score": round(mean_score, 4),
+        "score_distribution": {str(score): int(n) for score, n in enumerate(result.scores)},
+        "response_time_s": {
+            "p50": percentile_from_histogram(result.response_times, 0.5) * RESPONSE_BIN_SECONDS,
+            "p95": percentile_from_histogram(result.response_times, 0.95) * RESPONSE_BIN_SECONDS,
+        },
+        "questions": questions,
+    }
+
+
+def print_report(report: Dict) -> None:
+    """Print a report as a human-readable summary."""
+    print(f"{report['sessions']:,} sessions in {report['elapsed_s']:.2f} s "
+          f"({report['sessions_per_minute'] or 0:,} sessions/min), mean score {report['mean_score']:.2f}")
+    print("Score distribution:")
+    sessions = max(report["sessions"], 1)
+    for score, count in report["score_distribution"].items():
+        share = count / sessions
+        print(f"  {score:>2}: {share:7.2%} {'#' * int(round(share * 50))}")
+    times = report["response_time_s"]
+    print(f"Response time: p50 {times['p50']:.1f} s, p95 {times['p95']:.1f} s")
+    print("Most missed questions:")
+    for question in report["questions"]:
+        print(f"  [{question['id']:>4}] {question['name']} ({question['correct']}): "
+              f"picked {question['pick_rate']:.2%} of sessions, missed {question['miss_rate']:.1%}")
+
+
+def main() -> None:
+    """Simulate quiz sessions and report score and per-question statistics."""
+    parser = argparse.ArgumentParser(description="Monte Carlo simulator for AWS Quiz Game question banks")
+    parser.add_argument("-n", "--sessions", type=int, default=1_000_000, help="number of sessions to simulate")
+    parser.add_argument("--bank", metavar="PATH", help="JSONL or SQLite question bank (default: built-in questions)")
+    parser.add_argument("--model", choices=PLAYER_MODELS, default="intermediate", help="player model preset")
+    parser.add_argument("--accuracy", type=float, help="override the model's probability of a correct answer")
+    parser.add_argument("--response-mean", type=float, help="override the model's mean response time in seconds")
+    parser.add_argument("--question-accuracy", metavar="JSON",
+                        help="JSON object mapping question ids, names or correct answers to accuracies")
+    parser.add_argument("--questions-per-game", type=int, default=QUESTIONS_PER_GAME)
+    parser.add_argument("-j", "--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--engine", action="store_true", help="play every round through QuizEngine (slow)")
+    parser.add_argument("--top", type=int, default=10, help="number of most missed questions to report")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    model = PLAYER_MODELS[args.model]
+    if args.accuracy is not None:
+        model = model._replace(accuracy=args.accuracy)
+    if args.response_mean is not None:
+        model = model._replace(response_mean=args.response_mean)
+    if not 0.0 <= model.accuracy <= 1.0:
+        parser.error("--accuracy must be between 0 and 1")
+    if args.questions_per_game < 1:
+        parser.error("--questions-per-game must be at least 1")
+    overrides = None
+    if args.question_accuracy:
+        with open(args.question_accuracy, encoding="utf-8") as f:
+            overrides = {str(key): float(value) for key, value in json.load(f).items()}
+
+    try:
+        bank = open_bank(args.bank)
+    except (OSError, ValueError) as e:
+        parser.error(f"could not open question bank {args.bank}: {e}")
+    if not len(bank):
+        parser.error("question bank is empty")
+    accuracies = question_accuracies(bank, model, overrides)
+
+    start = time.perf_counter()
+    result = run_simulation(args.sessions, accuracies, model, args.questions_per_game, args.bank,
+                            args.workers, args.seed, args.engine)
+    report = build_report(result, bank, time.perf_counter() - start, args.top)
+    bank.close()
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+SDL2 renderer display backend for the AWS Quiz Game.
+Composites the game from GPU textures with pygame._sdl2.video instead of
+blitting into the display surface. The game keeps drawing in one logical
+800x600 space and the renderer scales it to any window or screen size. Cached
+surfaces (text, particle and star sprites) are uploaded as textures once.
+"""
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import pygame
+from pygame._sdl2 import video
+
+TEXTURE_CACHE_SIZE = 256  # Textures kept for cached surfaces
+BLENDMODE_BLEND = 1  # SDL_BLENDMODE_BLEND
+
+
+class RendererBackend:
+    """Window + Renderer pair with textures for the game's layers and cached sprites."""
+
+    def __init__(self, title: str, logical_size: Tuple[int, int], window_size: Optional[Tuple[int, int]] = None,
+                 fullscreen: bool = False, software: bool = False, vsync: bool = True):
+        self.logical_size = logical_size
+        if fullscreen:
+            self.window = video.Window(title, fullscreen_desktop=True)
+        else:
+            self.window = video.Window(title, size=window_size or logical_size, resizable=True)
+        # The software renderer needs no GPU, which makes the backend testable headless
+        self.renderer = video.Renderer(self.window, accelerated=0 if software else 1, vsync=vsync and not software)
+        self.renderer.logical_size = logical_size
+        self._layers: Dict[str, video.Texture] = {}
+        self._textures: "OrderedDict[int, Tuple[pygame.Surface, video.Texture]]" = OrderedDict()
+        self._scratch: Optional[pygame.Surface] = None
+
+    def set_layer(self, name: str, surface: pygame.Surface, area: Optional[pygame.Rect] = None) -> None:
+        """Upload a full-screen layer, or only area of it when the layer already exists."""
+        texture = self._layers.get(name)
+        if texture is None or area is None:
+            texture = video.Texture.from_surface(self.renderer, surface)
+            if surface.get_flags() & pygame.SRCALPHA:
+                texture.blend_mode = BLENDMODE_BLEND
+            self._layers[name] = texture
+            return
+        area = area.clip(surface.get_rect())
+        if area.width and area.height:
+            texture.update(surface.subsurface(area), area)
+
+    def clear(self, color: Sequence[int] = (0, 0, 0)) -> None:
+        self.renderer.draw_color = (*color[:3], 255)
+        self.renderer.clear()
+
+    def draw_layer(self, name: str) -> None:
+        self._layers[name].draw()
+
+    def texture_for(self, surface: pygame.Surface) -> video.Texture:
+        """Return the texture of a cached surface, uploading it the first time it is drawn."""
+        key = id(surface)
+        entry = self._textures.get(key)
+        if entry is not None and entry[0] is surface:
+            self._textures.move_to_end(key)
+            return entry[1]
+        texture = video.Texture.from_surface(self.renderer, surface)
+        alpha = surface.get_alpha()
+        if alpha is not None and alpha < 255:
+            # Surface-wide alpha (twinkling stars) becomes the texture's alpha modulation
+            texture.alpha = alpha
+            texture.blend_mode = BLENDMODE_BLEND
+        # Keep the surface alive so its id cannot be reused while the texture is cached
+        self._textures[key] = (surface, texture)
+        if len(self._textures) > TEXTURE_CACHE_SIZE:
+            self._textures.popitem(last=False)
+        return texture
+
+    def blit(self, surface: pygame.Surface, position: Tuple[int, int]) -> None:
+        """Draw a cached surface at a logical position."""
+        texture = self.texture_for(surface)
+        texture.draw(dstrect=(position[0], position[1], texture.width, texture.height))
+
+    def blits(self, sprites: Iterable[Tuple[pygame.Surface, Tuple[int, int]]]) -> None:
+        for surface, position in sprites:
+            self.blit(surface, position)
+
+    def composite(self, sprites: Iterable[Tuple[pygame.Surface, Tuple[int, int]]]) -> None:
+        """Blit many sprites on the CPU into one transparent layer and draw it with a single upload.
+
+        Cheaper than one texture draw call per sprite once there are thousands of them.
+        """
+        if self._scratch is None:
+            self._scratch = pygame.Surface(self.logical_size, pygame.SRCALPHA)
+        self._scratch.fill((0, 0, 0, 0))
+        self._scratch.blits(sprites, doreturn=False)
+        self.set_layer("composite", self._scratch)
+        self.draw_layer("composite")
+
+    def blit_region(self, surface: pygame.Surface, rect: pygame.Rect) -> None:
+        """Draw a region of a frequently changing surface, uploading it every call."""
+        region = surface.subsurface(rect.clip(surface.get_rect()))
+        texture = video.Texture.from_surface(self.renderer, region)
+        texture.draw(dstrect=region.get_abs_offset() + region.get_size())
+
+    def present(self) -> None:
+        self.renderer.present()
+
+    def window_to_logical(self, pos: Tuple[int, int]) -> Tuple[int, int]:
+        """Convert window pixel coordinates (e.g. pygame.mouse.get_pos()) to logical coordinates."""
+        window_width, window_height = self.window.size
+        logical_width, logical_height = self.logical_size
+        # The renderer letterboxes the logical space at the largest scale that fits
+        scale = min(window_width / logical_width, window_height / logical_height)
+        left = (window_width - logical_width * scale) / 2
+        top = (window_height - logical_height * scale) / 2
+        return int((pos[0] - left) / scale), int((pos[1] - top) / scale)
+
+    def read_pixels(self) -> pygame.Surface:
+        """Return the current frame at window resolution, for tests and screenshots."""
+        surface = pygame.Surface(self.window.size, 0, 32)
+        return self.renderer.to_surface(surface)
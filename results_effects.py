@@ -0,0 +1,86 @@
+"""
+Pre-baked results-screen celebration for the AWS Quiz Game.
+Star geometry comes from a precomputed vertex table and the whole layout is
+generated from a seed. Gold dots are rendered once into the background, and
+star sprites are rendered once per size and twinkle level, so each frame only
+blits a few small sprites.
+"""
+import math
+import random
+from typing import Dict, List, Tuple
+
+import pygame
+
+# Unit star: 10 vertices alternating between the outer and the inner radius
+STAR_VERTICES: Tuple[Tuple[float, float], ...] = tuple(
+    (math.sin(math.pi * 2 * i / 10) * (1.0 if i % 2 == 0 else 0.5),
+     math.cos(math.pi * 2 * i / 10) * (1.0 if i % 2 == 0 else 0.5))
+    for i in range(10)
+)
+
+DOT_COUNT = 50
+STAR_COUNT = 20
+DOT_SIZES = (3, 8)
+STAR_SIZES = (10, 20)
+STAR_MARGIN = 50
+TWINKLE_LEVELS = 8  # Pre-rendered alpha levels per star sprite
+MIN_TWINKLE_ALPHA = 90
+DRIFT_PIXELS = 4.0
+
+
+class ResultsCelebration:
+    """Seeded layout of gold dots and twinkling, drifting stars for the results screen."""
+
+    def __init__(self, width: int, height: int, color: Tuple[int, int, int], seed: int = 0):
+        self.width = width
+        self.height = height
+        self.color = color
+        self.seed = seed
+        rng = random.Random(seed)
+
+        self.dots = [(rng.randint(0, width), rng.randint(0, height), rng.randint(*DOT_SIZES))
+                     for _ in range(DOT_COUNT)]
+        # Each star: center, size, twinkle speed and phase, drift speed and phase
+        self.stars = [(rng.randint(STAR_MARGIN, width - STAR_MARGIN),
+                       rng.randint(STAR_MARGIN, height - STAR_MARGIN),
+                       rng.randint(*STAR_SIZES),
+                       rng.uniform(0.002, 0.006), rng.uniform(0, math.tau),
+                       rng.uniform(0.0005, 0.0015), rng.uniform(0, math.tau))
+                      for _ in range(STAR_COUNT)]
+        self._sprites: Dict[int, List[pygame.Surface]] = {}
+
+    def draw_base(self, surface: pygame.Surface) -> None:
+        """Draw the static gold dots; called once when the results layer is composed."""
+        for x, y, size in self.dots:
+            pygame.draw.circle(surface, self.color, (x, y), size)
+
+    def draw_stars(self, surface: pygame.Surface, elapsed_ms: float) -> List[pygame.Rect]:
+        """Blit every star at its twinkle level and drift offset and return the touched rects."""
+        return surface.blits(self.star_sprites(elapsed_ms))
+
+    def star_sprites(self, elapsed_ms: float) -> List[Tuple[pygame.Surface, Tuple[int, int]]]:
+        """Return (sprite, top-left corner) pairs for every star at elapsed_ms."""
+        blits = []
+        for x, y, size, twinkle_speed, twinkle_phase, drift_speed, drift_phase in self.stars:
+            brightness = 0.5 + 0.5 * math.sin(elapsed_ms * twinkle_speed + twinkle_phase)
+            level = min(TWINKLE_LEVELS - 1, int(brightness * TWINKLE_LEVELS))
+            angle = elapsed_ms * drift_speed + drift_phase
+            left = int(x + DRIFT_PIXELS * math.sin(angle)) - size
+            top = int(y + DRIFT_PIXELS * math.cos(angle)) - size
+            blits.append((self._star_sprites(size)[level], (left, top)))
+        return blits
+
+    def _star_sprites(self, size: int) -> List[pygame.Surface]:
+        """Return the star sprite of a size at every twinkle level, rendering it once."""
+        sprites = self._sprites.get(size)
+        if sprites is None:
+            star = pygame.Surface((size * 2 + 1, size * 2 + 1), pygame.SRCALPHA)
+            points = [(size + vx * size, size + vy * size) for vx, vy in STAR_VERTICES]
+            pygame.draw.polygon(star, self.color, points)
+            sprites = []
+            for level in range(TWINKLE_LEVELS):
+                sprite = star.copy()
+                sprite.set_alpha(MIN_TWINKLE_ALPHA + (255 - MIN_TWINKLE_ALPHA) * level // (TWINKLE_LEVELS - 1))
+                sprites.append(sprite)
+            self._sprites[size] = sprites
+        return sprites
@@ -0,0 +1,80 @@
+"""
+In-memory sound effect synthesizer for the AWS Quiz Game.
+Tones are generated straight into the mixer's native sample format and handed
+to pygame.mixer.Sound as a buffer, so no WAV files or SciPy are needed.
+"""
+import functools
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+import pygame
+
+# A note is (frequency in Hz, start time in seconds, duration in seconds)
+Note = Tuple[float, float, float]
+
+CORRECT_CHIME: Tuple[Note, ...] = ((880.0, 0.0, 0.4), (1318.5, 0.08, 0.42))  # A5 then E6
+INCORRECT_TONE: Tuple[Note, ...] = ((220.0, 0.0, 0.5),)  # Low A3
+
+ATTACK_SECONDS = 0.005  # Short fade-in to avoid clicks
+DECAY_RATE = 6.0  # Exponential decay per second
+
+# Mixer sample size (as reported by pygame.mixer.get_init) to NumPy dtype.
+# pygame only opens 32-bit audio as float, which get_init reports as -32.
+SAMPLE_DTYPES = {
+    8: np.uint8,
+    -8: np.int8,
+    16: np.dtype("<u2"),
+    -16: np.dtype("<i2"),
+    32: np.dtype("<f4"),
+    -32: np.dtype("<f4"),
+}
+
+
+@functools.lru_cache(maxsize=32)
+def synthesize(notes: Tuple[Note, ...], volume: float, frequency: int, size: int,
+               channels: int) -> np.ndarray:
+    """Return read-only interleaved samples for notes in the given mixer format."""
+    length = int(round(max(start + duration for _, start, duration in notes) * frequency))
+    wave = np.zeros(length, dtype=np.float32)
+    for pitch, start, duration in notes:
+        first = int(round(start * frequency))
+        count = min(int(round(duration * frequency)), length - first)
+        t = np.arange(count, dtype=np.float32) / frequency
+        envelope = np.minimum(t / ATTACK_SECONDS, 1.0) * np.exp(-DECAY_RATE * t)
+        wave[first:first + count] += np.sin(2 * np.pi * pitch * t) * envelope
+
+    peak = float(np.abs(wave).max()) or 1.0
+    wave *= volume / peak
+
+    dtype = np.dtype(SAMPLE_DTYPES[size])
+    if dtype.kind == "f":
+        samples = wave.astype(dtype)
+    else:
+        info = np.iinfo(dtype)
+        amplitude = (int(info.max) - int(info.min)) / 2
+        midpoint = (int(info.max) + int(info.min) + 1) / 2
+        samples = (wave * amplitude + midpoint).clip(info.min, info.max).astype(dtype)
+
+    if channels > 1:
+        samples = np.repeat(samples[:, np.newaxis], channels, axis=1)
+    samples = np.ascontiguousarray(samples)
+    samples.setflags(write=False)
+    return samples
+
+
+# Sounds already created for the current mixer settings
+_sounds: Dict[Tuple, pygame.mixer.Sound] = {}
+
+
+def make_sound(notes: Sequence[Note], volume: float = 0.5) -> pygame.mixer.Sound:
+    """Return a Sound for notes, synthesizing the samples only the first time."""
+    mixer_format = pygame.mixer.get_init()
+    if not mixer_format:
+        raise pygame.error("mixer not initialized")
+    key = (tuple(notes), volume, mixer_format)
+    sound = _sounds.get(key)
+    if sound is None:
+        samples = synthesize(tuple(notes), volume, *mixer_format)
+        sound = pygame.mixer.Sound(buffer=samples)
+        _sounds[key] = sound
+    return sound
@@ -0,0 +1,215 @@
+"""
+Spaced-repetition question scheduler for the AWS Quiz Game.
+Keeps SM-2 style mastery state per question, picks due questions from a heap in
+O(log n) each and appends every answer to a compact binary log on disk.
+"""
+import hashlib
+import heapq
+import os
+import random
+import struct
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app_cache import cache_path
+from question_bank import Question, QuestionBank
+
+REVIEW_STATE_FILE = "review_state.log"
+
+# Log record: question key, bank index hint, due time, interval, ease, repetitions, lapses
+RECORD = struct.Struct("<QIdffHH")
+
+DAY_SECONDS = 86400.0
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+RELEARN_SECONDS = 60.0  # Missed questions come back in the next session
+COMPACT_RATIO = 4  # Rewrite the log once it holds this many records per question
+NEW_QUESTION_ATTEMPTS = 8  # Random draws per slot when looking for an unseen question
+
+
+def question_key(question: Question) -> int:
+    """Return a stable 64-bit key for a question based on its name and answer."""
+    text = f"{question['name']}\0{question['correct']}".encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(text, digest_size=8).digest(), "little")
+
+
+class ReviewState:
+    """SM-2 mastery state of one question."""
+
+    __slots__ = ("index", "due", "interval", "ease", "repetitions", "lapses", "version")
+
+    def __init__(self, index: int, due: float = 0.0, interval: float = 0.0,
+                 ease: float = INITIAL_EASE, repetitions: int = 0, lapses: int = 0):
+        self.index = index
+        self.due = due
+        self.interval = interval
+        self.ease = ease
+        self.repetitions = repetitions
+        self.lapses = lapses
+        self.version = 0
+
+    def review(self, quality: int, now: float, interval_unit: float) -> None:
+        """Apply an SM-2 review with quality 0-5."""
+        if quality >= 3:
+            if self.repetitions == 0:
+                self.interval = 1.0
+            elif self.repetitions == 1:
+                self.interval = 6.0
+            else:
+                self.interval *= self.ease
+            self.repetitions += 1
+            self.due = now + self.interval * interval_unit
+        else:
+            self.repetitions = 0
+            self.lapses += 1
+            self.interval = 0.0
+            self.due = now + RELEARN_SECONDS
+        self.ease = max(MIN_EASE, self.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+
+class SpacedRepetitionScheduler:
+    """Chooses due questions first, then unseen ones, and persists answers incrementally."""
+
+    def __init__(self, path: Optional[str] = None, interval_unit: float = DAY_SECONDS,
+                 clock=time.time, rng: Optional[random.Random] = None):
+        self.path = path or cache_path(REVIEW_STATE_FILE)
+        self.interval_unit = interval_unit
+        self.clock = clock
+        self.rng = rng or random
+        self.states: Dict[int, ReviewState] = {}
+        self._heap: List[Tuple[float, int, int]] = []  # (due, version, key) with lazy deletion
+        self._records = 0
+        self._log = None
+        self._load()
+
+    def _load(self) -> None:
+        """Replay the answer log; the last record for each question wins."""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError:
+            data = b""
+        # A torn trailing record from a crash is ignored
+        usable = len(data) - len(data) % RECORD.size
+        for key, index, due, interval, ease, repetitions, lapses in RECORD.iter_unpack(data[:usable]):
+            self.states[key] = ReviewState(index, due, interval, ease, repetitions, lapses)
+        self._records = usable // RECORD.size
+        self._heap = [(state.due, 0, key) for key, state in self.states.items()]
+        heapq.heapify(self._heap)
+        if usable != len(data) or self._records > COMPACT_RATIO * max(1, len(self.states)):
+            self._compact()
+
+    def select(self, bank: QuestionBank, count: int) -> List[Question]:
+        """Return count questions: due reviews first, then unseen questions, then the soonest due."""
+        now = self.clock()
+        chosen: List[Question] = []
+        chosen_keys = set()
+        deferred = []
+
+        # Due reviews, earliest first
+        while self._heap and len(chosen) < count and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            question = self._take(bank, entry, chosen_keys)
+            if question is not None:
+                chosen.append(question)
+                deferred.append(entry)
+
+        # Unseen questions, drawn at random from the bank index
+        attempts = (count - len(chosen)) * NEW_QUESTION_ATTEMPTS
+        while len(chosen) < count and attempts > 0:
+            attempts -= 1
+            question = bank.get(self.rng.randrange(len(bank)))
+            key = question_key(question)
+            if key not in self.states and key not in chosen_keys:
+                chosen.append(question)
+                chosen_keys.add(key)
+
+        # Everything has been seen and nothing is due: review the soonest questions early
+        while self._heap and len(chosen) < count:
+            entry = heapq.heappop(self._heap)
+            question = self._take(bank, entry, chosen_keys)
+            if question is not None:
+                chosen.append(question)
+                deferred.append(entry)
+
+        # Chosen reviews stay scheduled until they are actually answered
+        for entry in deferred:
+            heapq.heappush(self._heap, entry)
+        self.rng.shuffle(chosen)
+        return chosen
+
+    def _take(self, bank: QuestionBank, entry: Tuple[float, int, int], chosen_keys: set) -> Optional[Question]:
+        """Load the question for a heap entry, or None if the entry is stale or already chosen."""
+        due, version, key = entry
+        state = self.states.get(key)
+        if state is None or state.version != version or key in chosen_keys:
+            return None
+        if state.index >= len(bank):
+            return None
+        question = bank.get(state.index)
+        if question_key(question) != key:
+            # The bank changed under this entry; forget it rather than showing the wrong question
+            return None
+        chosen_keys.add(key)
+        return question
+
+    def record(self, question: Question, correct: bool, quality: Optional[int] = None) -> None:
+        """Update the question's mastery after an answer and append it to the log."""
+        key = question_key(question)
+        # The bank position, not the question's "id", is what _take() can pass back to bank.get()
+        position = question.get("_position", 0)
+        state = self.states.get(key)
+        if state is None:
+            state = self.states[key] = ReviewState(position)
+        state.index = position
+        state.review(quality if quality is not None else (4 if correct else 1), self.clock(), self.interval_unit)
+        state.version += 1
+        heapq.heappush(self._heap, (state.due, state.version, key))
+        if len(self._heap) > 2 * len(self.states) + 64:
+            # Drop superseded entries so the heap stays proportional to the number of questions
+            self._heap = [(s.due, s.version, k) for k, s in self.states.items()]
+            heapq.heapify(self._heap)
+        self._append(key, state)
+
+    def due_count(self) -> int:
+        """Return the number of questions whose review is due now."""
+        now = self.clock()
+        return sum(1 for state in self.states.values() if state.due <= now)
+
+    def _append(self, key: int, state: ReviewState) -> None:
+        """Append one state record to the log, compacting it when it grows too large."""
+        try:
+            if self._log is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._log = open(self.path, "ab", buffering=0)
+            self._log.write(self._pack(key, state))
+            self._records += 1
+        except OSError:
+            return
+        if self._records > COMPACT_RATIO * len(self.states) + 64:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the log with one record per question."""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(b"".join(self._pack(key, state) for key, state in self.states.items()))
+            os.replace(tmp_path, self.path)
+            self._records = len(self.states)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _pack(key: int, state: ReviewState) -> bytes:
+        return RECORD.pack(key, state.index, state.due, state.interval, state.ease,
+                           min(state.repetitions, 0xFFFF), min(state.lapses, 0xFFFF))
+
+    def close(self) -> None:
+        """Close the answer log."""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
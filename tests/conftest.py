@@ -0,0 +1,54 @@
+"""Shared fixtures: banks whose question ids deliberately differ from their positions."""
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_cache import CACHE_DIR_ENV  # noqa: E402
+from question_bank import SqliteQuestionBank  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep indexes, logs and review state written by the code under test out of the user cache."""
+    path = tmp_path / "cache"
+    monkeypatch.setenv(CACHE_DIR_ENV, str(path))
+    return path
+
+
+def make_question(number: int, question_id=None) -> dict:
+    question = {
+        "name": f"Person {number}",
+        "correct": f"Amazon Service {number}",
+        "incorrect": f"AWS Service {number + 1000}",
+        "explanation": f"Explanation {number}",
+    }
+    if question_id is not None:
+        question["id"] = question_id
+    return question
+
+
+@pytest.fixture
+def questions():
+    """Twenty questions with string ids that are not their positions."""
+    return [make_question(i, f"svc-{100 + i}") for i in range(20)]
+
+
+@pytest.fixture
+def sqlite_bank(tmp_path):
+    """A SQLite bank with a 1-based id INTEGER PRIMARY KEY column, so every id is its position + 1."""
+    path = tmp_path / "bank.sqlite"
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE questions (id INTEGER PRIMARY KEY, name TEXT, correct TEXT, "
+                       "incorrect TEXT, explanation TEXT)")
+    connection.executemany("INSERT INTO questions (name, correct, incorrect, explanation) VALUES (?, ?, ?, ?)",
+                           [(q["name"], q["correct"], q["incorrect"], q["explanation"])
+                            for q in (make_question(i) for i in range(18))])
+    connection.commit()
+    connection.close()
+    bank = SqliteQuestionBank(str(path))
+    yield bank
+    bank.close()
@@ -0,0 +1,37 @@
+from question_bank import ListQuestionBank
+from answer_telemetry import AnswerTelemetry, load_telemetry, summarize
+
+
+def test_round_trip_by_bank_position(tmp_path, questions):
+    bank = ListQuestionBank(questions)
+    now = [0]
+    telemetry = AnswerTelemetry(str(tmp_path / "answers.log"), batch_size=4, clock=lambda: now[0])
+    answers = [(17, True, 800), (3, False, 2500), (17, False, 1200), (3, True, 500), (9, True, 100)]
+    for position, correct, latency_ms in answers:
+        question = bank.get(position)
+        telemetry.question_shown()
+        now[0] += latency_ms * 1_000_000
+        telemetry.record(question["_position"], correct, 1, (400, 300))
+    telemetry.close()
+
+    columns = load_telemetry(telemetry.path)
+    assert columns["question"].tolist() == [17, 3, 17, 3, 9]
+    assert columns["latency_ms"].tolist() == [800, 2500, 1200, 500, 100]
+
+    report = summarize(columns)
+    assert report["answers"] == 5
+    rows = {row["position"]: row for row in report["questions"]}
+    assert rows[3]["accuracy"] == 0.5 and rows[17]["answers"] == 2
+    # The slowest question by median comes first and its position leads back to it in the bank
+    slowest = report["questions"][0]
+    assert bank.get(slowest["position"])["id"] == "svc-117"
+
+
+def test_torn_last_block_is_ignored(tmp_path):
+    telemetry = AnswerTelemetry(str(tmp_path / "answers.log"), batch_size=2, clock=lambda: 0)
+    for position in range(4):
+        telemetry.record(position, True, 0, (0, 0))
+    telemetry.close()
+    with open(telemetry.path, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 3)
+    assert load_telemetry(telemetry.path)["question"].tolist() == [0, 1]
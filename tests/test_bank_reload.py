@@ -0,0 +1,165 @@
+import json
+import os
+import random
+
+import pytest
+
+from conftest import make_question
+from question_bank import JsonlQuestionBank
+from quiz_engine import QuizEngine
+from spaced_repetition import SpacedRepetitionScheduler
+
+
+class BankFile:
+    """A JSONL bank on disk whose lines can be edited between reloads."""
+
+    def __init__(self, path, questions):
+        self.path = path
+        self.questions = list(questions)
+        self.version = 0
+        self.save()
+
+    def save(self):
+        self.path.write_text("".join(json.dumps(question) + "\n" for question in self.questions))
+        # Make every save visible to reload() even within one mtime tick
+        self.version += 1
+        os.utime(self.path, ns=(self.version * 1_000_000_000, self.version * 1_000_000_000))
+
+
+def big_bank(tmp_path, count=2000):
+    # About 230 KB, so an edit only touches a few of the 16 KB checksum chunks
+    return BankFile(tmp_path / "bank.jsonl", [make_question(i, f"svc-{i}") for i in range(count)])
+
+
+def assert_matches_file(bank, bank_file):
+    assert len(bank) == len(bank_file.questions)
+    for position, expected in enumerate(bank_file.questions):
+        question = bank.get(position)
+        assert question["_position"] == position
+        assert question == dict(expected, _position=position)
+
+
+@pytest.mark.parametrize("count", [30, 2000])
+@pytest.mark.parametrize("edit", ["insert", "delete", "replace", "append", "truncate"])
+def test_reload_matches_the_file(tmp_path, count, edit):
+    bank_file = BankFile(tmp_path / "bank.jsonl", [make_question(i, f"svc-{i}") for i in range(count)])
+    bank = JsonlQuestionBank(str(bank_file.path), watch=True)
+    target = count // 2
+    if edit == "insert":
+        bank_file.questions.insert(target, make_question(9000, "new"))
+    elif edit == "delete":
+        del bank_file.questions[target]
+    elif edit == "replace":
+        bank_file.questions[target] = dict(bank_file.questions[target], explanation="Edited")
+    elif edit == "append":
+        bank_file.questions.append(make_question(9000, "new"))
+    else:
+        del bank_file.questions[target:]
+    bank_file.save()
+
+    change = bank.reload()
+    assert change.count == len(bank_file.questions)
+    assert len(change.added) - change.removed == len(bank_file.questions) - count
+    if count == 2000 and edit != "truncate":
+        assert change.removed < 200
+    assert_matches_file(bank, bank_file)
+    assert bank.reload() is None
+    bank.close()
+
+
+def bank_fields(question):
+    """Return a round question as it is written in the bank file."""
+    return {key: value for key, value in question.items() if key != "_position"}
+
+
+def engine_on(bank_file):
+    bank = JsonlQuestionBank(str(bank_file.path), watch=True)
+    return QuizEngine(bank, questions_per_game=10, rng=random.Random(5))
+
+
+def assert_round_positions(engine):
+    for question in engine.questions:
+        assert engine.question_bank.get(question["_position"])["id"] == question["id"]
+
+
+def test_lines_inserted_and_deleted_before_the_round_only_move_it(tmp_path):
+    bank_file = big_bank(tmp_path)
+    engine = engine_on(bank_file)
+    drawn = [question["id"] for question in engine.questions]
+
+    bank_file.questions.insert(0, make_question(9000, "new"))
+    bank_file.save()
+    assert engine.reload_bank() == []
+    assert [question["id"] for question in engine.questions] == drawn
+    assert_round_positions(engine)
+
+    del bank_file.questions[:3]
+    bank_file.save()
+    assert engine.reload_bank() == []
+    assert [question["id"] for question in engine.questions] == drawn
+    assert_round_positions(engine)
+    engine.question_bank.close()
+
+
+def test_edits_next_to_round_questions_are_matched_by_content(tmp_path):
+    bank_file = big_bank(tmp_path)
+    engine = engine_on(bank_file)
+    later = engine.questions[3]
+    neighbor = engine.questions[5]
+    drawn = [question["id"] for question in engine.questions]
+
+    # Shift the neighbor inside the edited chunk and edit the later question in the same save
+    neighbor_line = bank_file.questions.index(bank_fields(neighbor))
+    bank_file.questions.insert(neighbor_line, make_question(9000, "new"))
+    later_line = bank_file.questions.index(bank_fields(later))
+    bank_file.questions[later_line] = dict(bank_file.questions[later_line], explanation="Edited")
+    bank_file.save()
+
+    edited = engine.reload_bank()
+    assert [(old["id"], new["id"]) for old, new in edited] == [(later["id"], later["id"])]
+    assert engine.questions[3]["explanation"] == "Edited"
+    assert [question["id"] for question in engine.questions] == drawn
+    assert_round_positions(engine)
+    engine.question_bank.close()
+
+
+def test_deleted_round_question_stays_as_drawn_without_a_position(tmp_path):
+    bank_file = BankFile(tmp_path / "bank.jsonl", [make_question(i, f"svc-{i}") for i in range(30)])
+    engine = engine_on(bank_file)
+    engine.review_scheduler = SpacedRepetitionScheduler(str(tmp_path / "review.log"))
+    removed = engine.questions[1]
+    bank_file.questions.remove(bank_fields(removed))
+    bank_file.save()
+    assert engine.reload_bank() == []
+    assert engine.questions[1] == dict(removed, _position=None)
+    # A second reload leaves it alone
+    bank_file.questions.append(make_question(9000, "new"))
+    bank_file.save()
+    assert engine.reload_bank() == []
+
+    engine.answer(engine.correct_choice.id)
+    engine.advance()
+    engine.answer(engine.correct_choice.id)
+    # Only the question still in the bank was recorded for review
+    assert len(engine.review_scheduler.states) == 1
+    engine.review_scheduler.close()
+    engine.question_bank.close()
+
+
+def test_half_written_in_place_rewrite_keeps_serving_the_old_contents(tmp_path):
+    bank_file = BankFile(tmp_path / "bank.jsonl", [make_question(i, f"svc-{i}") for i in range(50)])
+    bank = JsonlQuestionBank(str(bank_file.path), watch=True)
+    # Rewrite the same inode, as many editors do: ten records and half of the eleventh
+    with open(bank_file.path, "r+") as f:
+        f.write("".join(json.dumps(question) + "\n" for question in bank_file.questions[:10]) + '{"name": "ha')
+        f.truncate()
+    with pytest.raises(ValueError, match="line 11"):
+        bank.reload()
+    assert bank.get(45)["id"] == "svc-45"
+    assert bank.reload() is None
+
+    bank_file.questions = bank_file.questions[:10]
+    bank_file.save()
+    assert bank.reload().count == 10
+    assert_matches_file(bank, bank_file)
+    bank.close()
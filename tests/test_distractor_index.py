@@ -0,0 +1,44 @@
+import json
+import os
+
+from distractor_index import DistractorIndex, bank_digest
+from question_bank import JsonlQuestionBank, ListQuestionBank
+from quiz_engine import QuizEngine
+
+
+def write_bank(path, questions):
+    path.write_text("".join(json.dumps(question) + "\n" for question in questions))
+
+
+def test_digest_follows_contents_not_mtime(tmp_path, questions):
+    path = tmp_path / "bank.jsonl"
+    write_bank(path, questions)
+    bank = JsonlQuestionBank(str(path))
+    before = bank_digest(bank)
+    bank.close()
+
+    os.utime(path, ns=(1, 1))
+    bank = JsonlQuestionBank(str(path))
+    assert bank_digest(bank) == before
+    bank.close()
+
+    questions[4]["correct"] = "Amazon Edited"
+    write_bank(path, questions)
+    bank = JsonlQuestionBank(str(path))
+    assert bank_digest(bank) != before
+    bank.close()
+
+
+def test_engine_loads_the_index_when_built(sqlite_bank):
+    engine = QuizEngine(sqlite_bank, choices=4)
+    assert isinstance(engine.distractors, DistractorIndex)
+    assert len(engine.choices) == 4
+    assert QuizEngine(sqlite_bank).distractors is None
+
+
+def test_distractors_skip_the_correct_answer(questions):
+    index = DistractorIndex.for_bank(ListQuestionBank(questions))
+    picked = index.distractors(questions[0], 5)
+    assert picked[0] == questions[0]["incorrect"]
+    assert len(picked) == len(set(picked)) == 5
+    assert questions[0]["correct"] not in picked
@@ -0,0 +1,24 @@
+from leaderboard import Leaderboard
+
+
+def test_scores_survive_a_restart_in_rank_order(tmp_path):
+    path = str(tmp_path / "leaderboard.log")
+    board = Leaderboard(path, clock=lambda: 1.0)
+    for name, score in (("a", 3), ("b", 5), ("c", 4)):
+        board.submit(name, score, 5)
+    board.close()
+
+    reloaded = Leaderboard(path)
+    assert [entry.name for entry in reloaded.top(3)] == ["b", "c", "a"]
+    assert reloaded.rank_of("c") == 2
+
+
+def test_unknown_log_is_moved_aside_not_appended_to(tmp_path):
+    path = tmp_path / "leaderboard.log"
+    path.write_bytes(b"not a leaderboard")
+    board = Leaderboard(str(path))
+    board.submit("a", 5, 5)
+    board.close()
+
+    assert (tmp_path / "leaderboard.log.unknown").read_bytes() == b"not a leaderboard"
+    assert [entry.name for entry in Leaderboard(str(path)).top()] == ["a"]
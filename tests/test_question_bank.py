@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from question_bank import JsonlQuestionBank, ListQuestionBank, load_question_bank
+
+
+def write_lines(path, lines):
+    path.write_text("".join(line + "\n" for line in lines))
+
+
+def test_jsonl_positions_and_ids(tmp_path, questions):
+    path = tmp_path / "bank.jsonl"
+    write_lines(path, [json.dumps(question) for question in questions[:5]] + [""])
+    bank = load_question_bank(str(path))
+    assert len(bank) == 5
+    assert bank.get(3)["id"] == "svc-103"
+    assert bank.get(3)["_position"] == 3
+    bank.close()
+
+    # The saved index is reused on the next open
+    reopened = JsonlQuestionBank(str(path))
+    assert reopened.index_path == str(path) + ".idx"
+    assert sorted(question["_position"] for question in reopened.sample(5)) == [0, 1, 2, 3, 4]
+    reopened.close()
+
+
+def test_sqlite_and_list_positions(sqlite_bank, questions):
+    assert sqlite_bank.get(0)["id"] == 1
+    assert sqlite_bank.get(0)["_position"] == 0
+    assert ListQuestionBank(questions).get(7)["_position"] == 7
+
+
+@pytest.mark.parametrize("bad_line, message", [
+    ('{"name": "x", broken', "line 3: Expecting property name"),
+    ('{"name": "x"}', "line 3: expected an object with the keys"),
+    ('["not", "an", "object"]', "line 3: expected an object"),
+])
+def test_malformed_records_are_reported_when_opened(tmp_path, questions, bad_line, message):
+    path = tmp_path / "bank.jsonl"
+    write_lines(path, [json.dumps(questions[0]), "", bad_line, json.dumps(questions[1])])
+    with pytest.raises(ValueError, match=message):
+        load_question_bank(str(path))
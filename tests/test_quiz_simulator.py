@@ -0,0 +1,47 @@
+import numpy as np
+
+from question_bank import ListQuestionBank
+from quiz_simulator import (PLAYER_MODELS, build_report, question_accuracies, run_simulation, sample_rounds,
+                            simulate_engine, simulate_vectorized)
+
+
+def check_counts(result, bank_size, sessions, per_round):
+    assert result.sessions == sessions
+    assert len(result.picked) == bank_size
+    assert result.picked.sum() == sessions * per_round
+    assert (result.missed <= result.picked).all()
+
+
+def test_engine_simulation_with_an_id_column(sqlite_bank):
+    # Ids run 1..18, so indexing the histograms by id used to overrun them
+    model = PLAYER_MODELS["novice"]
+    accuracies = question_accuracies(sqlite_bank, model)
+    result = simulate_engine(sqlite_bank, accuracies, model, 5, 200, seed=3)
+    check_counts(result, len(sqlite_bank), 200, 5)
+
+
+def test_engine_simulation_with_string_ids(questions):
+    bank = ListQuestionBank(questions)
+    model = PLAYER_MODELS["expert"]
+    accuracies = question_accuracies(bank, model, {"svc-104": 0.0})
+    result = simulate_engine(bank, accuracies, model, 5, 200, seed=4)
+    check_counts(result, len(bank), 200, 5)
+    assert result.missed[4] == result.picked[4] > 0
+
+    report = build_report(result, bank, 1.0, top=1)
+    assert report["questions"][0]["id"] == "svc-104"
+
+
+def test_vectorized_and_pooled_counts(questions):
+    model = PLAYER_MODELS["guesser"]
+    accuracies = question_accuracies(ListQuestionBank(questions), model)
+    result = simulate_vectorized(accuracies, model, 5, 1000, np.random.default_rng(0))
+    check_counts(result, len(questions), 1000, 5)
+    assert run_simulation(1000, accuracies, model, workers=1).sessions == 1000
+
+
+def test_rounds_taking_most_of_the_bank_are_distinct():
+    rounds = sample_rounds(np.random.default_rng(0), 500, 100, 60)
+    assert rounds.shape == (500, 60)
+    assert all(len(set(row)) == 60 for row in rounds.tolist())
+    assert 0 <= rounds.min() and rounds.max() < 100
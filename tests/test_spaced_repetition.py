@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from question_bank import ListQuestionBank
+from spaced_repetition import INITIAL_EASE, RELEARN_SECONDS, ReviewState, SpacedRepetitionScheduler
+
+
+def test_sm2_intervals_grow_and_misses_relearn():
+    state = ReviewState(0)
+    state.review(4, now=0.0, interval_unit=1.0)
+    assert (state.interval, state.repetitions, state.due) == (1.0, 1, 1.0)
+    assert state.ease == pytest.approx(INITIAL_EASE)
+    state.review(4, now=1.0, interval_unit=1.0)
+    assert (state.interval, state.due) == (6.0, 7.0)
+    state.review(5, now=7.0, interval_unit=1.0)
+    assert state.interval == pytest.approx(6.0 * INITIAL_EASE)
+    state.review(1, now=30.0, interval_unit=1.0)
+    assert (state.interval, state.repetitions, state.lapses) == (0.0, 0, 1)
+    assert state.due == 30.0 + RELEARN_SECONDS
+    assert state.ease < INITIAL_EASE
+
+
+def missed_then_due(bank, path, missed_positions):
+    now = [0.0]
+    scheduler = SpacedRepetitionScheduler(str(path), clock=lambda: now[0], rng=random.Random(1))
+    for position in missed_positions:
+        scheduler.record(bank.get(position), correct=False)
+    scheduler.close()
+    now[0] = RELEARN_SECONDS + 1
+    # A fresh scheduler only has the log's position hints to find the questions with
+    reloaded = SpacedRepetitionScheduler(str(path), clock=lambda: now[0], rng=random.Random(2))
+    chosen = reloaded.select(bank, len(missed_positions))
+    reloaded.close()
+    return chosen
+
+
+def test_due_questions_are_found_when_ids_are_strings(tmp_path, questions):
+    bank = ListQuestionBank(questions)
+    chosen = missed_then_due(bank, tmp_path / "review.log", [3, 7, 11, 15, 19])
+    assert sorted(question["id"] for question in chosen) == ["svc-103", "svc-107", "svc-111", "svc-115", "svc-119"]
+
+
+def test_due_questions_are_found_with_an_id_column(tmp_path, sqlite_bank):
+    chosen = missed_then_due(sqlite_bank, tmp_path / "review.log", [0, 4, 8, 12, 17])
+    assert sorted(question["_position"] for question in chosen) == [0, 4, 8, 12, 17]
+    assert sorted(question["id"] for question in chosen) == [1, 5, 9, 13, 18]
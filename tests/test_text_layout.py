@@ -0,0 +1,43 @@
+import pygame
+import pytest
+
+from text_layout import NO_LINE_START, TextLayout
+
+
+@pytest.fixture(scope="module")
+def font():
+    pygame.font.init()
+    return pygame.font.Font(None, 24)
+
+
+def body_width(font, line):
+    # One closing punctuation character may hang past the edge
+    return font.size(line[:-1] if line[-1:] in NO_LINE_START else line)[0]
+
+
+@pytest.mark.parametrize("text", [
+    "x" * 300,
+    "。" * 100,
+    "word " * 40,
+    "Amazon S3は、オブジェクトストレージサービスです。" * 5,
+    "supercalifragilisticexpialidocious" * 3 + " tail",
+], ids=["latin-run", "punctuation-run", "words", "japanese", "long-word"])
+def test_lines_fit_the_rendered_width(font, text):
+    lines = TextLayout().wrap(text, font, 200)
+    assert all(body_width(font, line) <= 200 for line in lines)
+    assert "".join(lines).replace(" ", "") == text.replace(" ", "")
+
+
+def test_kinsoku_keeps_punctuation_off_line_starts(font):
+    lines = TextLayout().wrap("AWSのサービス、例えばLambdaは、サーバーレスです。" * 4, font, 150)
+    assert len(lines) > 1
+    assert not any(line[0] in NO_LINE_START for line in lines)
+
+
+def test_layouts_are_memoized(font):
+    layout = TextLayout()
+    first = layout.wrap("word " * 40, font, 200)
+    assert layout.wrap("word " * 40, font, 200) is first
+    assert layout.stats()["hits"] == 1
+    assert layout.invalidate("word " * 40) == set(first)
+    assert layout.wrap("word " * 40, font, 200) is not first
@@ -0,0 +1,222 @@
+"""
+Pre-rendered text atlas for the AWS Quiz Game.
+The bake step renders every known string of the game into RGBA pages and
+writes them with a string index to one file. At startup the file is
+memory-mapped and each page becomes a pygame surface over the mapping, so
+looking up baked text costs a dict lookup and a subsurface instead of
+rasterizing CJK glyphs.
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pygame
+
+ATLAS_FILE = "text_atlas.bin"
+ATLAS_MAGIC = b"AQTA"
+ATLAS_VERSION = 1
+
+# Header: magic, version, font signature, page width, page count, index offset, entry count,
+# followed by the height of each page
+ATLAS_HEADER = struct.Struct("<4sI20sHIQI")
+PAGE_HEIGHT = struct.Struct("<H")
+# Index entry: font role, antialias, RGB color, page, x, y, width, height, UTF-8 text length
+ATLAS_ENTRY = struct.Struct("<BB3BHHHHHH")
+
+PAGE_SIZE = 2048
+PAGE_ALIGN = 4096
+
+# Fonts the game draws baked text with; an atlas only applies to the fonts it was baked for
+FONT_ROLES = ("title", "large", "medium", "small", "button")
+
+Color = Tuple[int, int, int]
+# An atlas string: font role, text, antialias, color
+AtlasText = Tuple[str, str, bool, Color]
+
+
+def font_signature(font_files: Dict[str, Tuple[Optional[str], int]]) -> bytes:
+    """Return a digest identifying the font file and size of every role and the renderer version."""
+    digest = hashlib.sha1()
+    digest.update(pygame.version.ver.encode())
+    digest.update(str(pygame.font.get_sdl_ttf_version()).encode())
+    for role in FONT_ROLES:
+        path, size = font_files.get(role, (None, 0))
+        try:
+            mtime = os.stat(path).st_mtime_ns if path else 0
+        except OSError:
+            mtime = 0
+        digest.update(f"{role}\0{path}\0{size}\0{mtime}\0".encode())
+    return digest.digest()
+
+
+def _pack(sizes: List[Tuple[int, int]]) -> List[Optional[Tuple[int, int, int]]]:
+    """Shelf-pack rectangles into pages; return (page, x, y) per size, or None if it cannot fit."""
+    placements: List[Optional[Tuple[int, int, int]]] = [None] * len(sizes)
+    page = x = y = shelf_height = 0
+    # Tallest first keeps shelves tight
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i][1]):
+        width, height = sizes[i]
+        if width > PAGE_SIZE or height > PAGE_SIZE:
+            continue
+        if x + width > PAGE_SIZE:
+            x, y, shelf_height = 0, y + shelf_height, 0
+        if y + height > PAGE_SIZE:
+            page, x, y, shelf_height = page + 1, 0, 0, 0
+        placements[i] = (page, x, y)
+        x += width
+        shelf_height = max(shelf_height, height)
+    return placements
+
+
+def bake_atlas(path: str, fonts: Dict[str, pygame.font.Font], signature: bytes,
+               texts: Iterable[AtlasText]) -> int:
+    """Render texts with fonts, write the atlas file and return the number of baked strings."""
+    unique = list(dict.fromkeys((role, text, bool(antialias), tuple(color)) for role, text, antialias, color in texts
+                                if text and role in fonts))
+    surfaces = [fonts[role].render(text, antialias, color) for role, text, antialias, color in unique]
+    placements = _pack([surface.get_size() for surface in surfaces])
+    page_count = max((placement[0] + 1 for placement in placements if placement), default=0)
+    # Pages are only as tall as the text packed into them
+    heights = [0] * page_count
+    for surface, placement in zip(surfaces, placements):
+        if placement:
+            page, x, y = placement
+            heights[page] = max(heights[page], y + surface.get_height())
+
+    pages = [pygame.Surface((PAGE_SIZE, height), pygame.SRCALPHA, 32) for height in heights]
+    index = []
+    for (role, text, antialias, color), surface, placement in zip(unique, surfaces, placements):
+        if placement is None:
+            continue
+        page, x, y = placement
+        # Copy the pixels as-is, alpha included, so baked text blits exactly like live text
+        pages[page].blit(surface, (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+        encoded = text.encode("utf-8")
+        index.append(ATLAS_ENTRY.pack(FONT_ROLES.index(role), antialias, *color, page, x, y,
+                                      surface.get_width(), surface.get_height(), len(encoded)) + encoded)
+
+    header = ATLAS_HEADER.pack(ATLAS_MAGIC, ATLAS_VERSION, signature, PAGE_SIZE, page_count, 0, len(index))
+    header += b"".join(PAGE_HEIGHT.pack(height) for height in heights)
+    data_offset = _align(len(header))
+    index_offset = data_offset + sum(PAGE_SIZE * height * 4 for height in heights)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(ATLAS_HEADER.pack(ATLAS_MAGIC, ATLAS_VERSION, signature, PAGE_SIZE, page_count,
+                                  index_offset, len(index)))
+        f.write(header[ATLAS_HEADER.size:])
+        f.write(b"\0" * (data_offset - len(header)))
+        for page in pages:
+            f.write(pygame.image.tobytes(page, "RGBA"))
+        f.write(b"".join(index))
+    os.replace(tmp_path, path)
+    return len(index)
+
+
+def _align(offset: int) -> int:
+    return (offset + PAGE_ALIGN - 1) // PAGE_ALIGN * PAGE_ALIGN
+
+
+class TextAtlas:
+    """Memory-mapped atlas of pre-rendered strings, looked up by font, text and color."""
+
+    def __init__(self, path: str, fonts: Dict[str, pygame.font.Font], signature: bytes):
+        self.path = path
+        self.hits = 0
+        self._file = open(path, "rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, stored_signature, page_width, page_count, index_offset, count = \
+                ATLAS_HEADER.unpack_from(self._data)
+            if (magic, version) != (ATLAS_MAGIC, ATLAS_VERSION):
+                raise ValueError("unknown atlas format")
+            if stored_signature != signature:
+                raise ValueError("atlas was baked for different fonts")
+
+            # Pages are views of the mapping: no pixels are copied or decoded
+            view = memoryview(self._data)
+            start = _align(ATLAS_HEADER.size + page_count * PAGE_HEIGHT.size)
+            self._pages = []
+            for (height,) in PAGE_HEIGHT.iter_unpack(
+                    self._data[ATLAS_HEADER.size:ATLAS_HEADER.size + page_count * PAGE_HEIGHT.size]):
+                end = start + page_width * height * 4
+                if end > index_offset:
+                    raise ValueError("truncated atlas")
+                self._pages.append(pygame.image.frombuffer(view[start:end], (page_width, height), "RGBA"))
+                start = end
+
+            # Entries are keyed by font object; roles that share a font share its entries
+            role_fonts = [fonts.get(role) for role in FONT_ROLES]
+            self._rects: Dict[tuple, Tuple[int, pygame.Rect]] = {}
+            position = index_offset
+            for _ in range(count):
+                role, antialias, r, g, b, page, x, y, width, height, length = \
+                    ATLAS_ENTRY.unpack_from(self._data, position)
+                position += ATLAS_ENTRY.size
+                text = self._data[position:position + length].decode("utf-8")
+                position += length
+                font = role_fonts[role] if role < len(role_fonts) else None
+                if font is not None:
+                    self._rects[(font, text, bool(antialias), (r, g, b))] = (page, pygame.Rect(x, y, width, height))
+        except (ValueError, struct.error, UnicodeDecodeError):
+            self.close()
+            raise
+
+    def __len__(self) -> int:
+        return len(self._rects)
+
+    def get(self, font: pygame.font.Font, text: str, antialias: bool, color: Sequence[int]) -> Optional[pygame.Surface]:
+        """Return the baked surface for a string, or None if it has to be rendered live."""
+        entry = self._rects.get((font, text, bool(antialias), tuple(color[:3])))
+        if entry is None:
+            return None
+        self.hits += 1
+        page, rect = entry
+        return self._pages[page].subsurface(rect)
+
+    def close(self) -> None:
+        """Release the mapping; surfaces returned by get() must not be used afterwards."""
+        self._pages = []
+        try:
+            self._data.close()
+        except BufferError:
+            # Baked surfaces are still referenced; the mapping is released with them
+            pass
+        self._file.close()
+
+
+def main() -> None:
+    """Bake the text atlas for the fonts found on this machine."""
+    parser = argparse.ArgumentParser(description="Pre-render the AWS Quiz Game's text into an atlas")
+    parser.add_argument("-o", "--output", help="atlas file to write (default: next to aws_quiz_game.py)")
+    parser.add_argument("--bank", metavar="PATH", help="also bake every question of a JSONL or SQLite bank")
+    args = parser.parse_args()
+
+    # Baking needs fonts but no window
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import aws_quiz_game
+    from question_bank import load_question_bank
+
+    game = aws_quiz_game.QuizGame(atlas_path=None)
+    questions = list(aws_quiz_game.QUIZ_QUESTIONS)
+    if args.bank:
+        bank = load_question_bank(args.bank)
+        questions.extend(bank.get(index) for index in range(len(bank)))
+        bank.close()
+
+    output = args.output or aws_quiz_game.DEFAULT_ATLAS_PATH
+    start = time.perf_counter()
+    count = bake_atlas(output, game.font_roles(), game.font_atlas_signature(), game.atlas_texts(questions))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"Baked {count} strings into {output} ({os.path.getsize(output) / 1e6:.1f} MB) in {elapsed_ms:.0f} ms")
+    pygame.quit()
+    sys.exit()
+
+
+if __name__ == "__main__":
+    main()
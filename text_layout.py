@@ -0,0 +1,194 @@
+"""
+Text layout engine for the AWS Quiz Game.
+Breaks text into lines in a single pass using cached per-glyph advance widths,
+allows breaks between Japanese characters while following kinsoku rules, and
+memoizes the resulting lines per (text, font, width).
+"""
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+import pygame
+
+from font_cache import FONT_LOCK
+
+# Characters that must not start a line (行頭禁則): closing brackets, punctuation, small kana
+NO_LINE_START = frozenset(
+    "、。，．・：；？！ー～）」』】〕〉》〙〗｝］゛゜"
+    "ぁぃぅぇぉっゃゅょゎゕゖァィゥェォッャュョヮヵヶ々ゝゞヽヾ"
+    ",.;:!?)]}%…‥’”"
+)
+
+# Characters that must not end a line (行末禁則): opening brackets
+NO_LINE_END = frozenset("（「『【〔〈《〘〖｛［([{‘“")
+
+# Closing punctuation that may hang past the right edge instead of starting the next line (ぶら下げ)
+MAX_HANGING_CHARS = 1
+
+LAYOUT_CACHE_SIZE = 256
+
+
+def is_cjk(char: str) -> bool:
+    """Return True for characters that may be broken between without a space."""
+    code = ord(char)
+    return (
+        0x3000 <= code <= 0x30FF      # CJK punctuation, hiragana, katakana
+        or 0x3400 <= code <= 0x4DBF   # CJK extension A
+        or 0x4E00 <= code <= 0x9FFF   # CJK unified ideographs
+        or 0xF900 <= code <= 0xFAFF   # CJK compatibility ideographs
+        or 0xFF00 <= code <= 0xFFEF   # Half- and full-width forms
+    )
+
+
+def can_break_between(before: str, after: str) -> bool:
+    """Return True if a line may break between two adjacent non-space characters."""
+    if after in NO_LINE_START or before in NO_LINE_END:
+        return False
+    return is_cjk(before) or is_cjk(after)
+
+
+class TextLayout:
+    """Line breaker with per-font glyph advance caches and an LRU of laid-out text."""
+
+    def __init__(self, max_entries: int = LAYOUT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._advances: Dict[pygame.font.Font, Dict[str, int]] = {}
+        self._lines: "OrderedDict[tuple, Tuple[str, ...]]" = OrderedDict()
+
+    def advance(self, font: pygame.font.Font, char: str) -> int:
+        """Return the horizontal advance of char in font, measuring each glyph only once."""
+        advances = self._advances.get(font)
+        if advances is None:
+            advances = self._advances[font] = {}
+        width = advances.get(char)
+        if width is None:
+            metrics = font.metrics(char)
+            if metrics and metrics[0] is not None:
+                width = metrics[0][4]
+            else:
+                width = font.size(char)[0]
+            advances[char] = width
+        return width
+
+    def wrap(self, text: str, font: pygame.font.Font, max_width: int) -> Tuple[str, ...]:
+        """Return text broken into lines no wider than max_width, memoized."""
+        key = (text, font, max_width)
+        lines = self._lines.get(key)
+        if lines is not None:
+            self._lines.move_to_end(key)
+            self.hits += 1
+            return lines
+
+        self.misses += 1
+        lines = self.break_lines(text, font, max_width)
+        self.insert(text, font, max_width, lines)
+        return lines
+
+    def break_lines(self, text: str, font: pygame.font.Font, max_width: int) -> Tuple[str, ...]:
+        """Lay out text without consulting or filling the memo; safe to call from a worker thread."""
+        with FONT_LOCK:
+            return self._break_lines(text, font, max_width)
+
+    def insert(self, text: str, font: pygame.font.Font, max_width: int, lines: Tuple[str, ...]) -> None:
+        """Memoize lines laid out elsewhere, e.g. by a prefetch thread."""
+        self._lines[(text, font, max_width)] = lines
+        if len(self._lines) > self.max_entries:
+            self._lines.popitem(last=False)
+
+    def _break_lines(self, text: str, font: pygame.font.Font, max_width: int) -> Tuple[str, ...]:
+        """Break text into lines, scanning each character once."""
+        lines = []
+        start = 0
+        while True:
+            end, next_start = self._find_break(text, font, start, max_width)
+            lines.append(text[start:end].rstrip(" "))
+            if next_start >= len(text):
+                return tuple(lines)
+            start = next_start
+
+    def _find_break(self, text: str, font: pygame.font.Font, start: int, max_width: int) -> Tuple[int, int]:
+        """Return where the line starting at start ends and where the next line starts.
+
+        Glyph advances decide where the line overflows. Because kerning and hinting can
+        make the rendered line wider than the sum of advances, the chosen break is
+        confirmed with font.size(), stepping back to an earlier break if needed.
+        """
+        length = len(text)
+        width = 0
+        breaks = []  # Indices in the line where a break is allowed
+        overflow = -1
+        hanging = 0
+        i = start
+        while i < length:
+            char = text[i]
+            if char == "\n":
+                break
+            if char == " ":
+                # Spaces are always break opportunities and may hang past the edge
+                breaks.append(i)
+            elif i > start and text[i - 1] != " " and can_break_between(text[i - 1], char):
+                breaks.append(i)
+            width += self.advance(font, char)
+            if width > max_width and i > start and char != " ":
+                # Closing punctuation never starts a line, so a little of it may hang past the edge
+                if char not in NO_LINE_START or hanging >= MAX_HANGING_CHARS:
+                    overflow = i
+                    break
+                hanging += 1
+            i += 1
+
+        if overflow < 0:
+            # Reached a newline or the end of the text
+            next_start = i + 1 if i < length else length
+            if self._fits(font, text[start:i], max_width):
+                return i, next_start
+
+        for position in reversed(breaks):
+            if self._fits(font, text[start:position], max_width):
+                return position, self._skip_spaces(text, position)
+        # No allowed break leaves a line that fits (e.g. one very long word): break inside the first word
+        end = self._last_fitting(text, font, start, breaks[0] if breaks else (overflow if overflow >= 0 else i),
+                                 max_width)
+        return end, self._skip_spaces(text, end)
+
+    def _last_fitting(self, text: str, font: pygame.font.Font, start: int, limit: int, max_width: int) -> int:
+        """Return the largest end up to limit whose line fits, keeping at least one character."""
+        low, high = start + 1, max(start + 1, limit)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self._fits(font, text[start:middle], max_width):
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    @staticmethod
+    def _fits(font: pygame.font.Font, line: str, max_width: int) -> bool:
+        line = line.rstrip(" ")
+        for _ in range(MAX_HANGING_CHARS):
+            if line[-1:] in NO_LINE_START:
+                line = line[:-1]
+        return font.size(line)[0] <= max_width
+
+    @staticmethod
+    def _skip_spaces(text: str, position: int) -> int:
+        while position < len(text) and text[position] == " ":
+            position += 1
+        return position
+
+    def invalidate(self, text: Optional[str] = None) -> Set[str]:
+        """Forget laid-out lines for text, or for everything if text is None, and return the forgotten lines."""
+        keys = list(self._lines) if text is None else [key for key in self._lines if key[0] == text]
+        forgotten = set()
+        for key in keys:
+            forgotten.update(self._lines.pop(key))
+        return forgotten
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the number of memoized layouts."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._lines)}
+
+
+# Shared layout engine used by QuizGame
+TEXT_LAYOUT = TextLayout()